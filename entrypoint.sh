@@ -2,7 +2,20 @@
 set -euo pipefail
 
 python manage.py migrate --noinput
+# backfill таблиц, которые дальше ведут сигналы: после миграции они пустые
+python manage.py rebuild_search_index --if-empty
+python manage.py rebuild_related_news --if-empty
+# width/height/file_size загрузок до 0012 (берёт только строки с пустыми значениями)
+python manage.py backfill_image_dimensions
+# AVIF/WebP для уже загруженных фото без актуального манифеста — задачами для run_jobs
+python manage.py build_image_variants --enqueue
+# бандлы из закоммиченных static/vendor (sha256 из main/vendor.lock.json), без сети
+python manage.py build_vendor
+python manage.py optimize_static_images
+python manage.py prune_css --write
 python manage.py collectstatic --noinput
+python manage.py build_critical_css
+python manage.py build_sitemaps
 
 exec gunicorn website_sp.wsgi:application \
   --bind 0.0.0.0:8000 \
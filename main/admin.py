@@ -1,29 +1,26 @@
 
+import csv
+
 from .models import ContactMessage, ProjectImage, ProjectBadge, Project, OrgUnit, ProjectDetail, ProjectDetailImage, \
-    ProjectDetailGridImage
+    ProjectDetailGridImage, NewsArticle, NewsImage, OutboxEmail, AdminJob
 
+from django.conf import settings
 from django.contrib import admin, messages
-from django.db import models
+from django.core.paginator import Paginator
+from django.forms.models import BaseInlineFormSet
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django import forms
 from django.urls import path, reverse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.utils import timezone
 from django.utils.html import format_html
-from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
-from django.core.files.storage import default_storage
-
-from zipfile import ZipFile, BadZipFile
-from django.core.files.base import ContentFile
-import os
 
+from . import bulk_upload, images, jobs, reorder, search, spam
+from .pagination import EstimatedCountPaginator
 from .models import ProjectDetail, ProjectDetailImage
 
-try:
-    from PIL import Image  # Pillow для мягкой проверки
-    PIL_AVAILABLE = True
-except Exception:
-    PIL_AVAILABLE = False
-
 
 @admin.register(OrgUnit)
 class OrgUnitAdmin(admin.ModelAdmin):
@@ -31,18 +28,270 @@ class OrgUnitAdmin(admin.ModelAdmin):
     search_fields = ("name", "slug")
     prepopulated_fields = {"slug": ("name",)}
 
+class SpamStatusFilter(admin.SimpleListFilter):
+    """За замовчуванням — лише чисті звернення; карантин окремим пунктом."""
+    title = _("Спам")
+    parameter_name = "spam"
+
+    def lookups(self, request, model_admin):
+        return (("clean", _("Чисті")), ("quarantine", _("Карантин")), ("all", _("Усі")))
+
+    def choices(self, changelist):
+        current = self.value() or "clean"
+        for value, label in self.lookup_choices:
+            yield {
+                "selected": current == value,
+                "query_string": changelist.get_query_string({self.parameter_name: value}),
+                "display": label,
+            }
+
+    def queryset(self, request, queryset):
+        value = self.value() or "clean"
+        if value == "all":
+            return queryset
+        return queryset.filter(is_quarantined=value == "quarantine")
+
+
 @admin.register(ContactMessage)
 class ContactMessageAdmin(admin.ModelAdmin):
-    list_display = ("created_at","first_name","last_name","email","subject")
+    list_display = ("created_at","first_name","last_name","email","subject","spam_score","is_quarantined")
     search_fields = ("first_name","last_name","email","subject","message")
-    list_filter = ("created_at",)
-    readonly_fields = ("created_at","ip","user_agent")
+    list_filter = (SpamStatusFilter, "created_at")
+    readonly_fields = ("created_at","ip","user_agent","spam_score","spam_reasons","spam_checked_at")
+    actions = ("release_from_quarantine", "export_csv")
+    # без COUNT(*) по всей таблице: «показати всі» не рахуємо, кількість сторінок — за оцінкою
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    csv_fields = ("created_at", "first_name", "last_name", "email", "phone", "subject", "message",
+                  "ip", "spam_score", "is_quarantined")
+
+    def get_search_results(self, request, queryset, search_term):
+        # повнотекстовий індекс замість icontains по п'яти колонках (main/search.py)
+        ids = search.contact_ids(search_term)
+        if ids is None:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=ids), False
+
+    @admin.action(description=_("Не спам: зняти з карантину і надіслати листи"))
+    def release_from_quarantine(self, request, queryset):
+        released = 0
+        for contact in queryset.filter(is_quarantined=True):
+            spam.release(contact)
+            released += 1
+        self.message_user(request, _("Знято з карантину: %(n)s") % {"n": released}, messages.SUCCESS)
+
+    @admin.action(description=_("Експорт у CSV"))
+    def export_csv(self, request, queryset):
+        # потоково і пачками з курсора БД: пам'ять не росте з кількістю звернень
+        rows = (queryset.order_by("-created_at", "-pk")
+                .values_list(*self.csv_fields)
+                .iterator(chunk_size=getattr(settings, "ADMIN_EXPORT_CHUNK_SIZE", 2000)))
+        writer = csv.writer(_Echo())
+
+        def stream():
+            yield "\ufeff"  # BOM — щоб Excel відкрив кирилицю
+            yield writer.writerow([ContactMessage._meta.get_field(f).verbose_name for f in self.csv_fields])
+            for row in rows:
+                yield writer.writerow([_csv_safe(value) for value in row])
+
+        response = StreamingHttpResponse(stream(), content_type="text/csv; charset=utf-8")
+        response["Content-Disposition"] = f'attachment; filename="contacts-{timezone.localdate():%Y-%m-%d}.csv"'
+        return response
+
+
+class _Echo:
+    """«Файл» для csv.writer, який повертає рядок замість запису."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_safe(value):
+    # формули в комірках (=, +, -, @) Excel виконує — екрануємо текст від відвідувачів
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@"):
+        return "'" + value
+    return value
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "subject", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("subject",)
+    list_select_related = ("contact",)
+    readonly_fields = ("contact", "subject", "to", "reply_to", "body_text", "body_html", "status",
+                       "attempts", "next_attempt_at", "last_error", "created_at", "sent_at")
+    actions = ("retry_now",)
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description=_("Повторити відправку зараз"))
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status=OutboxEmail.STATUS_SENT).update(
+            status=OutboxEmail.STATUS_PENDING, next_attempt_at=timezone.now(), attempts=0,
+        )
+        messages.success(request, _("Повернуто в чергу: %(n)s.") % {"n": updated})
+
+@admin.register(AdminJob)
+class AdminJobAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "kind", "project", "status", "processed", "total", "finished_at")
+    list_filter = ("status", "kind")
+    list_select_related = ("project",)
+    readonly_fields = ("kind", "project", "payload", "file", "status", "processed", "total", "stats", "error",
+                       "created_by", "created_at", "started_at", "finished_at", "updated_at")
+
+    def has_add_permission(self, request):
+        return False
+
+class ParentCachedInlineFormSet(BaseInlineFormSet):
+    """
+    Строкам инлайна сразу подставляем родителя: иначе __str__ строки
+    (``self.article.title`` и т.п.) делает по запросу на каждую.
+    """
+
+    def get_queryset(self):
+        if not hasattr(self, "_parent_cached"):
+            rows = super().get_queryset()
+            for row in rows:
+                self.fk.set_cached_value(row, self.instance)
+            self._parent_cached = rows
+        return self._parent_cached
+
+
+class ImageInlineMixin:
+    """Превью строки инлайна — из самого маленького адаптивного варианта, а не из оригинала."""
+    formset = ParentCachedInlineFormSet
+    thumbnail_size = 96
+
+    def get_readonly_fields(self, request, obj=None):
+        return (*super().get_readonly_fields(request, obj), "thumbnail")
 
-class ProjectDetailGridImageInline(admin.TabularInline):
+    @admin.display(description=_("Прев’ю"))
+    def thumbnail(self, obj):
+        return _thumbnail(obj, self.thumbnail_size)
+
+
+def _thumbnail(obj, size):
+    if not obj or not getattr(obj, "image", None):
+        return ""
+    smallest = [items[0] for items in (images.variant_items(obj.variants, fmt) for fmt in ("webp", "avif")) if items]
+    url = obj.image.storage.url(min(smallest)[1]) if smallest else obj.image.url
+    return format_html(
+        '<img src="{}" width="{}" loading="lazy" decoding="async" alt="" '
+        'style="height:auto;max-height:{}px;object-fit:cover">',
+        url, size, size,
+    )
+
+
+class ReorderInlineMixin:
+    """Ссылка «змінити порядок» над инлайном → страница перетаскивания (ReorderAdminMixin)."""
+    template = "admin/edit_inline/tabular_sortable.html"
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.reorder_url = obj and obj.pk and reverse(
+            f"{self.admin_site.name}:{self.parent_model._meta.app_label}_{self.parent_model._meta.model_name}_reorder",
+            args=[obj.pk, self.model._meta.model_name],
+        )
+        return formset
+
+
+class ReorderAdminMixin:
+    """
+    Перестановка строк инлайнов перетаскиванием: страница со списком и POST
+    компактного списка id (``ids=12,5,7``), который main/reorder.py применяет
+    одним bulk_update. На ``Accept: application/json`` отвечает JSON.
+    """
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                "<int:object_id>/reorder/<str:model_name>/",
+                self.admin_site.admin_view(self.reorder_view),
+                name=f"{opts.app_label}_{opts.model_name}_reorder",
+            ),
+        ] + super().get_urls()
+
+    def reorder_view(self, request, object_id: int, model_name: str):
+        parent = get_object_or_404(self.model, pk=object_id)
+        inline_models = {inline.model._meta.model_name for inline in self.inlines}
+        if model_name not in inline_models or model_name not in reorder.REORDERABLE:
+            raise Http404
+        model, fk = reorder.REORDERABLE[model_name]
+        if not (self.has_change_permission(request, parent)
+                and request.user.has_perm(f"{model._meta.app_label}.change_{model_name}")):
+            raise PermissionDenied
+
+        change_url = reverse(f"{self.admin_site.name}:{self.model._meta.app_label}_{self.model._meta.model_name}_change",
+                             args=[parent.pk])
+        wants_json = "application/json" in request.headers.get("Accept", "")
+        if request.method == "POST":
+            try:
+                updated = reorder.apply(model, fk, parent, reorder.parse_ids(request.POST.get("ids")))
+            except ValueError as exc:
+                if wants_json:
+                    return JsonResponse({"error": str(exc)}, status=400)
+                messages.error(request, _("Порядок не збережено: список змінився, оновіть сторінку."))
+                return redirect(request.path)
+            if wants_json:
+                return JsonResponse({"updated": updated})
+            messages.success(request, _("Порядок збережено (змінено рядків: %(count)s).") % {"count": updated})
+            return redirect(change_url)
+
+        rows = model.objects.filter(**{fk: parent}).order_by("order", "id")
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "original": parent,
+            "title": _("Порядок: %(name)s") % {"name": model._meta.verbose_name_plural},
+            "rows": [(row.pk, _thumbnail(row, 120), getattr(row, "alt", "") or str(row)) for row in rows],
+            "change_url": change_url,
+        }
+        return render(request, "admin/reorder.html", context)
+
+
+class PaginatedInlineMixin:
+    """
+    Инлайн постранично (``?<модель>_page=N``): полотно из сотен фото открывается
+    одной страницей строк, а не формсетом на все сотни. Форма изменения
+    отправляется на тот же URL, поэтому POST видит ту же страницу строк.
+    """
+    template = "admin/edit_inline/tabular_paginated.html"
+    per_page = 60
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        page_param = f"{self.model._meta.model_name}_page"
+        per_page = self.per_page
+
+        class PaginatedFormSet(formset):
+            def get_queryset(self):
+                if not hasattr(self, "page"):
+                    paginator = Paginator(BaseInlineFormSet.get_queryset(self), per_page)
+                    self.page = paginator.get_page(request.GET.get(page_param))
+                    query = request.GET.copy()
+                    self.page_links = []
+                    for number in paginator.get_elided_page_range(self.page.number, on_each_side=2, on_ends=1):
+                        if number == paginator.ELLIPSIS:
+                            self.page_links.append((number, None))
+                            continue
+                        query[page_param] = number
+                        self.page_links.append((number, query.urlencode()))
+                    self._queryset = self.page.object_list
+                    for row in self._queryset:
+                        self.fk.set_cached_value(row, self.instance)
+                return self._queryset
+
+        return PaginatedFormSet
+
+
+class ProjectDetailGridImageInline(PaginatedInlineMixin, ReorderInlineMixin, ImageInlineMixin, admin.TabularInline):
     """Инлайн для полотна изображений (masonry)."""
     model = ProjectDetailGridImage
     extra = 0
-    fields = ("image", "alt", "order")
+    fields = ("thumbnail", "image", "alt", "order")
     ordering = ("order", "id")
     show_change_link = True
 
@@ -50,17 +299,17 @@ class ProjectDetailGridImageInline(admin.TabularInline):
 class BulkGridUploadForm(forms.Form):
     zip_file = forms.FileField(label=_("ZIP з зображеннями (для полотна)"))
 
-class ProjectDetailImageInline(admin.TabularInline):
+class ProjectDetailImageInline(ReorderInlineMixin, ImageInlineMixin, admin.TabularInline):
     model = ProjectDetailImage
     extra = 0
-    fields = ("image", "alt", "order")
+    fields = ("thumbnail", "image", "alt", "order")
     ordering = ("order", "id")
     show_change_link = True
 
 
 
 @admin.register(ProjectDetail)
-class ProjectDetailAdmin(admin.ModelAdmin):
+class ProjectDetailAdmin(ReorderAdminMixin, admin.ModelAdmin):
     list_display = ("slug", "title_override", "is_published", "created_at")
     list_filter = ("is_published",)
     search_fields = ("slug", "title_override", "lead", "body", "goal", "partners", "results")
@@ -99,7 +348,17 @@ class ProjectDetailAdmin(admin.ModelAdmin):
             f"admin:{self.model._meta.app_label}_{self.model._meta.model_name}_bulk_upload_grid",
             args=[obj.pk],
         )
-        return format_html('<a class="button" href="{}">{}</a>', url, _("Завантажити полотно (ZIP)"))
+        link = format_html('<a class="button" href="{}">{}</a>', url, _("Завантажити полотно (ZIP)"))
+        # последняя фоновая задача — ссылка на её статус
+        job = obj.jobs.order_by("-created_at").first()
+        if job:
+            job_url = reverse(
+                f"admin:{self.model._meta.app_label}_{self.model._meta.model_name}_job_status",
+                args=[obj.pk, job.pk],
+            )
+            link = format_html('{} &nbsp; <a href="{}">{}: {} ({}/{})</a>', link, job_url,
+                               _("Остання задача"), job.get_status_display(), job.processed, job.total)
+        return link
     bulk_upload_grid_link.short_description = _("Масове завантаження (полотно)")
 
     # --- Кнопка: очистить полотно
@@ -150,20 +409,21 @@ class ProjectDetailAdmin(admin.ModelAdmin):
                 self.admin_site.admin_view(self.clear_grid),
                 name=f"{self.model._meta.app_label}_{self.model._meta.model_name}_clear_grid",
             ),
+            path(
+                "<int:object_id>/jobs/<int:job_id>/",
+                self.admin_site.admin_view(self.job_status),
+                name=f"{self.model._meta.app_label}_{self.model._meta.model_name}_job_status",
+            ),
         ]
         return custom + urls
 
-    # --- Обработчик: очистить полотно
+    # --- Обработчик: очистить полотно (фоновая задача)
     def clear_grid(self, request, object_id: int):
         project = get_object_or_404(ProjectDetail, pk=object_id)
-        deleted_count, details = ProjectDetailGridImage.objects.filter(project=project).delete()
-        messages.success(request, _(f"Видалено {deleted_count} зображень з полотна."))
-        return redirect(
-            "admin:%s_%s_change" % (self.model._meta.app_label, self.model._meta.model_name),
-            object_id,
-        )
+        job = jobs.enqueue("clear_grid", project=project, user=request.user)
+        return self._redirect_to_job(project, job)
 
-    # --- Обработчик: массовая загрузка полотна
+    # --- Обработчик: массовая загрузка полотна (фоновая задача)
     def bulk_upload_grid(self, request, object_id: int):
         project = get_object_or_404(ProjectDetail, pk=object_id)
 
@@ -172,112 +432,44 @@ class ProjectDetailAdmin(admin.ModelAdmin):
             if not form.is_valid():
                 return self._render_bulk_upload_form(request, project, form)
 
-            zf_file = form.cleaned_data["zip_file"]
-            try:
-                zf = ZipFile(zf_file)
-            except BadZipFile:
-                messages.error(request, _("Файл не є коректним ZIP-архівом."))
-                return redirect(
-                    "admin:%s_%s_change" % (self.model._meta.app_label, self.model._meta.model_name),
-                    object_id,
-                )
-
-            created = 0
-            stats = {
-                "total": 0, "dirs": 0, "macosx": 0, "hiddenfork": 0,
-                "bad_ext": 0, "empty": 0, "pillow_failed": 0, "saved": 0,
-            }
-
-            max_order = (
-                ProjectDetailGridImage.objects.filter(project=project)
-                .aggregate(max_o=models.Max("order"))["max_o"]
-                or 0
-            )
-
-            allowed_ext = {".jpg", ".jpeg", ".png", ".webp"}
-
-            for member in zf.namelist():
-                # Папка?
-                if member.endswith("/"):
-                    stats["dirs"] += 1
-                    continue
-                stats["total"] += 1
-
-                # Мусор macOS
-                top = member.split("/", 1)[0]
-                name_in_zip = os.path.basename(member)
-                if top == "__MACOSX":
-                    stats["macosx"] += 1
-                    continue
-                if name_in_zip.startswith("._"):
-                    stats["hiddenfork"] += 1
-                    continue
-
-                base, ext = os.path.splitext(name_in_zip)
-                ext = (ext or "").lower().strip()
-                if ext not in allowed_ext:
-                    stats["bad_ext"] += 1
-                    continue
-
-                # Читаем данные
-                try:
-                    data = zf.read(member)
-                except KeyError:
-                    stats["empty"] += 1
-                    continue
-                if not data:
-                    stats["empty"] += 1
-                    continue
-
-                # Мягкая проверка через Pillow (не блокирующая)
-                if PIL_AVAILABLE:
-                    try:
-                        Image.open(BytesIO(data)).verify()
-                    except Exception:
-                        stats["pillow_failed"] += 1
-                        # всё равно принимаем файл
-
-                # Уникальное имя
-                safe_base = slugify(base) or "image"
-                filename = f"{safe_base}{ext}"
-                filename = default_storage.get_available_name(filename)
-
-                # Сохраняем запись (alt пустой)
-                obj = ProjectDetailGridImage(
-                    project=project,
-                    order=max_order + 1,
-                    alt="",
-                )
-                obj.image.save(filename, ContentFile(data), save=True)
-                max_order += 1
-                created += 1
-                stats["saved"] += 1
-
-            zf.close()
-
-            if created:
-                messages.success(request, _(f"Додано зображень до полотна: {created}."))
-            else:
-                messages.warning(request, _("У архіві не знайдено зображень (jpg/jpeg/png/webp)."))
-
-            # Диагностика
-            messages.info(
-                request,
-                _(
-                    "Підсумок: всього файлів: {total}, папок: {dirs}, macOS: {macosx}, ._форки: {hiddenfork}, "
-                    "інший розширення: {bad_ext}, порожніх/недоступних: {empty}, Pillow помилок: {pillow_failed}, збережено: {saved}"
-                ).format(**stats)
-            )
-
-            return redirect(
-                "admin:%s_%s_change" % (self.model._meta.app_label, self.model._meta.model_name),
-                object_id,
-            )
+            job = jobs.enqueue("grid_zip", project=project, file=form.cleaned_data["zip_file"], user=request.user)
+            messages.info(request, _("Архів прийнято, обробка йде у фоні."))
+            return self._redirect_to_job(project, job)
 
         # GET → форма
         form = BulkGridUploadForm()
         return self._render_bulk_upload_form(request, project, form)
 
+    # --- Статус фоновой задачи
+    def job_status(self, request, object_id: int, job_id: int):
+        project = get_object_or_404(ProjectDetail, pk=object_id)
+        job = get_object_or_404(AdminJob, pk=job_id, project=project)
+        if job.status == AdminJob.STATUS_DONE and job.kind == "grid_zip":
+            summary = _(
+                "Підсумок: всього файлів: {total}, папок: {dirs}, macOS: {macosx}, ._форки: {hiddenfork}, "
+                "інший розширення: {bad_ext}, порожніх/недоступних: {empty}, завеликих: {too_large}, "
+                "Pillow помилок: {pillow_failed}, не збережено через помилку: {failed}, збережено: {saved}"
+            ).format(**{**bulk_upload.empty_stats(), **job.stats})
+        elif job.status == AdminJob.STATUS_DONE and job.kind == "clear_grid":
+            summary = _("Видалено {deleted} зображень з полотна.").format(**job.stats)
+        else:
+            summary = ""
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "original": project,
+            "title": _("Фонова задача #%(id)s") % {"id": job.pk},
+            "job": job,
+            "summary": summary,
+        }
+        return render(request, "admin/projectdetail/job_status.html", context)
+
+    def _redirect_to_job(self, project, job):
+        return redirect(
+            "admin:%s_%s_job_status" % (self.model._meta.app_label, self.model._meta.model_name),
+            project.pk, job.pk,
+        )
+
     def _render_bulk_upload_form(self, request, project, form):
         context = {
             **self.admin_site.each_context(request),
@@ -289,23 +481,24 @@ class ProjectDetailAdmin(admin.ModelAdmin):
         return render(request, "admin/projectdetail/bulk_upload_images.html", context)
 
 
-class ProjectImageInline(admin.TabularInline):
+class ProjectImageInline(ReorderInlineMixin, ImageInlineMixin, admin.TabularInline):
     model = ProjectImage
     extra = 0
-    fields = ("image", "alt", "order")
+    fields = ("thumbnail", "image", "alt", "order")
     ordering = ("order", "id")
     show_change_link = True
 
-class ProjectBadgeInline(admin.TabularInline):
+class ProjectBadgeInline(ReorderInlineMixin, admin.TabularInline):
     model = ProjectBadge
+    formset = ParentCachedInlineFormSet
     extra = 0
     fields = ("text", "order")
     ordering = ("order", "id")
 
 # main/admin.py (фрагмент)
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
-    list_display = ("title", "is_published", "order", "is_reverse",
+class ProjectAdmin(ReorderAdminMixin, admin.ModelAdmin):
+    list_display = ("title", "units_list", "is_published", "order", "is_reverse",
                     "is_reverse_platform", "is_reverse_education", "is_reverse_sport")
     list_filter = ("is_published",)
     search_fields = ("title", "description", "goal", "partners", "results")
@@ -315,22 +508,26 @@ class ProjectAdmin(admin.ModelAdmin):
     ordering = ("order", "id")
     autocomplete_fields = ("detail",)
 
+    def get_queryset(self, request):
+        # units_list в списке: один запрос на все строки вместо запроса на строку
+        return super().get_queryset(request).prefetch_related("units")
 
     def units_list(self, obj):
         return ", ".join(u.name for u in obj.units.all())
 
-    units_list.short_description = "Підрозділи"
+    units_list.short_description = _("Підрозділи")
 
-class NewsImageInline(admin.TabularInline):
+class NewsImageInline(ReorderInlineMixin, ImageInlineMixin, admin.TabularInline):
     model = NewsImage
     extra = 1
-    fields = ("image", "alt", "order")
+    fields = ("thumbnail", "image", "alt", "order")
     ordering = ("order",)
 
 @admin.register(NewsArticle)
-class NewsArticleAdmin(admin.ModelAdmin):
-    list_display = ("title", "published_at", "is_published")
-    list_filter = ("is_published", "published_at", "author")
+class NewsArticleAdmin(ReorderAdminMixin, admin.ModelAdmin):
+    list_display = ("title", "author_display", "published_at", "is_published")
+    list_filter = ("is_published", "published_at", ("author", admin.RelatedOnlyFieldListFilter))
+    list_select_related = ("author",)
     search_fields = ("title", "lead", "body", "author_name")
     prepopulated_fields = {"slug": ("title",)}
     readonly_fields = ("created_at", "updated_at")
@@ -344,3 +541,7 @@ class NewsArticleAdmin(admin.ModelAdmin):
         (_("SEO/OG"), {"fields": ("seo_title", "seo_description", "og_image")}),
         (_("Служебні"), {"fields": ("created_at", "updated_at")}),
     )
+
+    @admin.display(description=_("Автор"), ordering="author_name")
+    def author_display(self, obj):
+        return obj.display_author
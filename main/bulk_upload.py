@@ -0,0 +1,237 @@
+"""
+Массовая загрузка «полотна» (ProjectDetailGridImage) из ZIP.
+
+Память ограничена независимо от размера архива:
+- архив лежит на диске (TemporaryUploadedFile или копия чанками во временный файл);
+- каждый файл из архива копируется во временную папку кусками BULK_UPLOAD_CHUNK_SIZE;
+- проверка Pillow, размеры, сохранение в storage и адаптивные варианты идут
+  в пуле из BULK_UPLOAD_WORKERS потоков, в работе не больше 2×workers файлов;
+- строки вставляются одним bulk_create в конце;
+- размер распаковки ограничен: файл — BULK_UPLOAD_MAX_FILE_SIZE, весь архив —
+  BULK_UPLOAD_MAX_TOTAL_SIZE (по заголовкам ZIP; больше заявленного ZipFile не отдаёт).
+
+Ошибка на одном файле (storage, диск) не прерывает загрузку: файл считается в
+``failed``, уже сохранённое для него удаляется, остальные строки создаются.
+"""
+import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from zipfile import ZipFile, BadZipFile
+import zlib
+
+from django.conf import settings
+from django.core.files import File
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from . import images, pagecache
+from .models import ProjectDetail, ProjectDetailGridImage
+
+try:
+    from PIL import Image  # Pillow для мягкой проверки
+    PIL_AVAILABLE = True
+except Exception:
+    PIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_EXT = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def empty_stats():
+    return {
+        "total": 0, "dirs": 0, "macosx": 0, "hiddenfork": 0,
+        "bad_ext": 0, "empty": 0, "too_large": 0, "pillow_failed": 0, "failed": 0, "saved": 0,
+    }
+
+
+def _chunk_size():
+    return getattr(settings, "BULK_UPLOAD_CHUNK_SIZE", 1024 * 1024)
+
+
+def _discard(rows):
+    """Удаляет из storage файлы строк, которые так и не попали в БД."""
+    for obj in rows:
+        try:
+            images.delete_variants(obj.image.storage, obj.variants)
+            obj.image.storage.delete(obj.image.name)
+        except OSError:
+            logger.warning("Не вдалося видалити %s", obj.image.name, exc_info=True)
+
+
+def _spool_archive(uploaded, tmpdir):
+    """Путь к архиву на диске; маленькие загрузки из памяти сбрасываем во временный файл."""
+    if hasattr(uploaded, "temporary_file_path"):
+        return uploaded.temporary_file_path()
+    try:
+        return uploaded.path  # FieldFile на локальном storage (архив фоновой задачи)
+    except (AttributeError, NotImplementedError):
+        pass
+    path = os.path.join(tmpdir, "archive.zip")
+    with open(path, "wb") as out:
+        for chunk in uploaded.chunks(_chunk_size()):
+            out.write(chunk)
+    return path
+
+
+def _process_member(tmp_path, filename, order):
+    """
+    Выполняется в пуле: мягкая проверка Pillow, размеры, сохранение оригинала
+    и генерация вариантов. Возвращает готовую (несохранённую) строку и флаг ошибки Pillow.
+    """
+    obj = ProjectDetailGridImage(alt="", order=order)
+    field = obj._meta.get_field("image")
+    pillow_failed = False
+
+    if PIL_AVAILABLE:
+        try:
+            with Image.open(tmp_path) as img:
+                obj.width, obj.height = img.size
+                img.verify()
+        except Exception:
+            pillow_failed = True  # всё равно принимаем файл
+            obj.width = obj.height = None
+
+    try:
+        obj.file_size = os.path.getsize(tmp_path)
+        with open(tmp_path, "rb") as fh:
+            obj.image.name = field.storage.save(field.generate_filename(obj, filename), File(fh))
+    except Exception:
+        if obj.image.name:
+            _discard([obj])
+        raise
+    os.remove(tmp_path)
+
+    if not pillow_failed:
+        try:
+            obj.variants = images.build_variants(obj.image)
+        except Exception:
+            obj.variants = {}
+    return obj, pillow_failed
+
+
+def ingest_grid_zip(project, uploaded, progress=None):
+    """
+    Разбирает ZIP и добавляет изображения в конец полотна проекта.
+    Возвращает словарь статистики (см. empty_stats). BadZipFile пробрасывается наверх.
+    ``progress(processed, total)`` — необязательный колбэк для отчёта о ходе работы.
+    """
+    stats = empty_stats()
+    workers = max(1, getattr(settings, "BULK_UPLOAD_WORKERS", 4))
+    chunk = _chunk_size()
+    max_file = getattr(settings, "BULK_UPLOAD_MAX_FILE_SIZE", 50 * 1024 * 1024)
+    max_total = getattr(settings, "BULK_UPLOAD_MAX_TOTAL_SIZE", 4 * 1024 ** 3)
+
+    with tempfile.TemporaryDirectory(prefix="grid-zip-", dir=getattr(settings, "FILE_UPLOAD_TEMP_DIR", None)) as tmpdir:
+        with ZipFile(_spool_archive(uploaded, tmpdir)) as zf:
+            infos = zf.infolist()
+            files_total = sum(1 for i in infos if not i.is_dir())
+            unpacked = sum(i.file_size for i in infos if not i.is_dir() and i.file_size <= max_file)
+            if unpacked > max_total:
+                raise ValueError(f"Архів розпаковується у {unpacked / 1024 ** 2:.0f} MB, "
+                                 f"більше за ліміт {max_total / 1024 ** 2:.0f} MB.")
+
+            max_order = (
+                ProjectDetailGridImage.objects.filter(project=project)
+                .aggregate(max_o=models.Max("order"))["max_o"]
+                or 0
+            )
+
+            rows = []
+            processed = 0
+
+            def collect(done):
+                nonlocal processed
+                for fut in done:
+                    try:
+                        obj, pillow_failed = fut.result()
+                    except Exception:
+                        logger.exception("Файл з архіву не збережено")
+                        stats["failed"] += 1
+                        processed += 1
+                        continue
+                    rows.append(obj)
+                    if pillow_failed:
+                        stats["pillow_failed"] += 1
+                    processed += 1
+                if progress:
+                    progress(processed, files_total)
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                pending = set()
+                for index, info in enumerate(infos):
+                    member = info.filename
+                    # Папка?
+                    if info.is_dir():
+                        stats["dirs"] += 1
+                        continue
+                    stats["total"] += 1
+
+                    # Мусор macOS
+                    top = member.split("/", 1)[0]
+                    name_in_zip = os.path.basename(member)
+                    if top == "__MACOSX":
+                        stats["macosx"] += 1
+                        processed += 1
+                        continue
+                    if name_in_zip.startswith("._"):
+                        stats["hiddenfork"] += 1
+                        processed += 1
+                        continue
+
+                    base, ext = os.path.splitext(name_in_zip)
+                    ext = (ext or "").lower().strip()
+                    if ext not in ALLOWED_EXT:
+                        stats["bad_ext"] += 1
+                        processed += 1
+                        continue
+                    if info.file_size == 0:
+                        stats["empty"] += 1
+                        processed += 1
+                        continue
+                    if info.file_size > max_file:
+                        stats["too_large"] += 1
+                        processed += 1
+                        continue
+
+                    # Потоково распаковываем во временный файл
+                    tmp_path = os.path.join(tmpdir, f"{index}{ext}")
+                    try:
+                        with zf.open(info) as src, open(tmp_path, "wb") as dst:
+                            shutil.copyfileobj(src, dst, chunk)
+                    except (BadZipFile, zlib.error, OSError, EOFError):
+                        stats["empty"] += 1
+                        processed += 1
+                        continue
+
+                    # Ограничиваем число файлов «в работе»
+                    if len(pending) >= workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+
+                    max_order += 1
+                    safe_base = slugify(base) or "image"
+                    pending.add(pool.submit(_process_member, tmp_path, f"{safe_base}{ext}", max_order))
+
+                done, _ = wait(pending)
+                collect(done)
+
+    for obj in rows:
+        obj.project = project
+    rows.sort(key=lambda o: o.order)
+
+    try:
+        with transaction.atomic():
+            ProjectDetailGridImage.objects.bulk_create(rows, batch_size=500)
+            # bulk_create не шлёт сигналов — сами обновляем валидаторы и кеш страницы
+            ProjectDetail.objects.filter(pk=project.pk).update(updated_at=timezone.now())
+            transaction.on_commit(lambda: pagecache.invalidate(f"project_detail:{project.slug}"))
+    except Exception:
+        _discard(rows)
+        raise
+
+    stats["saved"] = len(rows)
+    return stats
@@ -0,0 +1,113 @@
+"""
+Условный GET (ETag / Last-Modified → 304) для детальных страниц.
+
+Валидатор страницы — ``updated_at`` её строки. Дочерние строки (фото, полотно,
+карточка проекта, бейджи) своих меток времени не имеют, поэтому при их
+изменении «трогаем» ``updated_at`` родителя (см. ``touch_parent`` и
+main/signals.py). Так проверка стоит один лёгкий запрос и делается до
+рендеринга шаблона.
+"""
+import hashlib
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language
+
+
+def touch_parent(instance):
+    """Обновляет updated_at страницы, на которой показан дочерний объект."""
+    from .models import (Project, ProjectImage, ProjectBadge, OrgUnit, ProjectDetail,
+                         ProjectDetailImage, ProjectDetailGridImage, NewsArticle, NewsImage)
+
+    now = timezone.now()
+    if isinstance(instance, ProjectDetailImage):
+        ProjectDetail.objects.filter(pk=instance.detail_id).update(updated_at=now)
+    elif isinstance(instance, ProjectDetailGridImage):
+        ProjectDetail.objects.filter(pk=instance.project_id).update(updated_at=now)
+    elif isinstance(instance, Project):
+        if instance.detail_id:
+            ProjectDetail.objects.filter(pk=instance.detail_id).update(updated_at=now)
+    elif isinstance(instance, (ProjectImage, ProjectBadge)):
+        ProjectDetail.objects.filter(project__pk=instance.project_id).update(updated_at=now)
+    elif isinstance(instance, OrgUnit):
+        ProjectDetail.objects.filter(project__units=instance).update(updated_at=now)
+    elif isinstance(instance, NewsImage):
+        NewsArticle.objects.filter(pk=instance.article_id).update(updated_at=now)
+
+
+def make_etag(*parts):
+    return hashlib.md5("|".join(str(p) for p in parts).encode()).hexdigest()
+
+
+class ConditionalGetMixin:
+    """
+    Миксин для DetailView: ``get_validators()`` возвращает (etag, last_modified)
+    или None (объекта нет — пусть вьюха отдаст 404 как обычно).
+    Ставится в MRO раньше CachedPageMixin, чтобы 304 не трогал и кеш.
+    """
+
+    def get_validators(self):
+        return None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+        validators = self.get_validators()
+        if validators is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        etag = quote_etag(make_etag(get_language(), etag))
+        last_modified = int(last_modified.timestamp())  # HTTP-даты с точностью до секунды
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response.headers.setdefault("ETag", etag)
+            response.headers.setdefault("Last-Modified", http_date(last_modified))
+            # тот же Vary, что у полного ответа (язык + CSRF-токен формы языка в cookie)
+            patch_vary_headers(response, ("Accept-Language", "Cookie"))
+        return response
+
+
+def news_validators(slug):
+    """
+    Страница новости — сама статья и её «Також подивіться» (RelatedArticle).
+    Валидатор — updated_at статьи и видимых похожих; их id входят в ETag, так
+    что смена состава блока тоже меняет ETag. Один запрос по индексам
+    (slug, article/rank), без агрегатов по всей таблице.
+    """
+    from .models import NewsArticle, RelatedArticle
+
+    visible = Q(is_published=True, published_at__lte=timezone.now())
+    related = RelatedArticle.objects.filter(article__slug=slug).values("related_id")
+    rows = list(NewsArticle.objects
+                .filter(visible & (Q(slug=slug) | Q(pk__in=related)))
+                .order_by("pk")
+                .values_list("slug", "pk", "updated_at"))
+    if not any(row_slug == slug for row_slug, _pk, _updated in rows):
+        return None
+    last_modified = max(updated for _slug, _pk, updated in rows)
+    parts = ",".join(f"{pk}@{updated.isoformat()}" for _slug, pk, updated in rows)
+    return f"news:{slug}:{parts}", last_modified
+
+
+def news_related_slugs(slug):
+    """Слаги статей блока «Також подивіться» — теги кеша страницы новости."""
+    from .models import RelatedArticle
+
+    return list(RelatedArticle.objects.filter(article__slug=slug).values_list("related__slug", flat=True))
+
+
+def project_detail_validators(slug):
+    from .models import ProjectDetail
+
+    updated_at = (ProjectDetail.objects
+                  .filter(slug=slug, is_published=True)
+                  .values_list("updated_at", flat=True)
+                  .first())
+    if updated_at is None:
+        return None
+    return f"project_detail:{slug}:{updated_at.isoformat()}", updated_at
@@ -0,0 +1,190 @@
+"""
+Critical CSS: правила, нужные первому экрану страницы, инлайнятся в <head>,
+а полные таблицы стилей грузятся асинхронно (preload → stylesheet).
+
+``manage.py build_critical_css`` рендерит публичные страницы (текущая БД или
+фикстура во временной БД), берёт разметку первого экрана — шапку и первую
+секцию контента — и оставляет из таблиц стилей страницы только правила,
+чьи классы/id/теги там встречаются (main/css.py). Результат пишется в
+CRITICAL_CSS_ROOT: ``<key>.css`` + ``index.json`` с хешами исходных файлов.
+
+``{% critical_css key "css/styles.css" "css/main/news.css" %}`` инлайнит
+сохранённый CSS, только если хеши исходников совпадают; после правки CSS до
+пересборки страница получает обычные блокирующие <link>.
+"""
+import hashlib
+import json
+import os
+from html.parser import HTMLParser
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.urls import reverse
+
+from . import css
+
+INDEX_FILE = "index.json"
+
+# key → источники, с которыми тег рендерился (заполняется при рендере, читает команда сборки)
+requested = {}
+
+_hash_cache = {}   # path → (mtime, hash)
+_index_cache = {}  # "index" → (mtime, данные)
+
+
+def _root():
+    return Path(getattr(settings, "CRITICAL_CSS_ROOT", Path(settings.BASE_DIR) / "critical_css"))
+
+
+def source_hash(path):
+    """Хеш исходного CSS из STATICFILES_DIRS/приложений; пересчёт только при смене mtime."""
+    found = finders.find(path)
+    if not found:
+        return None
+    mtime = os.stat(found).st_mtime_ns
+    cached = _hash_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(found, "rb") as fh:
+        digest = hashlib.sha256(fh.read()).hexdigest()[:16]
+    _hash_cache[path] = (mtime, digest)
+    return digest
+
+
+def load_index():
+    path = _root() / INDEX_FILE
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return {}
+    cached = _index_cache.get("index")
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        data = {}
+    _index_cache["index"] = (mtime, data)
+    return data
+
+
+def get(key, sources):
+    """Сохранённый critical CSS или None, если его нет или исходники изменились."""
+    entry = load_index().get(key)
+    if not entry:
+        return None
+    if entry.get("sources") != {s: source_hash(s) for s in sources}:
+        return None
+    try:
+        return (_root() / entry["file"]).read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+# --- Сборка
+
+def pages():
+    """key → URL страницы для рендера. Детальные — по первому опубликованному объекту."""
+    from .models import NewsArticle, ProjectDetail
+
+    urls = {
+        "index": reverse("index"),
+        "projects": reverse("projects"),
+        "go-spilna-peremoga": reverse("go-spilna-peremoga"),
+        "go-creative-agency": reverse("go-creative-agency"),
+        "go-sp-production": reverse("go-sp-production"),
+        "news_list": reverse("list"),
+        "search": reverse("search") + "?q=news",
+    }
+    detail = ProjectDetail.objects.filter(is_published=True).only("slug").first()
+    if detail:
+        urls["project_detail"] = reverse("project_detail", kwargs={"slug": detail.slug})
+    article = NewsArticle.objects.filter(is_published=True).only("slug").first()
+    if article:
+        urls["news_detail"] = reverse("detail", kwargs={"slug": article.slug})
+    return urls
+
+
+class FoldCollector(HTMLParser):
+    """
+    Классы, id и теги первого экрана: всё от <body> до конца первой секции
+    контента после шапки (<section>/<article>), но не больше max_elements.
+    """
+    CONTENT_TAGS = ("section", "article")
+    VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+    def __init__(self, max_elements):
+        super().__init__(convert_charrefs=True)
+        self.max_elements = max_elements
+        self.tags, self.classes, self.ids = set(), set(), set()
+        self.in_body = False
+        self.done = False
+        self.stack = []
+        self.header_depth = None
+        self.content_depth = None
+        self.count = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "body":
+            self.in_body = True
+        if self.done or not self.in_body:
+            return
+        self.count += 1
+        if self.count > self.max_elements:
+            self.done = True
+            return
+        attrs = dict(attrs)
+        self.tags.add(tag)
+        self.classes.update((attrs.get("class") or "").split())
+        if attrs.get("id"):
+            self.ids.add(attrs["id"])
+        if tag in self.VOID_TAGS:
+            return
+        self.stack.append(tag)
+        if tag in ("header", "nav") and self.header_depth is None and self.content_depth is None:
+            self.header_depth = len(self.stack)
+        elif tag in self.CONTENT_TAGS and self.header_depth is None and self.content_depth is None:
+            self.content_depth = len(self.stack)
+
+    def handle_endtag(self, tag):
+        if self.done or not self.in_body or tag not in self.stack:
+            return
+        while self.stack:
+            depth = len(self.stack)
+            if self.stack.pop() == tag:
+                break
+        if self.header_depth is not None and depth <= self.header_depth:
+            self.header_depth = None
+        if self.content_depth is not None and depth <= self.content_depth:
+            self.done = True
+
+    def matches(self, selector):
+        tags, classes, ids = css.requirements(selector)
+        tags -= {"html", "body"}  # всегда есть на странице
+        return tags <= self.tags and classes <= self.classes and ids <= self.ids
+
+
+def extract(html, sources):
+    """Critical CSS страницы: правила источников, совпадающие с разметкой первого экрана."""
+    fold = FoldCollector(getattr(settings, "CRITICAL_CSS_MAX_ELEMENTS", 400))
+    fold.feed(html)
+    chunks = []
+    for source in sources:
+        found = finders.find(source)
+        if not found:
+            continue
+        nodes = css.parse(Path(found).read_text(encoding="utf-8"))
+        chunks.append(css.serialize(css.drop_unused_keyframes(css.filter_rules(nodes, fold.matches))))
+    return "".join(chunks)
+
+
+def write(key, sources, critical):
+    root = _root()
+    root.mkdir(parents=True, exist_ok=True)
+    (root / f"{key}.css").write_text(critical, encoding="utf-8")
+    index = load_index().copy()
+    index[key] = {"file": f"{key}.css", "sources": {s: source_hash(s) for s in sources}, "bytes": len(critical.encode())}
+    tmp = root / f"{INDEX_FILE}.tmp"
+    tmp.write_text(json.dumps(index, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, root / INDEX_FILE)
@@ -0,0 +1,196 @@
+"""
+Минимальный разбор CSS для сборочных шагов (critical CSS, чистка неиспользуемых
+селекторов): правила и вложенные @media/@supports, селекторы → нужные им
+классы/id/теги. Это не полноценный парсер — его хватает на наши таблицы стилей
+и он не тянет зависимостей.
+"""
+import re
+from collections import namedtuple
+
+# prelude — селектор или "@media ...", body — текст декларации (для правил и
+# @font-face/@keyframes), children — вложенные узлы у группирующих at-rules
+Node = namedtuple("Node", "prelude body children")
+
+GROUP_AT_RULES = ("@media", "@supports", "@container", "@layer", "@document")
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_SPACE_RE = re.compile(r"\s+")
+_CLASS_RE = re.compile(r"\.((?:[\w-]|\\.)+)")
+_ID_RE = re.compile(r"#((?:[\w-]|\\.)+)")
+_TAG_RE = re.compile(r"(?:^|[\s>+~(])([a-zA-Z][\w-]*)")
+_PSEUDO_RE = re.compile(r"::?[\w-]+")
+_ATTR_RE = re.compile(r"\[[^\]]*\]")
+_FUNC_PSEUDO = (":not(", ":is(", ":where(", ":has(", ":nth-child(", ":nth-last-child(", ":nth-of-type(",
+                ":nth-last-of-type(", ":lang(", ":dir(", ":host(", ":host-context(", "::part(", "::slotted(")
+_KEYFRAMES_RE = re.compile(r"^@(?:-\w+-)?keyframes\s+(\S+)", re.I)
+_ANIMATION_RE = re.compile(r"animation(?:-name)?\s*:\s*([^;}]+)", re.I)
+
+
+def _scan(text, start, stops):
+    """Индекс первого символа из stops вне строк и скобок (или len)."""
+    quote, depth, i = None, 0, start
+    while i < len(text):
+        ch = text[i]
+        if quote:
+            if ch == "\\":
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif depth == 0 and ch in stops:
+            return i
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth = max(depth - 1, 0)
+        i += 1
+    return len(text)
+
+
+def _block_end(text, start):
+    """start — позиция после '{'; возвращает позицию парной '}'."""
+    level, i = 1, start
+    while i < len(text):
+        i = _scan(text, i, "{}")
+        if i >= len(text):
+            break
+        level += 1 if text[i] == "{" else -1
+        if level == 0:
+            return i
+        i += 1
+    return len(text)
+
+
+def _squash(text):
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def parse(text):
+    text = _COMMENT_RE.sub("", text)
+    return _parse(text, 0, len(text))
+
+
+def _parse(text, start, end):
+    nodes, i = [], start
+    while i < end:
+        stop = min(_scan(text, i, "{;}"), end)
+        prelude = _squash(text[i:stop])
+        if stop >= end:
+            break
+        if text[stop] in ";}":
+            if prelude.startswith("@"):
+                nodes.append(Node(prelude, None, None))  # @import/@charset/@layer a, b;
+            i = stop + 1
+            continue
+        close = min(_block_end(text, stop + 1), end)
+        if prelude.lower().startswith(GROUP_AT_RULES):
+            nodes.append(Node(prelude, None, _parse(text, stop + 1, close)))
+        elif prelude:
+            nodes.append(Node(prelude, _squash(text[stop + 1:close]).rstrip(";"), None))
+        i = close + 1
+    return nodes
+
+
+def serialize(nodes):
+    out = []
+    for node in nodes:
+        if node.children is not None:
+            out.append(f"{node.prelude}{{{serialize(node.children)}}}")
+        elif node.body is None:
+            out.append(f"{node.prelude};")
+        else:
+            out.append(f"{node.prelude}{{{node.body}}}")
+    return "".join(out)
+
+
+def split_selectors(prelude):
+    parts, i = [], 0
+    while i <= len(prelude):
+        stop = _scan(prelude, i, ",")
+        parts.append(prelude[i:stop].strip())
+        i = stop + 1
+    return [p for p in parts if p]
+
+
+def _strip_functional_pseudo(selector):
+    """:not(.a), :is(.b) и т.п. не сужают совпадение — их аргументы не требуем."""
+    lowered = selector.lower()
+    for name in _FUNC_PSEUDO:
+        pos = lowered.find(name)
+        while pos != -1:
+            close = _scan(selector, pos + len(name), ")")
+            selector = selector[:pos] + selector[close + 1:]
+            lowered = selector.lower()
+            pos = lowered.find(name)
+    return selector
+
+
+def _unescape(name):
+    return name.replace("\\", "")
+
+
+def requirements(selector):
+    """(теги, классы, id), без которых селектор не может совпасть ни с чем."""
+    selector = _ATTR_RE.sub("", _strip_functional_pseudo(selector))
+    selector = _PSEUDO_RE.sub("", selector)
+    classes = {_unescape(c) for c in _CLASS_RE.findall(selector)}
+    ids = {_unescape(i) for i in _ID_RE.findall(selector)}
+    bare = _ID_RE.sub(" ", _CLASS_RE.sub(" ", selector))
+    tags = {t.lower() for t in _TAG_RE.findall(bare)}
+    return tags, classes, ids
+
+
+def is_rule(node):
+    return node.children is None and node.body is not None and not node.prelude.startswith("@")
+
+
+def filter_rules(nodes, keep_selector):
+    """
+    Оставить в правилах только селекторы, для которых keep_selector(selector)
+    истинно; пустые правила и группы выбрасываются. @font-face, @keyframes,
+    @import и прочие at-rules сохраняются как есть.
+    """
+    result = []
+    for node in nodes:
+        if node.children is not None:
+            children = filter_rules(node.children, keep_selector)
+            if children:
+                result.append(node._replace(children=children))
+        elif is_rule(node):
+            selectors = [s for s in split_selectors(node.prelude) if keep_selector(s)]
+            if selectors:
+                result.append(node._replace(prelude=",".join(selectors)))
+        else:
+            result.append(node)
+    return result
+
+
+def drop_unused_keyframes(nodes):
+    """Убрать @keyframes, на которые не ссылается ни одно оставшееся правило."""
+    used = set()
+
+    def collect(items):
+        for node in items:
+            if node.children is not None:
+                collect(node.children)
+            elif is_rule(node):
+                for value in _ANIMATION_RE.findall(node.body):
+                    used.update(value.replace(",", " ").split())
+
+    def prune(items):
+        result = []
+        for node in items:
+            match = _KEYFRAMES_RE.match(node.prelude)
+            if match and node.children is None and match.group(1) not in used:
+                continue
+            if node.children is not None:
+                children = prune(node.children)
+                if not children:
+                    continue
+                node = node._replace(children=children)
+            result.append(node)
+        return result
+
+    collect(nodes)
+    return prune(nodes)
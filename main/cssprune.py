@@ -0,0 +1,116 @@
+"""
+Чистка неиспользуемых селекторов в наших таблицах стилей (``manage.py prune_css``).
+
+«Используемые» имена — все слова из шаблонов проекта, статических JS и
+Python-кода приложения (классы из inline-скриптов, виджетов форм и т.п.
+так тоже попадают). Имя, к которому в коде приклеивается переменная
+(``"pjs-card--{{ kind }}"``, ``'is-' + state``, ``${prefix}``), считается
+префиксом. Селектор остаётся, если все его классы и id встречаются в коде или
+подходят под CSS_PRUNE_SAFELIST (классы, которые добавляют сторонние скрипты —
+Swiper, PhotoSwipe). Теги и @font-face/@keyframes не трогаем.
+
+Очищенные файлы пишутся в CSS_PRUNE_ROOT с теми же путями; в продакшене этот
+каталог стоит первым в STATICFILES_DIRS, и collectstatic берёт их вместо исходных.
+"""
+import re
+from fnmatch import fnmatch
+from pathlib import Path
+
+from django.conf import settings
+from django.template.utils import get_app_template_dirs
+
+from . import css
+
+_WORD_RE = re.compile(r"[A-Za-z_][\w-]*")
+# слово, к которому приклеена подстановка: шаблонная {{ }}, ${} в JS или конкатенация '...' +
+_PREFIX_RE = re.compile(r"([A-Za-z_][\w-]*[-_])(?:\{\{|\{%|\$\{|[\"'`]\s*\+)")
+
+CONTENT_SUFFIXES = (".html", ".txt", ".js", ".mjs", ".py")
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def source_root():
+    return Path(_setting("CSS_PRUNE_SOURCE", Path(settings.BASE_DIR) / "static"))
+
+
+def output_root():
+    return Path(_setting("CSS_PRUNE_ROOT", Path(settings.BASE_DIR) / "build" / "static"))
+
+
+def content_files():
+    """Шаблоны, JS и код приложений проекта (без site-packages)."""
+    base = Path(settings.BASE_DIR).resolve()
+    roots = [Path(d) for t in settings.TEMPLATES for d in t.get("DIRS", [])]
+    roots += [Path(d) for d in get_app_template_dirs("templates")]
+    roots += [source_root(), *(Path(d).parent for d in get_app_template_dirs("templates"))]
+    seen = set()
+    for root in roots:
+        root = root.resolve()
+        if not root.is_dir() or not root.is_relative_to(base):
+            continue
+        for path in root.rglob("*"):
+            if path.suffix in CONTENT_SUFFIXES and path.is_file() and path not in seen and "migrations" not in path.parts:
+                seen.add(path)
+                yield path
+
+
+class Usage:
+    """Слова и префиксы, встречающиеся в коде проекта."""
+
+    def __init__(self, words=(), prefixes=(), safelist=()):
+        self.words = set(words)
+        self.prefixes = tuple(sorted(set(prefixes)))
+        self.safelist = tuple(safelist)
+
+    @classmethod
+    def collect(cls):
+        words, prefixes = set(), set()
+        for path in content_files():
+            text = path.read_text(encoding="utf-8", errors="ignore")
+            words.update(_WORD_RE.findall(text))
+            prefixes.update(_PREFIX_RE.findall(text))
+        return cls(words, prefixes, _setting("CSS_PRUNE_SAFELIST", ()))
+
+    def has(self, name):
+        return (name in self.words
+                or name.startswith(self.prefixes)
+                or any(fnmatch(name, pattern) for pattern in self.safelist))
+
+    def keeps(self, selector):
+        _tags, classes, ids = css.requirements(selector)
+        return all(self.has(name) for name in classes | ids)
+
+
+def stylesheets():
+    """Пути CSS относительно source_root() из каталогов CSS_PRUNE_DIRS."""
+    root = source_root()
+    for directory in _setting("CSS_PRUNE_DIRS", ("css",)):
+        for path in sorted((root / directory).rglob("*.css")):
+            yield path.relative_to(root).as_posix()
+
+
+def prune(path, usage):
+    """
+    (очищенный CSS, удалённые селекторы) для файла path (относительно source_root()).
+    """
+    nodes = css.parse((source_root() / path).read_text(encoding="utf-8"))
+    removed = []
+
+    def keep(selector):
+        if usage.keeps(selector):
+            return True
+        removed.append(selector)
+        return False
+
+    pruned = css.drop_unused_keyframes(css.filter_rules(nodes, keep))
+    return css.serialize(pruned), removed
+
+
+def write(path, text):
+    target = output_root() / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(text, encoding="utf-8")
+    return target
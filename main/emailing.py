@@ -1,46 +1,152 @@
+from datetime import timedelta
+
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
 from django.template.loader import render_to_string
+from django.utils import timezone
 from django.utils.html import strip_tags
 
-def send_contact_emails(context: dict):
+from .models import OutboxEmail
+
+
+def contact_context(contact):
+    """Контекст шаблонов писем по сохранённому ContactMessage."""
+    return {
+        "first_name": contact.first_name,
+        "last_name": contact.last_name,
+        "email": contact.email,
+        "phone": contact.phone,
+        "subject": contact.subject,
+        "message": contact.message,
+        "ip": contact.ip,
+        "user_agent": contact.user_agent,
+    }
+
+
+def queue_contact_emails(contact, context: dict):
     """
-    Шлёт два письма:
+    Ставит в очередь (OutboxEmail) два письма:
     1) Менеджеру (CONTACT_RECIPIENT) — полная заявка.
     2) Автоответ пользователю — аккуратное подтверждение.
+
+    Ничего не отправляет: вызывать внутри той же транзакции, что и
+    сохранение ContactMessage, а доставкой займётся ``manage.py send_outbox``.
     """
     manager_to = getattr(settings, "CONTACT_RECIPIENT", None)
     if not manager_to:
         return False, "CONTACT_RECIPIENT is not set"
 
     # --- письмо менеджеру ---
-    subj_manager = f"[Contact] {context.get('subject', '(no subject)')}"
     html_manager = render_to_string("main/contact_to_manager.html", context)
-    text_manager = strip_tags(html_manager)
-
-    msg1 = EmailMultiAlternatives(
-        subject=subj_manager,
-        body=text_manager,
-        from_email=settings.DEFAULT_FROM_EMAIL,
+    rows = [OutboxEmail(
+        contact=contact,
+        subject=f"[Contact] {context.get('subject', '(no subject)')}",
         to=[manager_to],
-        reply_to=[context.get("email")] if context.get("email") else None,
-    )
-    msg1.attach_alternative(html_manager, "text/html")
-    msg1.send(fail_silently=False)
+        reply_to=[context["email"]] if context.get("email") else [],
+        body_text=strip_tags(html_manager),
+        body_html=html_manager,
+    )]
 
     # --- автоответ пользователю (не обязателен) ---
     user_email = context.get("email")
     if user_email:
-        subj_user = "Дякуємо за звернення — Spilna Peremoga"
         html_user = render_to_string("main/contact_autoreply.html", context)
-        text_user = strip_tags(html_user)
-        msg2 = EmailMultiAlternatives(
-            subject=subj_user,
-            body=text_user,
-            from_email=settings.DEFAULT_FROM_EMAIL,
+        rows.append(OutboxEmail(
+            contact=contact,
+            subject="Дякуємо за звернення — Spilna Peremoga",
             to=[user_email],
+            body_text=strip_tags(html_user),
+            body_html=html_user,
+        ))
+
+    OutboxEmail.objects.bulk_create(rows)
+    return True, "queued"
+
+
+def _as_message(row, connection):
+    msg = EmailMultiAlternatives(
+        subject=row.subject,
+        body=row.body_text,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=row.to,
+        reply_to=row.reply_to or None,
+        connection=connection,
+    )
+    if row.body_html:
+        msg.attach_alternative(row.body_html, "text/html")
+    return msg
+
+
+def _claim_batch(batch_size):
+    """
+    Забирает пачку готовых к отправке писем. Вместо отдельного статуса
+    «в процесі» сдвигаем next_attempt_at на время аренды: если воркер упадёт,
+    письма сами вернутся в очередь после EMAIL_OUTBOX_LEASE секунд.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=getattr(settings, "EMAIL_OUTBOX_LEASE", 300))
+    with transaction.atomic():
+        rows = list(
+            OutboxEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:batch_size]
         )
-        msg2.attach_alternative(html_user, "text/html")
-        msg2.send(fail_silently=True)
+        if rows:
+            OutboxEmail.objects.filter(pk__in=[r.pk for r in rows]).update(next_attempt_at=now + lease)
+    return rows
+
+
+def _record_failure(row, exc, max_attempts, backoff):
+    row.last_error = f"{type(exc).__name__}: {exc}"[:2000]
+    if row.attempts >= max_attempts:
+        row.status = OutboxEmail.STATUS_FAILED
+    else:
+        row.next_attempt_at = timezone.now() + timedelta(seconds=backoff * 2 ** (row.attempts - 1))
+    row.save(update_fields=["attempts", "status", "next_attempt_at", "last_error"])
+
+
+def deliver_outbox(batch_size=None):
+    """
+    Отправляет одну пачку писем через одно SMTP-соединение.
+    Неудачные — повторяем с экспоненциальной задержкой, после
+    EMAIL_OUTBOX_MAX_ATTEMPTS попыток помечаем как failed.
+    Возвращает (отправлено, ошибок).
+    """
+    batch_size = batch_size or getattr(settings, "EMAIL_OUTBOX_BATCH_SIZE", 50)
+    max_attempts = getattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 6)
+    backoff = getattr(settings, "EMAIL_OUTBOX_BACKOFF", 60)
+
+    rows = _claim_batch(batch_size)
+    if not rows:
+        return 0, 0
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        # SMTP недоступен — вся пачка уходит на повтор
+        for row in rows:
+            row.attempts += 1
+            _record_failure(row, exc, max_attempts, backoff)
+        return 0, len(rows)
 
-    return True, "ok"
+    sent = failed = 0
+    try:
+        for row in rows:
+            row.attempts += 1
+            try:
+                _as_message(row, connection).send()
+            except Exception as exc:
+                failed += 1
+                _record_failure(row, exc, max_attempts, backoff)
+            else:
+                sent += 1
+                row.status = OutboxEmail.STATUS_SENT
+                row.sent_at = timezone.now()
+                row.last_error = ""
+                row.save(update_fields=["attempts", "status", "sent_at", "last_error"])
+    finally:
+        connection.close()
+    return sent, failed
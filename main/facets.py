@@ -0,0 +1,65 @@
+"""
+Фасетный фильтр проектов по подразделениям (?unit=slug / ?units=a,b).
+
+Принадлежность опубликованных проектов подразделениям (unit → id проектов)
+собирается двумя запросами и кешируется под версией тега ``projects`` — она
+меняется при сохранении проекта, подразделения и изменении Project.units
+(см. main/pagecache.py, main/signals.py). Счётчики для любой выборки
+считаются из этой карты без запросов; сам список проектов фильтруется
+полусоединением (EXISTS), без DISTINCT по M2M-join.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+
+from . import pagecache
+from .models import OrgUnit, Project
+
+
+def selected_slugs(params):
+    unit = params.get("unit")
+    if unit:
+        return [unit.strip()]
+    return [s.strip() for s in params.get("units", "").split(",") if s.strip()]
+
+
+def membership():
+    """[{"slug", "name", "projects": set(id)}] в порядке OrgUnit.Meta.ordering."""
+    key = f"projects:facets:{pagecache.tag_version('projects')}"
+    units = cache.get(key)
+    if units is None:
+        projects = {}
+        for unit_id, project_id in (Project.units.through.objects
+                                    .filter(project__is_published=True)
+                                    .values_list("orgunit_id", "project_id")):
+            projects.setdefault(unit_id, set()).add(project_id)
+        units = [{"slug": u.slug, "name": u.name, "projects": projects.get(u.pk, set())}
+                 for u in OrgUnit.objects.only("slug", "name")]
+        cache.set(key, units, getattr(settings, "PAGE_CACHE_TIMEOUT", 600))
+    return units
+
+
+def filter_projects(queryset, slugs):
+    if not slugs:
+        return queryset
+    in_units = Project.units.through.objects.filter(project_id=OuterRef("pk"), orgunit__slug__in=slugs)
+    return queryset.filter(Exists(in_units))
+
+
+def facet_counts(slugs):
+    """
+    Для каждого подразделения: ``count`` — всего опубликованных проектов,
+    ``selected_count`` — сколько из них входит в текущую выборку.
+    """
+    units = membership()
+    active = set(slugs)
+    selection = None
+    if active:
+        selection = set().union(*(u["projects"] for u in units if u["slug"] in active))
+    return [{
+        "slug": u["slug"],
+        "name": u["name"],
+        "count": len(u["projects"]),
+        "selected_count": len(u["projects"] & selection) if selection is not None else len(u["projects"]),
+        "active": u["slug"] in active,
+    } for u in units]
@@ -1,6 +1,7 @@
 from django import forms
 from django.utils.translation import gettext_lazy as _
 from .models import ContactMessage
+from . import spam
 import re
 
 _NAME_RE = re.compile(r"^[A-Za-zА-Яа-яЁёІіЇїЄєҐґ'’\-\s]+$")
@@ -12,6 +13,8 @@ def _normalize_ws(value: str) -> str:
 class ContactForm(forms.ModelForm):
     # honeypot (має бути порожнім)
     website = forms.CharField(required=False, widget=forms.HiddenInput)
+    # підписаний час відкриття форми (див. main/spam.py)
+    started = forms.CharField(required=False, widget=forms.HiddenInput)
 
     class Meta:
         model = ContactMessage
@@ -35,6 +38,7 @@ class ContactForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.fields["started"].initial = spam.issue_token()
         # робимо обов'язковими ключові поля (на випадок, якщо в моделі вони optional)
         self.fields["first_name"].required = True
         self.fields["email"].required = True
@@ -44,11 +48,9 @@ class ContactForm(forms.ModelForm):
         self.fields["subject"].max_length = 120
         self.fields["message"].max_length = 4000
 
-    # ----- Поле honeypot
+    # ----- Поле honeypot: не помилка форми — бот отримує звичайну відповідь, а spam.score_inline відкидає
     def clean_website(self):
-        if self.cleaned_data.get("website"):
-            raise forms.ValidationError(_("Виявлено спам."))
-        return ""
+        return self.cleaned_data.get("website", "")
 
     # ----- Ім'я
     def clean_first_name(self):
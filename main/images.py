@@ -0,0 +1,180 @@
+"""
+Адаптивные производные изображений (WebP/AVIF нескольких ширин).
+
+При загрузке фото рядом с оригиналом кладём уменьшенные копии в подпапку
+``_variants/`` и записываем манифест в JSON-поле модели, например:
+
+    {"source": "projects/grid/a.jpg",
+     "avif": {"480": "projects/grid/_variants/a-480.avif", ...},
+     "webp": {"480": "projects/grid/_variants/a-480.webp", ...}}
+
+Шаблонный тег ``{% responsive_image %}`` собирает из манифеста srcset,
+а команда ``build_image_variants`` догенерирует манифесты для старых медиа.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+try:
+    from PIL import Image, ImageOps, features
+    PIL_AVAILABLE = True
+except Exception:
+    PIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# модель -> {поле ImageField: JSON-поле с манифестом}
+RESPONSIVE_FIELDS = {
+    "main.ProjectImage": {"image": "variants"},
+    "main.ProjectDetailImage": {"image": "variants"},
+    "main.ProjectDetailGridImage": {"image": "variants"},
+    "main.NewsImage": {"image": "variants"},
+    "main.ProjectDetail": {"cover": "cover_variants", "og_image": "og_image_variants"},
+    "main.NewsArticle": {"cover": "cover_variants", "og_image": "og_image_variants"},
+}
+
+VARIANTS_DIR = "_variants"
+
+# (формат манифеста, формат Pillow, mime, параметры сохранения)
+FORMATS = {
+    "avif": ("AVIF", "image/avif", {"quality": 55}),
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+}
+
+
+def variant_widths():
+    return tuple(sorted(getattr(settings, "RESPONSIVE_IMAGE_WIDTHS", (480, 960, 1600))))
+
+
+def variant_formats():
+    """Форматы по приоритету для <source>; AVIF — только если Pillow собран с libavif."""
+    wanted = getattr(settings, "RESPONSIVE_IMAGE_FORMATS", ("avif", "webp"))
+    if not PIL_AVAILABLE:
+        return ()
+    return tuple(f for f in wanted if f in FORMATS and features.check(f))
+
+
+def mime_type(fmt):
+    return FORMATS[fmt][1]
+
+
+def fields_for(instance):
+    return RESPONSIVE_FIELDS.get(instance._meta.label, {})
+
+
+def is_stale(instance, field_name, manifest_field):
+    """Манифест отсутствует или собран для другого файла (фото заменили)."""
+    file = getattr(instance, field_name)
+    manifest = getattr(instance, manifest_field) or {}
+    if not file:
+        return bool(manifest)
+    return manifest.get("source") != file.name
+
+
+def variant_name(source_name, width, fmt):
+    folder, filename = os.path.split(source_name)
+    base, _ext = os.path.splitext(filename)
+    return f"{folder}/{VARIANTS_DIR}/{base}-{width}.{fmt}" if folder else f"{VARIANTS_DIR}/{base}-{width}.{fmt}"
+
+
+def load(fh):
+    """Открыть фото с учётом EXIF-поворота, в RGB/RGBA."""
+    img = Image.open(fh)
+    img = ImageOps.exif_transpose(img)
+    img.load()
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+    return img
+
+
+def target_widths(orig_w, widths):
+    """Ширины меньше оригинала; сам оригинал — если он не шире максимальной."""
+    result = [w for w in widths if w < orig_w]
+    if orig_w <= widths[-1]:
+        result.append(orig_w)
+    return result
+
+
+def encode(img, width, fmt):
+    """Байты варианта img шириной width в формате fmt."""
+    pil_format, _mime, options = FORMATS[fmt]
+    orig_w, orig_h = img.size
+    resized = img if width == orig_w else img.resize((width, max(1, round(orig_h * width / orig_w))), Image.LANCZOS)
+    buf = BytesIO()
+    resized.save(buf, pil_format, **options)
+    return buf.getvalue()
+
+
+def build_variants(file):
+    """
+    Генерирует производные для одного файла и возвращает манифест.
+    Ширины больше оригинала не апскейлим — берём сам оригинал как максимум.
+    """
+    formats = variant_formats()
+    if not file or not formats:
+        return {}
+
+    storage = file.storage
+    with file.open("rb") as fh:
+        img = load(fh)
+
+    widths = target_widths(img.size[0], variant_widths())
+    manifest = {"source": file.name}
+    for fmt in formats:
+        out = {}
+        for w in widths:
+            name = variant_name(file.name, w, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+            out[str(w)] = storage.save(name, ContentFile(encode(img, w, fmt)))
+        manifest[fmt] = out
+    return manifest
+
+
+def delete_variants(storage, manifest):
+    for fmt in FORMATS:
+        for name in (manifest or {}).get(fmt, {}).values():
+            try:
+                storage.delete(name)
+            except Exception:
+                logger.warning("Не вдалося видалити варіант %s", name, exc_info=True)
+
+
+def refresh_variants(instance, force=False):
+    """
+    Пересобирает устаревшие манифесты экземпляра и сохраняет их через
+    ``update()`` (без повторного post_save). Возвращает список обновлённых полей.
+    """
+    changed = {}
+    for field_name, manifest_field in fields_for(instance).items():
+        if not force and not is_stale(instance, field_name, manifest_field):
+            continue
+        file = getattr(instance, field_name)
+        old = getattr(instance, manifest_field) or {}
+        if not file and not old:
+            continue
+        try:
+            manifest = build_variants(file) if file else {}
+        except Exception:
+            logger.exception("Не вдалося згенерувати варіанти для %s", file.name)
+            continue
+        # старые файлы удаляем, только если они не перезаписаны новыми
+        new_names = {n for fmt in FORMATS for n in manifest.get(fmt, {}).values()}
+        delete_variants(file.storage, {
+            fmt: {k: n for k, n in old.get(fmt, {}).items() if n not in new_names}
+            for fmt in FORMATS
+        })
+        setattr(instance, manifest_field, manifest)
+        changed[manifest_field] = manifest
+
+    if changed and instance.pk:
+        type(instance)._default_manager.filter(pk=instance.pk).update(**changed)
+    return list(changed)
+
+
+def variant_items(manifest, fmt):
+    """[(ширина, имя файла), ...] по возрастанию ширины."""
+    return sorted((int(w), name) for w, name in (manifest or {}).get(fmt, {}).items())
@@ -0,0 +1,177 @@
+"""
+Простая очередь фоновых задач админки на базе таблицы AdminJob.
+
+Админка ставит задачу (``enqueue``) и сразу отдаёт страницу статуса, а
+``manage.py run_jobs`` забирает задачи по одной и выполняет обработчик,
+зарегистрированный через ``@handler("kind")``. Брокер не нужен.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from zipfile import BadZipFile
+
+from . import images, sitemaps, spam, video
+from .bulk_upload import ingest_grid_zip
+from .models import AdminJob, ProjectDetailGridImage
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+
+def handler(kind):
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(kind, project=None, file=None, user=None, **payload):
+    job = AdminJob(kind=kind, project=project, payload=payload,
+                   created_by=user if user and user.is_authenticated else None)
+    if file is not None:
+        job.file.save(file.name, file, save=False)
+    job.save()
+    return job
+
+
+def enqueue_once(kind, **payload):
+    """Как enqueue, но не ставит вторую такую же задачу, пока первая ждёт в очереди."""
+    queued = AdminJob.objects.filter(kind=kind, status=AdminJob.STATUS_QUEUED, payload=payload)
+    return queued.first() or enqueue(kind, **payload)
+
+
+class Progress:
+    """Колбэк прогресса: пишет processed/total в БД не чаще раза в секунду."""
+
+    def __init__(self, job, interval=1.0):
+        self.job = job
+        self.interval = interval
+        self._last = 0.0
+
+    def __call__(self, processed, total, force=False):
+        now = time.monotonic()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+        self.job.processed, self.job.total = processed, total
+        AdminJob.objects.filter(pk=self.job.pk).update(processed=processed, total=total, updated_at=timezone.now())
+
+
+def _fail_stale_jobs():
+    """Задачи, чей воркер умер (нет обновлений дольше JOBS_STALE_AFTER), помечаем как failed."""
+    stale_after = timedelta(seconds=getattr(settings, "JOBS_STALE_AFTER", 600))
+    AdminJob.objects.filter(
+        status=AdminJob.STATUS_RUNNING, updated_at__lt=timezone.now() - stale_after,
+    ).update(status=AdminJob.STATUS_FAILED, error="Воркер перестав оновлювати задачу.", finished_at=timezone.now())
+
+
+def claim_next():
+    _fail_stale_jobs()
+    with transaction.atomic():
+        job = (AdminJob.objects
+               .select_for_update(skip_locked=True)
+               .filter(status=AdminJob.STATUS_QUEUED)
+               .order_by("created_at", "id")
+               .first())
+        if job is None:
+            return None
+        job.status = AdminJob.STATUS_RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "started_at", "updated_at"])
+    return job
+
+
+def run(job):
+    func = HANDLERS.get(job.kind)
+    progress = Progress(job)
+    try:
+        if func is None:
+            raise LookupError(f"Невідомий тип задачі: {job.kind}")
+        job.stats = func(job, progress) or {}
+        job.status = AdminJob.STATUS_DONE
+    except Exception as exc:
+        logger.exception("Фонова задача %s впала", job.pk)
+        job.status = AdminJob.STATUS_FAILED
+        job.error = f"{type(exc).__name__}: {exc}"[:2000]
+    finally:
+        if job.file:
+            job.file.delete(save=False)
+    if job.status == AdminJob.STATUS_DONE and job.total:
+        job.processed = job.total
+    job.finished_at = timezone.now()
+    # только если задачу не успели пометить зависшей (_fail_stale_jobs) — иначе статусы «мигают»
+    finished = AdminJob.objects.filter(pk=job.pk, status=AdminJob.STATUS_RUNNING).update(
+        status=job.status, stats=job.stats, error=job.error, processed=job.processed, total=job.total,
+        file=job.file.name or "", finished_at=job.finished_at, updated_at=job.finished_at,
+    )
+    if not finished:
+        logger.warning("Задачу %s вже завершено інакше, результат воркера (%s) не записано", job.pk, job.status)
+        job.refresh_from_db()
+    return job
+
+
+def run_next():
+    job = claim_next()
+    return run(job) if job else None
+
+
+# --- Обработчики ---
+
+@handler("grid_zip")
+def grid_zip(job, progress):
+    try:
+        return ingest_grid_zip(job.project, job.file, progress=progress)
+    except BadZipFile:
+        raise ValueError("Файл не є коректним ZIP-архівом.")
+
+
+@handler("clear_grid")
+def clear_grid(job, progress):
+    qs = ProjectDetailGridImage.objects.filter(project=job.project)
+    total = qs.count()
+    deleted = 0
+    progress(0, total, force=True)
+    # пачками: delete() шлёт сигналы (варианты, кеш) по каждой строке
+    while True:
+        ids = list(qs.order_by("pk").values_list("pk", flat=True)[:200])
+        if not ids:
+            break
+        count, _ = ProjectDetailGridImage.objects.filter(pk__in=ids).delete()
+        deleted += count
+        progress(deleted, total)
+    return {"deleted": deleted}
+
+
+@handler("contact_spam_check")
+def contact_spam_check(job, progress):
+    return spam.run_deferred(job.payload["contact"])
+
+
+@handler("process_video")
+def process_video(job, progress):
+    obj = apps.get_model(job.payload["model"])._default_manager.filter(pk=job.payload["pk"]).first()
+    if obj is None:
+        return {"skipped": True}
+    changes = video.process(obj)
+    return {"faststart": video.field_for(obj) in changes, "size": changes.get("video_size")}
+
+
+@handler("image_variants")
+def build_image_variants(job, progress):
+    obj = apps.get_model(job.payload["model"])._default_manager.filter(pk=job.payload["pk"]).first()
+    if obj is None:
+        return {"skipped": True}
+    return {"fields": images.refresh_variants(obj, force=job.payload.get("force", False))}
+
+
+@handler("sitemap")
+def rebuild_sitemap(job, progress):
+    sitemaps.rebuild(job.payload["section"])
+    return {"section": job.payload["section"]}
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from main.models import ProjectDetailGridImage, NewsImage
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except Exception:
+    PIL_AVAILABLE = False
+
+
+class Command(BaseCommand):
+    help = "Заповнює width/height/file_size для вже завантажених зображень пачками (bulk_update)."
+
+    models = (ProjectDetailGridImage, NewsImage)
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--force", action="store_true",
+                            help="Перерахувати й ті рядки, де значення вже є.")
+
+    def handle(self, *args, batch_size=500, force=False, **options):
+        for model in self.models:
+            qs = model.objects.exclude(image="")
+            if not force:
+                qs = qs.filter(Q(width__isnull=True) | Q(height__isnull=True) | Q(file_size__isnull=True))
+
+            storage = model._meta.get_field("image").storage
+            updated = failed = 0
+            batch = []
+            # values_list, а не объекты: post_init ImageField сам полез бы в файл
+            for pk, name in qs.order_by("pk").values_list("pk", "image").iterator(chunk_size=batch_size):
+                try:
+                    file_size = storage.size(name)
+                    width = height = None
+                    if PIL_AVAILABLE:
+                        with storage.open(name, "rb") as fh, Image.open(fh) as img:
+                            width, height = img.size
+                except (OSError, ValueError):
+                    failed += 1
+                    continue
+                batch.append(model(pk=pk, width=width, height=height, file_size=file_size))
+                if len(batch) >= batch_size:
+                    model.objects.bulk_update(batch, ["width", "height", "file_size"])
+                    updated += len(batch)
+                    batch = []
+            if batch:
+                model.objects.bulk_update(batch, ["width", "height", "file_size"])
+                updated += len(batch)
+
+            self.stdout.write(f"{model._meta.label}: оновлено {updated}, помилок {failed}")
+        self.stdout.write(self.style.SUCCESS("Готово."))
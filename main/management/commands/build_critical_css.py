@@ -0,0 +1,51 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+
+from main import critical
+
+
+class Command(BaseCommand):
+    help = ("Рендерить публічні сторінки й зберігає critical CSS першого екрана для кожної "
+            "(CRITICAL_CSS_ROOT, тег {% critical_css %}).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fixture", help="Рендерити на даних фікстури (напр. critical_pages) у тимчасовій БД, "
+                                              "а не на поточній базі.")
+        parser.add_argument("--page", action="append", dest="pages", help="Лише ця сторінка (ключ; можна кілька разів).")
+
+    def handle(self, *args, fixture=None, pages=None, **options):
+        if not fixture:
+            return self._build(pages)
+
+        from django.test.utils import setup_databases, teardown_databases
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={"default"})
+        try:
+            call_command("loaddata", fixture, verbosity=0)
+            self._build(pages)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            connections.close_all()
+
+    @override_settings(PAGE_CACHE_ENABLED=False, ALLOWED_HOSTS=["*"])
+    def _build(self, only):
+        urls = critical.pages()
+        unknown = set(only or ()) - set(urls)
+        if unknown:
+            raise CommandError(f"Невідомі сторінки: {', '.join(sorted(unknown))} (є: {', '.join(urls)})")
+
+        client = Client()
+        for key, url in urls.items():
+            if only and key not in only:
+                continue
+            critical.requested.clear()
+            response = client.get(url, secure=True)
+            if response.status_code != 200:
+                self.stderr.write(f"{key}: {url} → {response.status_code}, пропущено")
+                continue
+            for tag_key, sources in critical.requested.items():
+                css = critical.extract(response.content.decode(response.charset or "utf-8"), sources)
+                critical.write(tag_key, sources, css)
+                self.stdout.write(f"{tag_key}: {url} → {len(css.encode()) / 1024:.1f} KB")
+        self.stdout.write(self.style.SUCCESS(f"Critical CSS збережено: {critical._root()}"))
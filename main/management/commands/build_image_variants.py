@@ -0,0 +1,35 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from main import images, jobs
+
+
+class Command(BaseCommand):
+    help = "Генерує AVIF/WebP варіанти для вже завантажених зображень (backfill манифестів)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true",
+                            help="Перегенерувати навіть актуальні манифести.")
+        parser.add_argument("--model", action="append", dest="models",
+                            help="Обмежити моделлю, напр. main.NewsImage (можна кілька разів).")
+        parser.add_argument("--enqueue", action="store_true",
+                            help="Не кодувати тут, а поставити задачі image_variants для run_jobs (entrypoint).")
+
+    def handle(self, *args, force=False, models=None, enqueue=False, **options):
+        labels = models or list(images.RESPONSIVE_FIELDS)
+        total = 0
+        for label in labels:
+            model = apps.get_model(label)
+            fields = images.RESPONSIVE_FIELDS[model._meta.label]
+            done = 0
+            for obj in model._default_manager.order_by("pk").iterator(chunk_size=200):
+                if not force and not any(images.is_stale(obj, f, m) for f, m in fields.items()):
+                    continue
+                if enqueue:
+                    jobs.enqueue_once("image_variants", model=label, pk=obj.pk, **({"force": True} if force else {}))
+                    done += 1
+                elif images.refresh_variants(obj, force=force):
+                    done += 1
+            total += done
+            self.stdout.write(f"{label}: {'у черзі' if enqueue else 'оновлено'} {done}")
+        self.stdout.write(self.style.SUCCESS(f"Готово, всього {'у черзі' if enqueue else 'оновлено'}: {total}"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from main import sitemaps
+
+
+class Command(BaseCommand):
+    help = "Генерує sitemap-файли (XML + .gz) та індекс sitemap.xml у SITEMAP_ROOT."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--section", action="append", dest="sections", choices=list(sitemaps.SECTIONS),
+                            help="Перебудувати лише секцію (можна кілька разів).")
+
+    def handle(self, *args, sections=None, **options):
+        sitemaps.rebuild(*(sections or ()))
+        self.stdout.write(self.style.SUCCESS(f"Sitemap оновлено: {sitemaps._root()}"))
@@ -0,0 +1,84 @@
+import urllib.request
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main import vendor
+
+
+class Command(BaseCommand):
+    help = ("Збирає по одному CSS/JS-бандлу на кожен набір {% vendor %} із шаблонів із закріплених файлів "
+            "static/vendor (sha256 — main/vendor.lock.json). З --fetch докачує відсутні файли з jsDelivr "
+            "і відкидає ті, чий хеш не збігається з lock-файлом.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fetch", action="store_true",
+                            help="Завантажити відсутні файли (лише ті, що є в lock-файлі).")
+        parser.add_argument("--refetch", action="store_true", help="Завантажити всі файли заново (з --fetch).")
+        parser.add_argument("--lock", action="store_true",
+                            help="Оновлення версій: завантажити й записати хеші нових файлів у lock-файл.")
+        parser.add_argument("--strict", action="store_true",
+                            help="Падати, якщо файл не завантажився або набір не зібрано (для CI).")
+
+    def handle(self, *args, fetch=False, refetch=False, lock=False, strict=False, **options):
+        pins = vendor.load_lock()
+        if fetch or lock:
+            self._fetch_all(pins, refetch=refetch, lock=lock, strict=strict)
+
+        fonts = vendor.file_path(vendor.static_name("fonts", "fonts.css"))
+        fonts.parent.mkdir(parents=True, exist_ok=True)
+        fonts.write_text(vendor.fonts_css(), encoding="utf-8")
+
+        skipped = 0
+        for names, templates in vendor.template_sets().items():
+            absent = vendor.missing(names)
+            if absent:
+                skipped += 1
+                message = (f"Набір {', '.join(vendor.ordered(names))} не зібрано (бракує або не збігається "
+                           f"хеш {len(absent)} файлів), сторінки {', '.join(sorted(templates))} беруть CDN")
+                if strict:
+                    raise CommandError(message)
+                self.stderr.write(self.style.WARNING(message))
+                continue
+            for kind in ("css", "js"):
+                bundle = vendor.build_bundle(names, kind)
+                if bundle:
+                    size = vendor.file_path(bundle).stat().st_size
+                    self.stdout.write(f"{bundle}: {', '.join(vendor.ordered(names))} "
+                                      f"({size / 1024:.1f} KB; {', '.join(sorted(templates))})")
+        self.stdout.write(self.style.SUCCESS(f"Бандли зібрано у {vendor.file_path('vendor/bundles')}"
+                                             + (f", не зібрано наборів: {skipped}" if skipped else "")))
+
+    def _fetch_all(self, pins, refetch, lock, strict):
+        missing = [(name, url) for name, url in vendor.downloads()
+                   if refetch or not vendor.built(name) or (lock and name not in pins)]
+        for name, url in missing:
+            if name not in pins and not lock:
+                self.stderr.write(self.style.WARNING(f"{name}: немає хешу в lock-файлі, пропущено (див. --lock)"))
+                continue
+            try:
+                data = self._download(name, url)
+            except OSError as exc:
+                if strict:
+                    raise CommandError(f"Не вдалося завантажити {url}: {exc}")
+                self.stderr.write(self.style.WARNING(f"Не вдалося завантажити {url}: {exc}; решту пропущено"))
+                break
+            digest = vendor.sha256(data)
+            if name in pins and pins[name] != digest:
+                # закреплённая версия на CDN не должна меняться — такой файл не пишем
+                raise CommandError(f"{name}: sha256 {digest} не збігається з lock-файлом ({pins[name]})")
+            pins[name] = digest
+            target = vendor.file_path(name)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(data)
+            self.stdout.write(f"{name} ← {url} ({len(data) / 1024:.1f} KB)")
+        if lock:
+            vendor.write_lock(pins)
+            self.stdout.write(f"Хеші записано у {vendor.LOCK_PATH}")
+
+    @staticmethod
+    def _download(name, url):
+        with urllib.request.urlopen(url, timeout=30) as response:
+            data = response.read()
+        if name.endswith((".css", ".js")):
+            data = vendor.strip_source_maps(data)
+        return data
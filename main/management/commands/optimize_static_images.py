@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main import images, static_images
+
+
+class Command(BaseCommand):
+    help = ("Перекодовує картинки зі static/images у AVIF/WebP кількох ширин (паралельно) "
+            "і пише манифест для {% static_picture %}. Незмінені файли пропускає.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Перекодувати всі файли заново.")
+        parser.add_argument("--workers", type=int, help="Кількість процесів (типово STATIC_IMAGES_WORKERS або всі ядра).")
+
+    def handle(self, *args, force=False, workers=None, **options):
+        if not images.variant_formats():
+            raise CommandError("Pillow не підтримує жодного з RESPONSIVE_IMAGE_FORMATS.")
+
+        def log(name, item):
+            before = self._size(name)
+            largest = ", ".join(
+                f"{fmt} {self._size(variant) / 1024:.1f} KB"
+                for fmt in images.variant_formats()
+                for _w, variant in images.variant_items(item, fmt)[-1:]
+            )
+            self.stdout.write(f"{name}: {before / 1024:.1f} KB → {largest} (найширший варіант)")
+
+        encoded, skipped, removed = static_images.build(force=force, workers=workers, log=log)
+        self.stdout.write(self.style.SUCCESS(
+            f"Перекодовано: {encoded}, без змін: {skipped}, видалено застарілих варіантів: {removed}"))
+        self.stdout.write(f"Манифест: {static_images.manifest_path()}")
+
+    @staticmethod
+    def _size(name):
+        return static_images.source_dir().parent.joinpath(name).stat().st_size
@@ -0,0 +1,33 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from main import video
+
+
+class Command(BaseCommand):
+    help = ("Разово переписує вже завантажені MP4 у faststart (moov на початку) і записує "
+            "тривалість, розмір кадру та вагу відеофайлів. Недоступні файли пропускає.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true",
+                            help="Обробити навіть файли, для яких метадані вже є.")
+
+    def handle(self, *args, force=False, **options):
+        total = 0
+        for label, field_name in video.VIDEO_FIELDS.items():
+            model = apps.get_model(label)
+            qs = model._default_manager.exclude(**{field_name: ""}).order_by("pk")
+            if not force:
+                qs = qs.filter(video_size__isnull=True)
+            done = failed = 0
+            for obj in qs.iterator(chunk_size=50):
+                changes = video.process(obj)
+                done += 1
+                if changes.get("video_size") is None:
+                    failed += 1
+                    self.stderr.write(f"{label} #{obj.pk}: файл {getattr(obj, field_name).name} недоступний")
+                elif field_name in changes:
+                    self.stdout.write(f"{label} #{obj.pk}: faststart → {changes[field_name]}")
+            total += done
+            self.stdout.write(f"{label}: оброблено {done}, недоступних файлів {failed}")
+        self.stdout.write(self.style.SUCCESS(f"Готово, всього оброблено: {total}"))
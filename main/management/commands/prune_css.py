@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from main import cssprune
+
+
+class Command(BaseCommand):
+    help = ("Знаходить селектори, яких немає в шаблонах/скриптах проєкту, і показує економію по файлах. "
+            "З --write пише очищені таблиці стилів у CSS_PRUNE_ROOT для collectstatic.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--write", action="store_true", help="Записати очищені файли (інакше лише звіт).")
+        parser.add_argument("--file", action="append", dest="files",
+                            help="Лише цей файл, шлях як у static (напр. css/main/index.css).")
+
+    def handle(self, *args, write=False, files=None, **options):
+        usage = cssprune.Usage.collect()
+        verbosity = options["verbosity"]
+        total_before = total_after = 0
+
+        for path in files or cssprune.stylesheets():
+            before = (cssprune.source_root() / path).stat().st_size
+            text, removed = cssprune.prune(path, usage)
+            after = len(text.encode())
+            total_before += before
+            total_after += after
+            self.stdout.write(f"{path}: {before / 1024:.1f} KB → {after / 1024:.1f} KB "
+                              f"(-{(before - after) / 1024:.1f} KB, {self._percent(before, after)}), "
+                              f"прибрано селекторів: {len(removed)}")
+            if verbosity > 1:
+                for selector in removed:
+                    self.stdout.write(f"    {selector}")
+            if write:
+                cssprune.write(path, text)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Разом: {total_before / 1024:.1f} KB → {total_after / 1024:.1f} KB "
+            f"(-{(total_before - total_after) / 1024:.1f} KB, {self._percent(total_before, total_after)})"))
+        if write:
+            self.stdout.write(f"Очищені файли: {cssprune.output_root()}")
+        else:
+            self.stdout.write("Лише звіт; --write запише файли для collectstatic.")
+
+    @staticmethod
+    def _percent(before, after):
+        return f"{(before - after) * 100 / before:.0f}%" if before else "0%"
@@ -0,0 +1,25 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from main import ratelimit
+
+
+class Command(BaseCommand):
+    help = "Лічильники обмеження частоти форми контактів: пропущені та відхилені (429) запити по областях."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--json", action="store_true", dest="as_json", help="Вивести JSON (для моніторингу).")
+        parser.add_argument("--reset", action="store_true", help="Обнулити лічильники після виводу.")
+
+    def handle(self, *args, as_json=False, reset=False, **options):
+        data = ratelimit.stats()
+        if as_json:
+            self.stdout.write(json.dumps(data))
+        else:
+            for scope, counts in data.items():
+                capacity, period = ratelimit.contact_limits()[scope]
+                self.stdout.write(f"{scope} ({capacity} за {period} с): пропущено {counts['allowed']}, "
+                                  f"відхилено {counts['rejected']}")
+        if reset:
+            ratelimit.reset_stats()
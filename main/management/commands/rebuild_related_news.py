@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from main import related
+from main.models import RelatedArticle
+
+
+class Command(BaseCommand):
+    help = "Перераховує блок «Також подивіться» (RelatedArticle) для всіх опублікованих новин."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--if-empty", action="store_true",
+                            help="Лише якщо таблиця порожня (backfill після міграції; далі її ведуть сигнали).")
+
+    def handle(self, *args, if_empty=False, **options):
+        if if_empty and RelatedArticle.objects.exists():
+            self.stdout.write("Схожі статті вже пораховано, пропущено")
+            return
+        total = related.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Схожі статті перераховано для {total} новин"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from main import search
+from main.models import SearchDocument
+
+
+class Command(BaseCommand):
+    help = "Перебудовує пошуковий індекс (SearchDocument) з новин і проєктів."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--if-empty", action="store_true",
+                            help="Лише якщо індекс порожній (backfill після міграції; далі його ведуть сигнали).")
+
+    def handle(self, *args, if_empty=False, **options):
+        if if_empty and SearchDocument.objects.exists():
+            self.stdout.write("Пошуковий індекс уже заповнено, пропущено")
+            return
+        total = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Пошуковий індекс перебудовано: {total} документів"))
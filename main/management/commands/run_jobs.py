@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from main import jobs
+
+
+class Command(BaseCommand):
+    help = "Воркер фонових задач (AdminJob): ZIP полотна, очистка полотна, повна спам-перевірка звернень."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true",
+                            help="Виконати всі задачі з черги і вийти.")
+        parser.add_argument("--interval", type=float, default=2.0,
+                            help="Пауза між опитуваннями порожньої черги, сек.")
+
+    def handle(self, *args, once=False, interval=2.0, **options):
+        while True:
+            close_old_connections()
+            job = jobs.run_next()
+            if job is not None:
+                self.stdout.write(f"{job}: {job.stats or job.error}")
+                continue
+            if once:
+                return
+            time.sleep(interval)
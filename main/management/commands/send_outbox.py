@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from main.emailing import deliver_outbox
+
+
+class Command(BaseCommand):
+    help = "Воркер черги листів: відправляє OutboxEmail пачками через одне SMTP-з'єднання."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true",
+                            help="Обробити чергу один раз і вийти (для cron).")
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--interval", type=float, default=5.0,
+                            help="Пауза між опитуваннями порожньої черги, сек.")
+
+    def handle(self, *args, once=False, batch_size=None, interval=5.0, **options):
+        while True:
+            close_old_connections()
+            sent, failed = deliver_outbox(batch_size)
+            if sent or failed:
+                self.stdout.write(f"надіслано: {sent}, помилок: {failed}")
+                continue  # в очереди может быть ещё — берём следующую пачку сразу
+            if once:
+                return
+            time.sleep(interval)
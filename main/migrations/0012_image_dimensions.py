@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_responsive_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsimage',
+            name='file_size',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True, verbose_name='Розмір, байт'),
+        ),
+        migrations.AddField(
+            model_name='newsimage',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Висота, px'),
+        ),
+        migrations.AddField(
+            model_name='newsimage',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина, px'),
+        ),
+        migrations.AddField(
+            model_name='projectdetailgridimage',
+            name='file_size',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True, verbose_name='Розмір, байт'),
+        ),
+        migrations.AddField(
+            model_name='projectdetailgridimage',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Висота, px'),
+        ),
+        migrations.AddField(
+            model_name='projectdetailgridimage',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина, px'),
+        ),
+        migrations.AlterField(
+            model_name='newsimage',
+            name='image',
+            field=models.ImageField(height_field='height', upload_to='news/gallery/', verbose_name='Зображення', width_field='width'),
+        ),
+        migrations.AlterField(
+            model_name='projectdetailgridimage',
+            name='image',
+            field=models.ImageField(height_field='height', upload_to='projects/grid/', verbose_name='Зображення', width_field='width'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:45
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_image_dimensions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255, verbose_name='Тема')),
+                ('to', models.JSONField(default=list, verbose_name='Кому')),
+                ('reply_to', models.JSONField(blank=True, default=list, verbose_name='Reply-To')),
+                ('body_text', models.TextField(verbose_name='Текст')),
+                ('body_html', models.TextField(blank=True, verbose_name='HTML')),
+                ('status', models.CharField(choices=[('pending', 'В черзі'), ('sent', 'Надіслано'), ('failed', 'Помилка')], default='pending', max_length=16, verbose_name='Статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Спроб')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Наступна спроба')),
+                ('last_error', models.TextField(blank=True, verbose_name='Остання помилка')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Надіслано о')),
+                ('contact', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='emails', to='main.contactmessage', verbose_name='Звернення')),
+            ],
+            options={
+                'verbose_name': 'Лист у черзі',
+                'verbose_name_plural': 'Черга листів',
+                'ordering': ('-created_at',),
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='main_outbox_status_fae4aa_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:49
+
+import django.db.models.deletion
+import main.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_outbox_email'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdminJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=40, verbose_name='Тип')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Параметри')),
+                ('file', models.FileField(blank=True, storage=main.models.jobs_storage, upload_to='uploads/', verbose_name='Файл')),
+                ('status', models.CharField(choices=[('queued', 'В черзі'), ('running', 'Виконується'), ('done', 'Готово'), ('failed', 'Помилка')], default='queued', max_length=16, verbose_name='Статус')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='Оброблено')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Всього')),
+                ('stats', models.JSONField(blank=True, default=dict, verbose_name='Підсумок')),
+                ('error', models.TextField(blank=True, verbose_name='Помилка')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='main.projectdetail', verbose_name='Проєкт')),
+            ],
+            options={
+                'verbose_name': 'Фонова задача',
+                'verbose_name_plural': 'Фонові задачі',
+                'ordering': ('-created_at',),
+                'indexes': [models.Index(fields=['status', 'created_at'], name='main_adminj_status_9edc3c_idx')],
+            },
+        ),
+    ]
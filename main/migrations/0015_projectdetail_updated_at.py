@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0014_admin_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectdetail',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
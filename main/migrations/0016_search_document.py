@@ -0,0 +1,107 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:56
+
+from django.db import migrations, models
+
+# Полнотекстовый индекс поддерживает сама БД — триггерами на main_searchdocument.
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE main_searchdocument ADD COLUMN search_vector tsvector",
+    "CREATE INDEX main_searchdocument_vector_gin ON main_searchdocument USING GIN (search_vector)",
+    """
+    CREATE FUNCTION main_searchdocument_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector(NEW.config::regconfig, coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector(NEW.config::regconfig, coalesce(NEW.body, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER main_searchdocument_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, body, config ON main_searchdocument
+    FOR EACH ROW EXECUTE FUNCTION main_searchdocument_vector_update()
+    """,
+]
+POSTGRES_BACKWARD = [
+    "DROP TRIGGER IF EXISTS main_searchdocument_vector_trigger ON main_searchdocument",
+    "DROP FUNCTION IF EXISTS main_searchdocument_vector_update()",
+]
+
+# external-content FTS5: текст хранится один раз, в main_searchdocument
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE main_searchdocument_fts USING fts5(
+        title, body, content='main_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER main_searchdocument_fts_ai AFTER INSERT ON main_searchdocument BEGIN
+        INSERT INTO main_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER main_searchdocument_fts_ad AFTER DELETE ON main_searchdocument BEGIN
+        INSERT INTO main_searchdocument_fts(main_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER main_searchdocument_fts_au AFTER UPDATE OF title, body ON main_searchdocument BEGIN
+        INSERT INTO main_searchdocument_fts(main_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO main_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS main_searchdocument_fts_ai",
+    "DROP TRIGGER IF EXISTS main_searchdocument_fts_ad",
+    "DROP TRIGGER IF EXISTS main_searchdocument_fts_au",
+    "DROP TABLE IF EXISTS main_searchdocument_fts",
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def create_search_index(apps, schema_editor):
+    _run(schema_editor, {"postgresql": POSTGRES_FORWARD, "sqlite": SQLITE_FORWARD})
+
+
+def drop_search_index(apps, schema_editor):
+    _run(schema_editor, {"postgresql": POSTGRES_BACKWARD, "sqlite": SQLITE_BACKWARD})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0015_projectdetail_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('news', 'Новина'), ('project', 'Проєкт'), ('project_detail', 'Сторінка проєкту')], max_length=20, verbose_name='Тип')),
+                ('object_id', models.PositiveIntegerField()),
+                ('language', models.CharField(max_length=10, verbose_name='Мова')),
+                ('config', models.CharField(default='simple', help_text='Postgres text search config', max_length=32)),
+                ('title', models.CharField(max_length=255, verbose_name='Заголовок')),
+                ('body', models.TextField(blank=True, verbose_name='Текст')),
+                ('slug', models.CharField(blank=True, max_length=255)),
+                ('published_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Пошуковий документ',
+                'verbose_name_plural': 'Пошукові документи',
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='search_document_unique_object')],
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
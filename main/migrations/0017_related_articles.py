@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0016_search_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsarticle',
+            name='related_terms',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.CreateModel(
+            name='RelatedArticle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='main.newsarticle')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='main.newsarticle')),
+            ],
+            options={
+                'verbose_name': 'Схожа стаття',
+                'verbose_name_plural': 'Схожі статті',
+                'ordering': ('article', 'rank'),
+                'indexes': [models.Index(fields=['article', 'rank'], name='main_relate_article_159bd5_idx')],
+                'constraints': [models.UniqueConstraint(fields=('article', 'related'), name='related_article_unique_pair')],
+            },
+        ),
+    ]
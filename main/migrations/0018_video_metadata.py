@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0017_related_articles'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsarticle',
+            name='video_duration',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Тривалість відео, с'),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='video_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Висота відео, px'),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='video_size',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True, verbose_name='Розмір відеофайлу, байт'),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='video_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина відео, px'),
+        ),
+        migrations.AddField(
+            model_name='projectdetail',
+            name='video_duration',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Тривалість відео, с'),
+        ),
+        migrations.AddField(
+            model_name='projectdetail',
+            name='video_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Висота відео, px'),
+        ),
+        migrations.AddField(
+            model_name='projectdetail',
+            name='video_size',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True, verbose_name='Розмір відеофайлу, байт'),
+        ),
+        migrations.AddField(
+            model_name='projectdetail',
+            name='video_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина відео, px'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0018_video_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactmessage',
+            name='is_quarantined',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='Карантин'),
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='spam_checked_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Повну перевірку завершено'),
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='spam_reasons',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Ознаки спаму'),
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='spam_score',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Спам-бал'),
+        ),
+    ]
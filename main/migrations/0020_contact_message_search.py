@@ -0,0 +1,92 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:28
+
+from django.db import migrations, models
+
+# Индекс поиска по обращениям для админки (main/search.py: contact_ids).
+# Postgres: вычисляемый tsvector (email ещё и по частям — «gmail» найдёт «ivan@gmail.com») + GIN.
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE main_contactmessage ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        to_tsvector('simple',
+            coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' ||
+            coalesce(email, '') || ' ' || translate(coalesce(email, ''), '@.', '  ') || ' ' ||
+            coalesce(subject, '') || ' ' || coalesce(message, ''))
+    ) STORED
+    """,
+    "CREATE INDEX main_contactmessage_vector_gin ON main_contactmessage USING GIN (search_vector)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS main_contactmessage_vector_gin",
+    "ALTER TABLE main_contactmessage DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE main_contactmessage_fts USING fts5(
+        first_name, last_name, email, subject, message,
+        content='main_contactmessage', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER main_contactmessage_fts_ai AFTER INSERT ON main_contactmessage BEGIN
+        INSERT INTO main_contactmessage_fts(rowid, first_name, last_name, email, subject, message)
+        VALUES (new.id, new.first_name, new.last_name, new.email, new.subject, new.message);
+    END
+    """,
+    """
+    CREATE TRIGGER main_contactmessage_fts_ad AFTER DELETE ON main_contactmessage BEGIN
+        INSERT INTO main_contactmessage_fts(main_contactmessage_fts, rowid, first_name, last_name, email, subject, message)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.subject, old.message);
+    END
+    """,
+    """
+    CREATE TRIGGER main_contactmessage_fts_au AFTER UPDATE OF first_name, last_name, email, subject, message
+    ON main_contactmessage BEGIN
+        INSERT INTO main_contactmessage_fts(main_contactmessage_fts, rowid, first_name, last_name, email, subject, message)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.subject, old.message);
+        INSERT INTO main_contactmessage_fts(rowid, first_name, last_name, email, subject, message)
+        VALUES (new.id, new.first_name, new.last_name, new.email, new.subject, new.message);
+    END
+    """,
+    "INSERT INTO main_contactmessage_fts(main_contactmessage_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS main_contactmessage_fts_ai",
+    "DROP TRIGGER IF EXISTS main_contactmessage_fts_ad",
+    "DROP TRIGGER IF EXISTS main_contactmessage_fts_au",
+    "DROP TABLE IF EXISTS main_contactmessage_fts",
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def create_search_index(apps, schema_editor):
+    _run(schema_editor, {"postgresql": POSTGRES_FORWARD, "sqlite": SQLITE_FORWARD})
+
+
+def drop_search_index(apps, schema_editor):
+    _run(schema_editor, {"postgresql": POSTGRES_BACKWARD, "sqlite": SQLITE_BACKWARD})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0019_contact_spam_score'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['-created_at'], name='main_contac_created_f03f63_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['is_quarantined', '-created_at'], name='main_contac_is_quar_347c80_idx'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
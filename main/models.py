@@ -1,8 +1,17 @@
+from django.conf import settings
 from django.db import models
+from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from django.core.files.storage import FileSystemStorage
 from django.core.validators import FileExtensionValidator
 
 
+def jobs_storage():
+    """Приватне сховище для файлів фонових задач (ZIP тощо) — не роздається nginx як /media/."""
+    return FileSystemStorage(location=settings.JOBS_ROOT)
+
+
 class ContactMessage(models.Model):
     first_name = models.CharField(max_length=80)
     last_name  = models.CharField(max_length=80, blank=True)
@@ -15,13 +24,64 @@ class ContactMessage(models.Model):
     ip         = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
 
+    # Оценка спама (main/spam.py): письма уходят только для сообщений вне карантина
+    spam_score = models.PositiveSmallIntegerField(_("Спам-бал"), default=0, editable=False)
+    spam_reasons = models.JSONField(_("Ознаки спаму"), default=list, blank=True, editable=False)
+    is_quarantined = models.BooleanField(_("Карантин"), default=False, db_index=True)
+    spam_checked_at = models.DateTimeField(_("Повну перевірку завершено"), null=True, blank=True, editable=False)
+
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["-created_at"]),
+            models.Index(fields=["is_quarantined", "-created_at"]),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} — {self.subject}"
 
 
+class OutboxEmail(models.Model):
+    """
+    Лист у черзі на відправку. Пишеться в одній транзакції з ContactMessage,
+    відправляє його окремий процес ``manage.py send_outbox`` (див. main/emailing.py).
+    """
+    STATUS_PENDING = "pending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = (
+        (STATUS_PENDING, _("В черзі")),
+        (STATUS_SENT, _("Надіслано")),
+        (STATUS_FAILED, _("Помилка")),
+    )
+
+    contact = models.ForeignKey(ContactMessage, on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name="emails", verbose_name=_("Звернення"))
+    subject = models.CharField(_("Тема"), max_length=255)
+    to = models.JSONField(_("Кому"), default=list)
+    reply_to = models.JSONField(_("Reply-To"), default=list, blank=True)
+    body_text = models.TextField(_("Текст"))
+    body_html = models.TextField(_("HTML"), blank=True)
+
+    status = models.CharField(_("Статус"), max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(_("Спроб"), default=0)
+    next_attempt_at = models.DateTimeField(_("Наступна спроба"), default=timezone.now)
+    last_error = models.TextField(_("Остання помилка"), blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(_("Надіслано о"), null=True, blank=True)
+
+    class Meta:
+        ordering = ("-created_at",)
+        verbose_name = _("Лист у черзі")
+        verbose_name_plural = _("Черга листів")
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.to)}"
+
+
 class OrgUnit(models.Model):
     name = models.CharField(_("Підрозділ"), max_length=120, unique=True)
     slug = models.SlugField(_("Слаг"), max_length=120, unique=True)
@@ -64,6 +124,11 @@ class ProjectDetail(models.Model):
         blank=True,
         null=True
     )
+    # Заполняются после загрузки (main/video.py): MP4 переписывается в faststart
+    video_duration = models.FloatField(_("Тривалість відео, с"), null=True, blank=True, editable=False)
+    video_width = models.PositiveIntegerField(_("Ширина відео, px"), null=True, blank=True, editable=False)
+    video_height = models.PositiveIntegerField(_("Висота відео, px"), null=True, blank=True, editable=False)
+    video_size = models.PositiveBigIntegerField(_("Розмір відеофайлу, байт"), null=True, blank=True, editable=False)
 
     # (опціонально) дубль блоків з можливістю перезапису
     goal = models.TextField(_("Мета (override)"), blank=True)
@@ -75,8 +140,13 @@ class ProjectDetail(models.Model):
     seo_description = models.TextField(_("SEO description"), blank=True)
     og_image = models.ImageField(_("OG image"), upload_to="projects/detail/og/", blank=True, null=True)
 
+    # Манифесты адаптивных варіантів (см. main/images.py)
+    cover_variants = models.JSONField(default=dict, blank=True, editable=False)
+    og_image_variants = models.JSONField(default=dict, blank=True, editable=False)
+
     is_published = models.BooleanField(_("Опубліковано"), default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
@@ -94,10 +164,17 @@ class ProjectDetailGridImage(models.Model):
         related_name="grid_images",
         verbose_name=_("Проєкт"),
     )
-    image = models.ImageField(upload_to="projects/grid/", verbose_name=_("Зображення"))
+    image = models.ImageField(upload_to="projects/grid/", verbose_name=_("Зображення"),
+                              width_field="width", height_field="height")
     alt = models.CharField(_("ALT"), max_length=255, blank=True)
     order = models.PositiveIntegerField(_("Порядок"), default=0, db_index=True)
 
+    # Размеры/вес храним в строке, чтобы masonry не открывал файлы на каждый запрос
+    width = models.PositiveIntegerField(_("Ширина, px"), null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(_("Висота, px"), null=True, blank=True, editable=False)
+    file_size = models.PositiveBigIntegerField(_("Розмір, байт"), null=True, blank=True, editable=False)
+    variants = models.JSONField(_("Адаптивні варіанти"), default=dict, blank=True, editable=False)
+
     class Meta:
         verbose_name = _("Зображення полотна")
         verbose_name_plural = _("Зображення полотна")
@@ -112,6 +189,7 @@ class ProjectDetailImage(models.Model):
     image = models.ImageField(upload_to="projects/detail/gallery/")
     alt = models.CharField(max_length=255, blank=True)
     order = models.PositiveIntegerField(default=0, db_index=True)
+    variants = models.JSONField(_("Адаптивні варіанти"), default=dict, blank=True, editable=False)
 
     class Meta:
         ordering = ["order", "id"]
@@ -186,6 +264,7 @@ class ProjectImage(models.Model):
     image = models.ImageField(_("Зображення"), upload_to="projects/")
     alt = models.CharField(_("Alt (опис зображення)"), max_length=255, blank=True)
     order = models.PositiveIntegerField(_("Порядок"), default=0, db_index=True)
+    variants = models.JSONField(_("Адаптивні варіанти"), default=dict, blank=True, editable=False)
 
     class Meta:
         ordering = ["order", "id"]
@@ -234,6 +313,11 @@ class NewsArticle(models.Model):
         validators=[FileExtensionValidator(allowed_extensions=["mp4", "webm", "ogg"])]
     )
     video_poster = models.ImageField(_("Постер відео (poster)"), upload_to="news/video/posters/", blank=True, null=True)
+    # Заполняются после загрузки (main/video.py): MP4 переписывается в faststart
+    video_duration = models.FloatField(_("Тривалість відео, с"), null=True, blank=True, editable=False)
+    video_width = models.PositiveIntegerField(_("Ширина відео, px"), null=True, blank=True, editable=False)
+    video_height = models.PositiveIntegerField(_("Висота відео, px"), null=True, blank=True, editable=False)
+    video_size = models.PositiveBigIntegerField(_("Розмір відеофайлу, байт"), null=True, blank=True, editable=False)
 
     author_name = models.CharField(_("Автор (ім'я для відображення)"), max_length=160, blank=True)
     author = models.ForeignKey(settings.AUTH_USER_MODEL, verbose_name=_("Автор (зв'язок з користувачем)"),
@@ -246,6 +330,13 @@ class NewsArticle(models.Model):
     seo_description = models.TextField(_("SEO description"), blank=True)
     og_image = models.ImageField(_("OG image"), upload_to="news/og/", blank=True, null=True)
 
+    # Манифесты адаптивных варіантів (см. main/images.py)
+    cover_variants = models.JSONField(default=dict, blank=True, editable=False)
+    og_image_variants = models.JSONField(default=dict, blank=True, editable=False)
+
+    # Термы статьи для «Також подивіться» (см. main/related.py)
+    related_terms = models.JSONField(default=list, blank=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -263,7 +354,7 @@ class NewsArticle(models.Model):
 
     def get_absolute_url(self):
         # БЕЗ namespace:
-        return reverse("news_detail", kwargs={"slug": self.slug})
+        return reverse("detail", kwargs={"slug": self.slug})
 
     @property
     def display_author(self) -> str:
@@ -274,12 +365,40 @@ class NewsArticle(models.Model):
         return ""
 
 
+class RelatedArticle(models.Model):
+    """Предрасчитанный блок «Також подивіться»: топ похожих статей (main/related.py)."""
+    article = models.ForeignKey(NewsArticle, on_delete=models.CASCADE, related_name="related_links")
+    related = models.ForeignKey(NewsArticle, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ("article", "rank")
+        verbose_name = _("Схожа стаття")
+        verbose_name_plural = _("Схожі статті")
+        constraints = [
+            models.UniqueConstraint(fields=["article", "related"], name="related_article_unique_pair"),
+        ]
+        indexes = [
+            models.Index(fields=["article", "rank"]),
+        ]
+
+    def __str__(self):
+        return f"{self.article_id} → {self.related_id} ({self.score:.3f})"
+
+
 class NewsImage(models.Model):
     article = models.ForeignKey(NewsArticle, on_delete=models.CASCADE, related_name="images", verbose_name=_("Стаття"))
-    image = models.ImageField(_("Зображення"), upload_to="news/gallery/")
+    image = models.ImageField(_("Зображення"), upload_to="news/gallery/",
+                              width_field="width", height_field="height")
     alt = models.CharField(_("ALT"), max_length=255, blank=True)
     order = models.PositiveIntegerField(_("Порядок"), default=0, db_index=True)
 
+    width = models.PositiveIntegerField(_("Ширина, px"), null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(_("Висота, px"), null=True, blank=True, editable=False)
+    file_size = models.PositiveBigIntegerField(_("Розмір, байт"), null=True, blank=True, editable=False)
+    variants = models.JSONField(_("Адаптивні варіанти"), default=dict, blank=True, editable=False)
+
     class Meta:
         verbose_name = _("Зображення статті")
         verbose_name_plural = _("Галерея статті")
@@ -288,3 +407,106 @@ class NewsImage(models.Model):
     def __str__(self):
         return self.alt or f"{self.article.title} [{self.order}]"
 
+
+
+class AdminJob(models.Model):
+    """
+    Фонова задача адмінки (ZIP полотна, очистка полотна тощо).
+    Виконує ``manage.py run_jobs`` — див. main/jobs.py.
+    """
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = (
+        (STATUS_QUEUED, _("В черзі")),
+        (STATUS_RUNNING, _("Виконується")),
+        (STATUS_DONE, _("Готово")),
+        (STATUS_FAILED, _("Помилка")),
+    )
+
+    kind = models.CharField(_("Тип"), max_length=40)
+    project = models.ForeignKey(ProjectDetail, on_delete=models.CASCADE, null=True, blank=True,
+                                related_name="jobs", verbose_name=_("Проєкт"))
+    payload = models.JSONField(_("Параметри"), default=dict, blank=True)
+    file = models.FileField(_("Файл"), upload_to="uploads/", blank=True,
+                            storage=jobs_storage)
+
+    status = models.CharField(_("Статус"), max_length=16, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    processed = models.PositiveIntegerField(_("Оброблено"), default=0)
+    total = models.PositiveIntegerField(_("Всього"), default=0)
+    stats = models.JSONField(_("Підсумок"), default=dict, blank=True)
+    error = models.TextField(_("Помилка"), blank=True)
+
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name="+", verbose_name=_("Автор"))
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("-created_at",)
+        verbose_name = _("Фонова задача")
+        verbose_name_plural = _("Фонові задачі")
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+    @property
+    def percent(self):
+        return int(self.processed * 100 / self.total) if self.total else (100 if self.is_finished else 0)
+
+
+class SearchDocument(models.Model):
+    """
+    Денормализованный документ полнотекстового поиска (/search/).
+
+    Строки пишет main/search.py при сохранении новостей и проектов. Сам индекс
+    ведёт БД триггерами на этой таблице (см. миграцию 0016): на Postgres —
+    колонка tsvector ``search_vector`` с GIN-индексом, на SQLite — FTS5-таблица
+    ``main_searchdocument_fts``. В модели этих колонок нет специально.
+    """
+    KIND_NEWS = "news"
+    KIND_PROJECT = "project"
+    KIND_PROJECT_DETAIL = "project_detail"
+    KIND_CHOICES = (
+        (KIND_NEWS, _("Новина")),
+        (KIND_PROJECT, _("Проєкт")),
+        (KIND_PROJECT_DETAIL, _("Сторінка проєкту")),
+    )
+
+    kind = models.CharField(_("Тип"), max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    language = models.CharField(_("Мова"), max_length=10)
+    config = models.CharField(max_length=32, default="simple", help_text="Postgres text search config")
+    title = models.CharField(_("Заголовок"), max_length=255)
+    body = models.TextField(_("Текст"), blank=True)
+    slug = models.CharField(max_length=255, blank=True)
+    published_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Пошуковий документ")
+        verbose_name_plural = _("Пошукові документи")
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id"], name="search_document_unique_object"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id} {self.title}"
+
+    def get_absolute_url(self):
+        if self.kind == self.KIND_NEWS:
+            return reverse("detail", kwargs={"slug": self.slug})
+        if self.slug:
+            return reverse("project_detail", kwargs={"slug": self.slug})
+        # у проекта без детальной страницы — якорь карточки в общем списке
+        return f"{reverse('projects')}#project-{self.object_id}"
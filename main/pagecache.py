@@ -0,0 +1,163 @@
+"""
+Кеш целых страниц для публичных вьюх с инвалидацией по тегам.
+
+Ключ страницы = язык + хост + путь + разрешённые GET-параметры + «версии»
+её тегов (``projects``, ``unit:<slug>``, ``project_detail:<slug>``, ``news``,
+``news:<slug>``). Сохранение модели в админке меняет версию только своих
+тегов (см. ``affected_tags`` и main/signals.py) — ключи остальных страниц
+остаются валидными, старые просто истекают по таймауту.
+
+CSRF-токен формы смены языка в кеш не попадает: при сохранении заменяем его
+плейсхолдером, при отдаче подставляем токен текущего запроса.
+"""
+import hashlib
+import re
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.translation import get_language
+
+KEY_PREFIX = "pagecache"
+_CSRF_RE = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+_CSRF_PLACEHOLDER = b"__PAGECACHE_CSRF__"
+
+
+def enabled():
+    return getattr(settings, "PAGE_CACHE_ENABLED", False)
+
+
+def _tag_key(tag):
+    return f"{KEY_PREFIX}:tag:{tag}"
+
+
+def page_key(request, tags, params=()):
+    """Ключ страницы; None — если запрос кешировать нельзя."""
+    if request.method not in ("GET", "HEAD"):
+        return None
+    # чужие параметры (utm и т.п.) не плодят варианты — такие запросы идут мимо кеша
+    if any(name not in params for name in request.GET):
+        return None
+
+    versions = _versions(tags)
+    parts = [
+        get_language() or settings.LANGUAGE_CODE,
+        request.scheme,
+        request.get_host(),
+        request.path,
+        "&".join(f"{name}={request.GET.get(name, '')}" for name in sorted(params) if name in request.GET),
+        ",".join(f"{t}={versions[t]}" for t in sorted(tags)),
+    ]
+    digest = hashlib.md5("|".join(parts).encode()).hexdigest()
+    return f"{KEY_PREFIX}:page:{digest}"
+
+
+def get_cached(request, key):
+    data = cache.get(key)
+    if data is None:
+        return None
+    content = data["content"]
+    if _CSRF_PLACEHOLDER in content:
+        content = content.replace(_CSRF_PLACEHOLDER, get_token(request).encode())
+    response = HttpResponse(content, content_type=data["content_type"])
+    response["X-Page-Cache"] = "HIT"
+    return response
+
+
+def store(key, response):
+    if response.status_code != 200 or response.streaming:
+        return
+    cache.set(key, {
+        "content": _CSRF_RE.sub(rb"\1" + _CSRF_PLACEHOLDER + rb"\2", response.content),
+        "content_type": response["Content-Type"],
+    }, getattr(settings, "PAGE_CACHE_TIMEOUT", 600))
+    response["X-Page-Cache"] = "MISS"
+
+
+def _versions(tags):
+    """
+    {тег: версия}. Пропавшую версию (вытеснена из кеша) заводим заново случайной,
+    а не считаем нулём: «0» совпал бы с ключами страниц, закешированных до правки.
+    """
+    found = cache.get_many([_tag_key(t) for t in tags])
+    return {t: found.get(_tag_key(t)) or cache.get_or_set(_tag_key(t), uuid.uuid4().hex, None) for t in tags}
+
+
+def tag_version(tag):
+    """Текущая версия тега — для ключей производных кешей (напр. карта ?page= → курсор)."""
+    return _versions([tag])[tag]
+
+
+def invalidate(*tags):
+    """Новая версия тега делает недоступными все закешированные с ним страницы."""
+    if tags:
+        cache.set_many({_tag_key(t): uuid.uuid4().hex for t in set(tags)}, None)
+
+
+class CachedPageMixin:
+    """
+    Миксин для TemplateView/ListView/DetailView: отдаёт страницу из кеша,
+    если ни один из её тегов не менялся.
+    """
+    page_cache_params = ()  # GET-параметры, входящие в ключ (?unit=, ?page= ...)
+
+    def get_page_cache_tags(self):
+        return []
+
+    def dispatch(self, request, *args, **kwargs):
+        if not enabled():
+            return super().dispatch(request, *args, **kwargs)
+        key = page_key(request, self.get_page_cache_tags(), self.page_cache_params)
+        if key is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        cached = get_cached(request, key)
+        if cached is not None:
+            return cached
+
+        response = super().dispatch(request, *args, **kwargs)
+        if hasattr(response, "add_post_render_callback"):
+            response.add_post_render_callback(lambda r: store(key, r))
+        else:
+            store(key, response)
+        return response
+
+
+def affected_tags(instance):
+    """Теги страниц, на которых показывается экземпляр модели."""
+    from .models import (Project, ProjectImage, ProjectBadge, OrgUnit, ProjectDetail,
+                         ProjectDetailImage, ProjectDetailGridImage, NewsArticle, NewsImage)
+
+    if isinstance(instance, Project):
+        tags = {"projects"} | {f"unit:{slug}" for slug in instance.units.values_list("slug", flat=True)}
+        if instance.detail_id:
+            slug = ProjectDetail.objects.filter(pk=instance.detail_id).values_list("slug", flat=True).first()
+            if slug:
+                tags.add(f"project_detail:{slug}")
+        return tags
+    if isinstance(instance, (ProjectImage, ProjectBadge)):
+        project = Project.objects.filter(pk=instance.project_id).first()
+        return affected_tags(project) if project else set()
+    if isinstance(instance, OrgUnit):
+        return {"projects", f"unit:{instance.slug}"}
+    if isinstance(instance, ProjectDetail):
+        tags = {f"project_detail:{instance.slug}"}
+        project = Project.objects.filter(detail_id=instance.pk).first() if instance.pk else None
+        if project:
+            tags |= affected_tags(project)
+        return tags
+    if isinstance(instance, ProjectDetailImage):
+        slug = ProjectDetail.objects.filter(pk=instance.detail_id).values_list("slug", flat=True).first()
+        return {f"project_detail:{slug}"} if slug else set()
+    if isinstance(instance, ProjectDetailGridImage):
+        slug = ProjectDetail.objects.filter(pk=instance.project_id).values_list("slug", flat=True).first()
+        return {f"project_detail:{slug}"} if slug else set()
+    if isinstance(instance, NewsArticle):
+        # черновики не видны в списке и «Також подивіться» — трогаем только свою страницу
+        return {f"news:{instance.slug}"} | ({"news"} if instance.is_published else set())
+    if isinstance(instance, NewsImage):
+        slug = NewsArticle.objects.filter(pk=instance.article_id).values_list("slug", flat=True).first()
+        return {f"news:{slug}"} if slug else set()
+    return set()
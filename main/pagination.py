@@ -0,0 +1,140 @@
+"""
+Keyset-пагинация («курсоры») вместо Paginator: без COUNT(*) и OFFSET.
+
+Страница выбирается условием «строго после/до ключа последней показанной
+строки» по упорядоченному набору полей, поэтому стоимость не растёт с
+номером страницы. Курсор — значения ключа строки в URL:
+``?after=<курсор>`` (следующая) и ``?before=<курсор>`` (предыдущая).
+Поля ключа — datetime (микросекунды с эпохи) или целые числа.
+
+Для changelist админки — ``EstimatedCountPaginator`` (оценка числа строк вместо COUNT(*)).
+"""
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_US = timedelta(microseconds=1)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    parts = []
+    for value in values:
+        if isinstance(value, datetime):
+            value = (value - _EPOCH) // _US
+        parts.append(str(int(value)))
+    return "-".join(parts)
+
+
+def decode_cursor(cursor, kinds):
+    """kinds — список типов полей ключа (datetime или int)."""
+    try:
+        raw = [int(p) for p in cursor.split("-")]
+    except (AttributeError, ValueError):
+        raise InvalidCursor(cursor)
+    if len(raw) != len(kinds):
+        raise InvalidCursor(cursor)
+    return [(_EPOCH + n * _US) if kind is datetime else n for n, kind in zip(raw, kinds)]
+
+
+def _beyond(fields, values, lookup):
+    """(f1 ? v1) OR (f1 = v1 AND f2 ? v2) OR ... — сравнение кортежей для индекса."""
+    q = Q()
+    for i, name in enumerate(fields):
+        cond = Q(**{f"{name}__{lookup}": values[i]})
+        for prev, value in zip(fields[:i], values[:i]):
+            cond &= Q(**{prev: value})
+        q |= cond
+    return q
+
+
+@dataclass
+class KeysetPage:
+    object_list: list = field(default_factory=list)
+    next_cursor: str = None
+    prev_cursor: str = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def keyset_page(queryset, fields, kinds, per_page, after=None, before=None):
+    """
+    Одна страница ``queryset`` по убыванию ключа ``fields`` (имена полей).
+    Берём per_page + 1 строк — лишняя говорит, есть ли ещё страница.
+    Бросает InvalidCursor при битом курсоре.
+    """
+    desc = [f"-{name}" for name in fields]
+    key = lambda obj: [getattr(obj, name) for name in fields]
+
+    if before:
+        values = decode_cursor(before, kinds)
+        rows = list(queryset.filter(_beyond(fields, values, "gt")).order_by(*fields)[:per_page + 1])
+        has_more = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        page = KeysetPage(rows)
+        if rows:
+            page.next_cursor = encode_cursor(key(rows[-1]))
+            page.prev_cursor = encode_cursor(key(rows[0])) if has_more else None
+        return page
+
+    qs = queryset.order_by(*desc)
+    if after:
+        qs = qs.filter(_beyond(fields, decode_cursor(after, kinds), "lt"))
+    rows = list(qs[:per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    page = KeysetPage(rows)
+    if rows:
+        page.next_cursor = encode_cursor(key(rows[-1])) if has_more else None
+        page.prev_cursor = encode_cursor(key(rows[0])) if after else None
+    return page
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator для больших таблиц админки: на Postgres число строк берётся из
+    оценки планировщика (EXPLAIN), а точный COUNT(*) — только если оценка
+    меньше ADMIN_EXACT_COUNT_LIMIT (там он дёшев). На других БД — обычный COUNT.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if connection.vendor != "postgresql" or not hasattr(queryset, "query"):
+            return super().count
+        sql, params = queryset.order_by().values("pk").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate < getattr(settings, "ADMIN_EXACT_COUNT_LIMIT", 10000):
+            return super().count
+        return estimate
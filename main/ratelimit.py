@@ -0,0 +1,140 @@
+"""
+Ограничение частоты POST формы контактов (token bucket в кеше Django).
+
+У каждой области (``ip``, ``email``) своё ведро на идентификатор: ``capacity``
+запросов подряд, дальше — пополнение по одному токену каждые
+``period / capacity`` секунд. Проверка идёт до валидации формы и любой записи
+в БД; отказ — дешёвый 429 с ``Retry-After``.
+
+Бэкенд — любой кеш из CACHES (RATE_LIMIT_CACHE). Состояние ведра читается и
+пишется без блокировки: при гонке параллельных запросов лимит может быть
+превышен на единицы, для защиты от всплесков этого достаточно.
+
+Счётчики пропущенных/отклонённых запросов по областям — ``stats()`` и
+``manage.py ratelimit_stats`` (для мониторинга).
+"""
+import hashlib
+import ipaddress
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.translation import gettext as _
+
+KEY_PREFIX = "ratelimit"
+
+
+def _cache():
+    return caches[getattr(settings, "RATE_LIMIT_CACHE", "default")]
+
+
+def contact_limits():
+    """{область: (ёмкость, период в секундах)}"""
+    return getattr(settings, "CONTACT_RATE_LIMITS", {"ip": (5, 600), "email": (3, 3600)})
+
+
+def _bucket_key(scope, identity):
+    # в ключ не кладём сам email/IP: короче, без спецсимволов (memcached) и без персональных данных
+    digest = hashlib.sha1(identity.encode()).hexdigest()
+    return f"{KEY_PREFIX}:bucket:{scope}:{digest}"
+
+
+def _stat_key(scope, outcome):
+    return f"{KEY_PREFIX}:stats:{scope}:{outcome}"
+
+
+def take(scope, identity, capacity, period, now=None):
+    """
+    Забирает токен из ведра. Возвращает (пропущен ли запрос, через сколько секунд
+    появится следующий токен).
+    """
+    cache = _cache()
+    now = time.time() if now is None else now
+    rate = capacity / period
+    key = _bucket_key(scope, identity)
+
+    tokens, updated = cache.get(key) or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * rate)
+    allowed = tokens >= 1
+    if allowed:
+        tokens -= 1
+    cache.set(key, (tokens, now), period)
+    _count(scope, "allowed" if allowed else "rejected")
+    return allowed, 0 if allowed else math.ceil((1 - tokens) / rate)
+
+
+def _count(scope, outcome):
+    cache = _cache()
+    key = _stat_key(scope, outcome)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:  # ключ истёк/вытеснен между add и incr
+            cache.add(key, 1, None)
+
+
+def _trusted_proxy(address):
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(net, strict=False)
+               for net in getattr(settings, "RATE_LIMIT_TRUSTED_PROXIES", ()))
+
+
+def client_ip(request):
+    """
+    IP клиента. RATE_LIMIT_IP_HEADER (напр. HTTP_X_REAL_IP от nginx) читаем,
+    только если запрос пришёл от прокси из RATE_LIMIT_TRUSTED_PROXIES — иначе
+    клиент подставил бы любой IP и обходил лимит.
+    """
+    remote = request.META.get("REMOTE_ADDR", "")
+    header = getattr(settings, "RATE_LIMIT_IP_HEADER", None)
+    if not header or not _trusted_proxy(remote):
+        return remote
+    value = request.META.get(header, "").split(",")[0].strip()
+    try:
+        return str(ipaddress.ip_address(value))  # значение пишется и в ContactMessage.ip
+    except ValueError:
+        return remote
+
+
+def check_contact(request):
+    """None — пропускаем; иначе Retry-After в секундах. Только по сырому POST, без формы."""
+    identities = {
+        "ip": client_ip(request),
+        "email": (request.POST.get("email") or "").strip().lower(),
+    }
+    for scope, (capacity, period) in contact_limits().items():
+        identity = identities.get(scope)
+        if not identity:
+            continue
+        allowed, retry_after = take(scope, identity, capacity, period)
+        if not allowed:
+            return retry_after
+    return None
+
+
+def too_many_requests(retry_after):
+    response = HttpResponse(_("Забагато запитів. Спробуйте пізніше."),
+                            status=429, content_type="text/plain; charset=utf-8")
+    response["Retry-After"] = str(max(1, retry_after))
+    return response
+
+
+def stats():
+    """{область: {"allowed": n, "rejected": n}}"""
+    keys = {(scope, outcome): _stat_key(scope, outcome)
+            for scope in contact_limits() for outcome in ("allowed", "rejected")}
+    values = _cache().get_many(list(keys.values()))
+    result = {}
+    for (scope, outcome), key in keys.items():
+        result.setdefault(scope, {})[outcome] = values.get(key, 0)
+    return result
+
+
+def reset_stats():
+    _cache().delete_many([_stat_key(scope, outcome)
+                          for scope in contact_limits() for outcome in ("allowed", "rejected")])
@@ -0,0 +1,138 @@
+"""
+«Також подивіться» для новостей: таблица RelatedArticle с топом похожих статей.
+
+Оценка пары = RELATED_TERM_WEIGHT × пересечение термов (Жаккар по словам
+заголовка, ліда и текста) + близость дат публикации (полураспад
+RELATED_HALF_LIFE_DAYS). Без общих слов блок заполняется соседями по дате —
+как раньше «последние 6», только от даты самой статьи.
+
+При сохранении статьи пересчитываем её список и вставляем её в списки
+остальных статей, где она проходит в топ; полный пересчёт чужого списка —
+только если статья из него выпала. Вьюха читает блок одним запросом по
+индексу (article, rank).
+"""
+import re
+from collections import Counter
+from html import unescape
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .models import NewsArticle, RelatedArticle
+
+_WORD_RE = re.compile(r"\w{4,}", re.UNICODE)
+MAX_TERMS = 200
+
+
+def _top_n():
+    return getattr(settings, "RELATED_ARTICLES_COUNT", 6)
+
+
+def extract_terms(article):
+    text = " ".join(unescape(strip_tags(p)) for p in (article.title, article.title, article.lead, article.body) if p)
+    words = [w for w in _WORD_RE.findall(text.lower()) if not w.isdigit()]
+    return sorted(w for w, _n in Counter(words).most_common(MAX_TERMS))
+
+
+def score(terms_a, date_a, terms_b, date_b):
+    a, b = set(terms_a), set(terms_b)
+    overlap = len(a & b) / len(a | b) if a and b else 0.0
+    days = abs((date_a - date_b).total_seconds()) / 86400
+    proximity = 0.5 ** (days / getattr(settings, "RELATED_HALF_LIFE_DAYS", 90))
+    return getattr(settings, "RELATED_TERM_WEIGHT", 4.0) * overlap + proximity
+
+
+def _candidates(exclude_pk=None):
+    """(pk, published_at, terms) всех опубликованных статей — один запрос."""
+    qs = NewsArticle.objects.filter(is_published=True)
+    if exclude_pk:
+        qs = qs.exclude(pk=exclude_pk)
+    return list(qs.values_list("pk", "published_at", "related_terms"))
+
+
+def _write(article_pk, scored):
+    """scored — [(score, related_pk)], пишем топ N с рангами."""
+    scored = sorted(scored, key=lambda s: (-s[0], -s[1]))[:_top_n()]
+    RelatedArticle.objects.filter(article_id=article_pk).delete()
+    RelatedArticle.objects.bulk_create([
+        RelatedArticle(article_id=article_pk, related_id=pk, score=value, rank=rank)
+        for rank, (value, pk) in enumerate(scored, start=1)
+    ])
+
+
+def recompute(article_pk, candidates=None):
+    """Полный пересчёт списка одной статьи."""
+    row = NewsArticle.objects.filter(pk=article_pk, is_published=True).values_list("published_at", "related_terms").first()
+    if row is None:
+        return RelatedArticle.objects.filter(article_id=article_pk).delete()
+    date, terms = row
+    candidates = _candidates(article_pk) if candidates is None else candidates
+    _write(article_pk, [(score(terms, date, c_terms, c_date), pk)
+                        for pk, c_date, c_terms in candidates if pk != article_pk])
+
+
+@transaction.atomic
+def update_for(article_pk):
+    """Статья сохранена: обновить её термы, её список и списки, куда она попадает/откуда выпала."""
+    article = NewsArticle.objects.filter(pk=article_pk).first()
+    if article is None:
+        return
+    if not article.is_published:
+        return drop(article_pk)
+
+    terms = extract_terms(article)
+    NewsArticle.objects.filter(pk=article_pk).update(related_terms=terms)  # без save(): не шлём сигналы заново
+    candidates = _candidates(article_pk)
+    recompute(article_pk, candidates + [(article_pk, article.published_at, terms)])
+
+    top_n = _top_n()
+    lists = {}
+    for link in RelatedArticle.objects.exclude(article_id=article_pk).values_list("article_id", "related_id", "score"):
+        lists.setdefault(link[0], []).append((link[2], link[1]))
+
+    for pk, c_date, c_terms in candidates:
+        current = lists.get(pk, [])
+        value = score(c_terms, c_date, terms, article.published_at)
+        was_listed = any(related == article_pk for _s, related in current)
+        others = [(s, related) for s, related in current if related != article_pk]
+        if len(others) < top_n or value > min(s for s, _r in others):
+            _write(pk, others + [(value, article_pk)])
+        elif was_listed:
+            # выпала из чужого топа — на её место нужен следующий кандидат
+            recompute(pk, candidates + [(article_pk, article.published_at, terms)])
+
+
+@transaction.atomic
+def drop(article_pk, affected=None):
+    """Статья снята с публикации/удалена: убрать её из чужих списков и пересчитать их."""
+    if affected is None:
+        affected = list(RelatedArticle.objects.filter(related_id=article_pk).values_list("article_id", flat=True))
+    RelatedArticle.objects.filter(article_id=article_pk).delete()
+    RelatedArticle.objects.filter(related_id=article_pk).delete()
+    if affected:
+        candidates = _candidates(article_pk)
+        for pk in set(affected):
+            recompute(pk, candidates)
+
+
+def rebuild():
+    """Полный пересчёт таблицы (backfill). Возвращает число статей."""
+    for article in NewsArticle.objects.filter(is_published=True).only("title", "lead", "body").iterator(chunk_size=200):
+        NewsArticle.objects.filter(pk=article.pk).update(related_terms=extract_terms(article))
+    candidates = _candidates()
+    with transaction.atomic():
+        RelatedArticle.objects.all().delete()
+        for pk, _date, _terms in candidates:
+            recompute(pk, candidates)
+    return len(candidates)
+
+
+def also_see(article, limit=None):
+    """Похожие видимые статьи — один запрос по индексу (article, rank)."""
+    links = (RelatedArticle.objects
+             .filter(article=article, related__is_published=True, related__published_at__lte=timezone.now())
+             .select_related("related")
+             .order_by("rank")[:limit or _top_n()])
+    return [link.related for link in links]
@@ -0,0 +1,72 @@
+"""
+Массовая перестановка строк с полем ``order`` (перетаскивание в админке).
+
+Вместо формсета на все строки клиент присылает компактный список id в новом
+порядке (``ids=12,5,7,…``). Порядок пересчитывается с шагом REORDER_STEP
+(10, 20, 30…), чтобы новую строку можно было вставить между соседними без
+перенумерации всего набора. Записываются только строки, у которых порядок
+изменился, — одним ``bulk_update`` в транзакции.
+
+``bulk_update`` не шлёт сигналов, поэтому updated_at страницы и её кеш
+обновляем сами (как bulk_upload после ``bulk_create``).
+"""
+from django.conf import settings
+from django.db import transaction
+
+from . import conditional, pagecache
+from .models import NewsImage, ProjectBadge, ProjectDetailGridImage, ProjectDetailImage, ProjectImage
+
+# модели, которые можно переставлять, → поле-ссылка на родителя
+REORDERABLE = {
+    model._meta.model_name: (model, fk)
+    for model, fk in (
+        (ProjectDetailGridImage, "project"),
+        (ProjectDetailImage, "detail"),
+        (ProjectImage, "project"),
+        (ProjectBadge, "project"),
+        (NewsImage, "article"),
+    )
+}
+
+
+def step():
+    return getattr(settings, "REORDER_STEP", 10)
+
+
+def parse_ids(raw):
+    """``"12,5,7"`` → [12, 5, 7]; ValueError на мусоре и повторах."""
+    ids = [int(part) for part in (raw or "").replace(" ", "").split(",") if part]
+    if len(set(ids)) != len(ids):
+        raise ValueError("duplicate ids")
+    return ids
+
+
+def apply(model, fk, parent, ids):
+    """
+    Переставляет строки ``parent`` в порядке ``ids``. Строки, которых нет в
+    списке, сохраняют взаимный порядок и идут следом. Возвращает число
+    изменённых строк; ValueError, если в списке чужие id.
+    """
+    with transaction.atomic():
+        rows = list(model.objects.select_for_update()
+                    .filter(**{fk: parent}).order_by("order", "id").only("pk", "order", fk))
+        by_pk = {row.pk: row for row in rows}
+        unknown = set(ids) - by_pk.keys()
+        if unknown:
+            raise ValueError(f"unknown ids: {sorted(unknown)}")
+
+        listed = set(ids)
+        ordered = [by_pk[pk] for pk in ids] + [row for row in rows if row.pk not in listed]
+        changed = []
+        for position, row in enumerate(ordered, start=1):
+            if row.order != position * step():
+                row.order = position * step()
+                changed.append(row)
+        if not changed:
+            return 0
+
+        model.objects.bulk_update(changed, ["order"], batch_size=500)
+        conditional.touch_parent(changed[0])
+        tags = pagecache.affected_tags(changed[0])
+        transaction.on_commit(lambda: pagecache.invalidate(*tags))
+    return len(changed)
@@ -0,0 +1,217 @@
+"""
+Полнотекстовый поиск по новостям и проектам (/search/).
+
+Индексируемые объекты раскладываются в таблицу SearchDocument (одна строка
+на объект) при сохранении — см. ``sync`` и main/signals.py; сам индекс
+(tsvector + GIN на Postgres, FTS5 на SQLite) обновляют триггеры БД.
+Запрос читает только индекс и не трогает исходные таблицы.
+
+Проект с детальной страницей — один документ (тексты Project + ProjectDetail);
+детальная страница без карточки проекта индексируется отдельно.
+"""
+import re
+from html import unescape
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.translation import get_language
+
+from .models import SearchDocument, NewsArticle, Project, ProjectDetail
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_CONFIG_RE = re.compile(r"^[a-z_]+$")
+MAX_QUERY_TERMS = 10
+
+
+def _plain(*parts):
+    return "\n".join(unescape(strip_tags(p)) for p in parts if p)
+
+
+def _language():
+    """Язык контента (пока весь контент пишется на одном языке — LANGUAGE_CODE)."""
+    return getattr(settings, "SEARCH_CONTENT_LANGUAGE", settings.LANGUAGE_CODE)
+
+
+def _config(language):
+    return getattr(settings, "SEARCH_CONFIGS", {}).get(language, "simple")
+
+
+def _upsert(kind, object_id, **fields):
+    language = _language()
+    SearchDocument.objects.update_or_create(
+        kind=kind, object_id=object_id,
+        defaults=dict(fields, language=language, config=_config(language)),
+    )
+
+
+def _drop(kind, object_id):
+    SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+# --- Синхронизация документов
+
+def sync_news(article):
+    if not article.is_published:
+        return _drop(SearchDocument.KIND_NEWS, article.pk)
+    _upsert(SearchDocument.KIND_NEWS, article.pk,
+            title=article.title, slug=article.slug, published_at=article.published_at,
+            body=_plain(article.lead, article.body))
+
+
+def sync_project(project):
+    detail = project.detail if project.detail_id else None
+    if not project.is_published:
+        _drop(SearchDocument.KIND_PROJECT, project.pk)
+    else:
+        detail_live = detail is not None and detail.is_published
+        parts = [project.description, project.goal, project.partners, project.results]
+        if detail_live:
+            parts += [detail.subtitle, detail.lead, detail.body, detail.goal, detail.partners, detail.results]
+        _upsert(SearchDocument.KIND_PROJECT, project.pk,
+                title=project.title, slug=detail.slug if detail_live else "", published_at=None,
+                body=_plain(*parts))
+    if detail is not None:
+        _drop(SearchDocument.KIND_PROJECT_DETAIL, detail.pk)
+    sync_orphan_details()
+
+
+def sync_detail(detail):
+    project = Project.objects.filter(detail=detail).first()
+    if project is not None:
+        _drop(SearchDocument.KIND_PROJECT_DETAIL, detail.pk)
+        return sync_project(project)
+    if not detail.is_published:
+        return _drop(SearchDocument.KIND_PROJECT_DETAIL, detail.pk)
+    _upsert(SearchDocument.KIND_PROJECT_DETAIL, detail.pk,
+            title=detail.title_override or detail.slug, slug=detail.slug, published_at=None,
+            body=_plain(detail.subtitle, detail.lead, detail.body, detail.goal, detail.partners, detail.results))
+
+
+def sync_orphan_details():
+    """Детальные страницы, отвязанные от проекта, снова индексируются сами по себе."""
+    indexed = SearchDocument.objects.filter(kind=SearchDocument.KIND_PROJECT_DETAIL).values("object_id")
+    for detail in (ProjectDetail.objects
+                   .filter(project__isnull=True, is_published=True)
+                   .exclude(pk__in=indexed)):
+        sync_detail(detail)
+
+
+def sync(instance):
+    if isinstance(instance, NewsArticle):
+        sync_news(instance)
+    elif isinstance(instance, Project):
+        sync_project(instance)
+    elif isinstance(instance, ProjectDetail):
+        sync_detail(instance)
+
+
+def remove(instance):
+    if isinstance(instance, NewsArticle):
+        _drop(SearchDocument.KIND_NEWS, instance.pk)
+    elif isinstance(instance, Project):
+        _drop(SearchDocument.KIND_PROJECT, instance.pk)
+        sync_orphan_details()
+    elif isinstance(instance, ProjectDetail):
+        _drop(SearchDocument.KIND_PROJECT_DETAIL, instance.pk)
+        # карточка проекта остаётся (detail уже NULL) — убираем из неё текст детальной страницы
+        project_ids = (SearchDocument.objects
+                       .filter(kind=SearchDocument.KIND_PROJECT, slug=instance.slug)
+                       .values_list("object_id", flat=True))
+        for project in Project.objects.filter(pk__in=list(project_ids)):
+            sync_project(project)
+
+
+def rebuild():
+    """Полная перестройка (backfill / после ручных правок БД). Возвращает число документов."""
+    SearchDocument.objects.all().delete()
+    for article in NewsArticle.objects.filter(is_published=True).iterator(chunk_size=200):
+        sync_news(article)
+    for project in Project.objects.filter(is_published=True).select_related("detail").iterator(chunk_size=200):
+        sync_project(project)
+    sync_orphan_details()
+    return SearchDocument.objects.count()
+
+
+# --- Запрос
+
+def _postgres_ids(query, language, limit):
+    # отдельный tsquery-литерал на каждый конфиг: с константой GIN-индекс работает
+    # (BitmapOr), а websearch_to_tsquery(config-строки, ...) дал бы seq scan
+    configs = sorted({c for c in getattr(settings, "SEARCH_CONFIGS", {}).values() if _CONFIG_RE.match(c)} | {"simple"})
+    match = " OR ".join(
+        f"(config = '{c}' AND search_vector @@ websearch_to_tsquery('{c}', %s))" for c in configs)
+    rank = " ".join(
+        f"WHEN '{c}' THEN ts_rank_cd(search_vector, websearch_to_tsquery('{c}', %s))" for c in configs)
+    sql = f"""
+        SELECT id
+        FROM main_searchdocument
+        WHERE ({match})
+          AND (published_at IS NULL OR published_at <= %s)
+        ORDER BY (language = %s) DESC, CASE config {rank} END DESC, published_at DESC NULLS LAST
+        LIMIT %s
+    """
+    params = [query] * len(configs) + [timezone.now(), language] + [query] * len(configs) + [limit]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _sqlite_ids(query, language, limit):
+    terms = _WORD_RE.findall(query)[:MAX_QUERY_TERMS]
+    if not terms:
+        return []
+    # каждое слово — префикс в кавычках: без синтаксиса FTS5 из пользовательского ввода
+    match = " ".join(f'"{term}"*' for term in terms)
+    sql = """
+        SELECT d.id
+        FROM main_searchdocument_fts
+        JOIN main_searchdocument d ON d.id = main_searchdocument_fts.rowid
+        WHERE main_searchdocument_fts MATCH %s
+          AND (d.published_at IS NULL OR d.published_at <= %s)
+        ORDER BY (d.language = %s) DESC, bm25(main_searchdocument_fts, 10.0, 1.0), d.published_at DESC
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [match, connection.ops.adapt_datetimefield_value(timezone.now()), language, limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _fallback_ids(query, language, limit):
+    qs = SearchDocument.objects.filter(Q(published_at__isnull=True) | Q(published_at__lte=timezone.now()))
+    for term in _WORD_RE.findall(query)[:MAX_QUERY_TERMS]:
+        qs = qs.filter(Q(title__icontains=term) | Q(body__icontains=term))
+    return list(qs.order_by("-published_at").values_list("id", flat=True)[:limit])
+
+
+def search(query, limit=50):
+    """Документы по релевантности; документы на языке интерфейса — выше."""
+    query = (query or "").strip()
+    if not query:
+        return []
+    backend = {"postgresql": _postgres_ids, "sqlite": _sqlite_ids}.get(connection.vendor, _fallback_ids)
+    ids = backend(query, get_language() or settings.LANGUAGE_CODE, limit)
+    docs = SearchDocument.objects.in_bulk(ids)
+    return [docs[i] for i in ids if i in docs]
+
+
+# --- Поиск по обращениям в админке (индекс — миграция 0020_contact_message_search)
+
+def contact_ids(query):
+    """
+    Подзапрос id ContactMessage, где встречаются все слова query (как префиксы),
+    для ``pk__in``; None — индекса на этой БД нет (искать обычным icontains).
+    """
+    terms = [t.lower() for t in _WORD_RE.findall(query or "")[:MAX_QUERY_TERMS]]
+    if not terms:
+        return None
+    if connection.vendor == "postgresql":
+        return RawSQL("SELECT id FROM main_contactmessage WHERE search_vector @@ to_tsquery('simple', %s)",
+                      [" & ".join(f"{term}:*" for term in terms)])
+    if connection.vendor == "sqlite":
+        return RawSQL("SELECT rowid FROM main_contactmessage_fts WHERE main_contactmessage_fts MATCH %s",
+                      [" ".join(f'"{term}"*' for term in terms)])
+    return None
@@ -0,0 +1,182 @@
+# main/signals.py
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import conditional, images, jobs, pagecache, related, search, sitemaps, video
+from .models import (Project, ProjectImage, ProjectBadge, OrgUnit, ProjectDetail,
+                     ProjectDetailImage, ProjectDetailGridImage, NewsArticle, NewsImage, RelatedArticle)
+
+# модели, изменение которых видно на закешированных страницах
+PAGE_CACHE_MODELS = (Project, ProjectImage, ProjectBadge, OrgUnit, ProjectDetail,
+                     ProjectDetailImage, ProjectDetailGridImage, NewsArticle, NewsImage)
+
+
+# --- Адаптивные варианты фото: кодирование AVIF/WebP — в фоновой задаче, чистим при удалении
+@receiver(post_save, dispatch_uid="main.responsive_variants_save")
+def build_responsive_variants(sender, instance, raw=False, **kwargs):
+    fields = images.fields_for(instance)
+    if raw or not any(images.is_stale(instance, f, m) for f, m in fields.items()):
+        return
+    jobs.enqueue_once("image_variants", model=instance._meta.label, pk=instance.pk)
+
+
+@receiver(post_delete, dispatch_uid="main.responsive_variants_delete")
+def drop_responsive_variants(sender, instance, **kwargs):
+    for field_name, manifest_field in images.fields_for(instance).items():
+        images.delete_variants(getattr(instance, field_name).storage, getattr(instance, manifest_field))
+
+
+# --- Вес файла: пишем при загрузке (размеры заполняет сам ImageField через width_field/height_field)
+@receiver(pre_save, dispatch_uid="main.image_file_size")
+def store_image_file_size(sender, instance, raw=False, **kwargs):
+    if raw or not hasattr(instance, "file_size"):
+        return
+    image = instance.image
+    if not image:
+        instance.file_size = None
+    elif not image._committed or instance.file_size is None:
+        try:
+            instance.file_size = image.size
+            # FieldFile.save(ContentFile) не всегда заполняет width_field/height_field
+            if instance.width is None or instance.height is None:
+                instance.width, instance.height = image.width, image.height
+        except (OSError, ValueError):
+            instance.file_size = None
+
+
+# --- Видео: faststart и метаданные только для нового файла (до FieldFile.pre_save он ещё не сохранён);
+#     копирование файла — в фоновой задаче, очистку поля обрабатываем сразу
+@receiver(pre_save, dispatch_uid="main.video_pre_save")
+def remember_new_video(sender, instance, raw=False, **kwargs):
+    field_name = video.field_for(instance)
+    if raw or not field_name:
+        return
+    file = getattr(instance, field_name)
+    instance._video_changed = (not file._committed) if file else instance.video_size is not None
+
+
+@receiver(post_save, dispatch_uid="main.video_post_save")
+def process_new_video(sender, instance, raw=False, **kwargs):
+    if raw or not getattr(instance, "_video_changed", False):
+        return
+    instance._video_changed = False
+    if getattr(instance, video.field_for(instance)):
+        jobs.enqueue("process_video", model=instance._meta.label, pk=instance.pk)
+    else:
+        video.process(instance)
+
+
+# --- Кеш страниц: сбрасываем теги и старого, и нового состояния (смена слага, снятие с публикации)
+def _invalidate_on_commit(tags):
+    if tags:
+        transaction.on_commit(lambda: pagecache.invalidate(*tags))
+
+
+@receiver(pre_save, dispatch_uid="main.pagecache_pre_save")
+def remember_page_cache_tags(sender, instance, raw=False, **kwargs):
+    if raw or sender not in PAGE_CACHE_MODELS or not instance.pk:
+        return
+    old = sender._default_manager.filter(pk=instance.pk).first()
+    instance._pagecache_old_tags = pagecache.affected_tags(old) if old else set()
+
+
+@receiver(post_save, dispatch_uid="main.pagecache_post_save")
+def invalidate_page_cache_on_save(sender, instance, raw=False, **kwargs):
+    if raw or sender not in PAGE_CACHE_MODELS:
+        return
+    tags = pagecache.affected_tags(instance) | getattr(instance, "_pagecache_old_tags", set())
+    _invalidate_on_commit(tags)
+
+
+@receiver(pre_delete, dispatch_uid="main.pagecache_pre_delete")
+def invalidate_page_cache_on_delete(sender, instance, **kwargs):
+    # pre_delete: пока живы связи (units, project), по которым ищем страницы
+    if sender in PAGE_CACHE_MODELS:
+        _invalidate_on_commit(pagecache.affected_tags(instance))
+
+
+@receiver(m2m_changed, sender=Project.units.through, dispatch_uid="main.pagecache_units")
+def invalidate_page_cache_on_units(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("pre_clear", "post_add", "post_remove"):
+        return
+    tags = pagecache.affected_tags(instance)
+    if pk_set and not reverse:
+        tags |= {f"unit:{slug}" for slug in OrgUnit.objects.filter(pk__in=pk_set).values_list("slug", flat=True)}
+    elif pk_set:
+        for project in Project.objects.filter(pk__in=pk_set):
+            tags |= pagecache.affected_tags(project)
+    _invalidate_on_commit(tags)
+
+
+# --- Условный GET: у дочерних строк нет своих меток времени — обновляем updated_at страницы
+TOUCH_PARENT_MODELS = (Project, ProjectImage, ProjectBadge, OrgUnit,
+                       ProjectDetailImage, ProjectDetailGridImage, NewsImage)
+
+
+@receiver(post_save, dispatch_uid="main.touch_parent_save")
+@receiver(post_delete, dispatch_uid="main.touch_parent_delete")
+def touch_parent_page(sender, instance, raw=False, **kwargs):
+    if raw or sender not in TOUCH_PARENT_MODELS:
+        return
+    conditional.touch_parent(instance)
+
+
+@receiver(m2m_changed, sender=Project.units.through, dispatch_uid="main.touch_parent_units")
+def touch_parent_page_on_units(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_clear", "post_add", "post_remove"):
+        return
+    if not reverse:
+        conditional.touch_parent(instance)
+    elif pk_set:
+        ProjectDetail.objects.filter(project__pk__in=pk_set).update(updated_at=timezone.now())
+
+
+# --- Sitemap: пересобираем только секцию изменённой модели — фоновой задачей, одной на серию правок
+SITEMAP_SECTIONS = {ProjectDetail: "projects", NewsArticle: "news"}
+
+
+@receiver(post_save, dispatch_uid="main.sitemap_save")
+@receiver(post_delete, dispatch_uid="main.sitemap_delete")
+def rebuild_sitemap_section(sender, instance, raw=False, **kwargs):
+    section = SITEMAP_SECTIONS.get(sender)
+    if raw or section is None:
+        return
+    jobs.enqueue_once("sitemap", section=section)
+
+
+# --- Поиск: документ индекса обновляется в той же транзакции, что и объект
+SEARCH_MODELS = (NewsArticle, Project, ProjectDetail)
+
+
+@receiver(post_save, dispatch_uid="main.search_save")
+def update_search_document(sender, instance, raw=False, **kwargs):
+    if raw or sender not in SEARCH_MODELS:
+        return
+    search.sync(instance)
+
+
+@receiver(post_delete, dispatch_uid="main.search_delete")
+def remove_search_document(sender, instance, **kwargs):
+    if sender in SEARCH_MODELS:
+        search.remove(instance)
+
+
+# --- «Також подивіться»: пересчёт в той же транзакции, чтобы кеш страниц не увидел старый блок
+@receiver(post_save, sender=NewsArticle, dispatch_uid="main.related_save")
+def update_related_articles(sender, instance, raw=False, **kwargs):
+    if not raw:
+        related.update_for(instance.pk)
+
+
+@receiver(pre_delete, sender=NewsArticle, dispatch_uid="main.related_pre_delete")
+def remember_related_articles(sender, instance, **kwargs):
+    # после удаления строки RelatedArticle уже сняты каскадом — запоминаем, чьи списки пересчитать
+    instance._related_affected = list(
+        RelatedArticle.objects.filter(related=instance).values_list("article_id", flat=True))
+
+
+@receiver(post_delete, sender=NewsArticle, dispatch_uid="main.related_delete")
+def drop_related_articles(sender, instance, **kwargs):
+    related.drop(instance.pk, getattr(instance, "_related_affected", None))
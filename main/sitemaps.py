@@ -0,0 +1,190 @@
+"""
+Генерация sitemap в файлы (XML + .gz рядом) — nginx отдаёт их как статику.
+
+Раскладка в SITEMAP_ROOT:
+    sitemap.xml            — индекс
+    pages-uk.xml, pages-en.xml, projects-uk.xml, news-en.xml, ...
+    index.json             — lastmod каждого файла, чтобы пересобирать индекс
+                             без обхода всех секций
+
+Секция пересобирается целиком фоновой задачей ``sitemap`` (main/jobs.py) после
+сохранения/удаления её модели (см. main/signals.py); пока задача секции стоит
+в очереди, новые не ставятся — серия правок в админке даёт одну пересборку.
+Остальные файлы не трогаем.
+"""
+import gzip
+import json
+import os
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone, translation
+
+from .models import ProjectDetail, NewsArticle
+
+MAX_URLS_PER_FILE = 50000
+
+# статические страницы: (имя url, priority)
+STATIC_PAGES = (
+    ("index", "1.0"),
+    ("projects", "0.8"),
+    ("go-spilna-peremoga", "0.8"),
+    ("go-creative-agency", "0.8"),
+    ("go-sp-production", "0.8"),
+    ("list", "0.7"),
+)
+
+
+def _root():
+    return str(getattr(settings, "SITEMAP_ROOT", os.path.join(settings.MEDIA_ROOT, "sitemaps")))
+
+
+def _site_url():
+    return getattr(settings, "SITE_URL", "https://spilnaperemoga.com").rstrip("/")
+
+
+def _languages():
+    return getattr(settings, "SITEMAP_LANGUAGES", [code for code, _name in settings.LANGUAGES])
+
+
+def _localized(url_name, lang, **kwargs):
+    with translation.override(lang):
+        return _site_url() + reverse(url_name, kwargs=kwargs or None)
+
+
+def _media_url(file):
+    url = file.url
+    return url if url.startswith("http") else _site_url() + url
+
+
+# --- Источники данных секций: (url_name, kwargs, lastmod, priority, [image urls])
+
+def _pages_entries():
+    for name, priority in STATIC_PAGES:
+        yield name, {}, None, priority, []
+
+
+def _projects_entries():
+    qs = (ProjectDetail.objects
+          .filter(is_published=True)
+          .only("slug", "created_at", "updated_at", "cover")
+          .order_by("-created_at"))
+    for d in qs.iterator(chunk_size=500):
+        yield "project_detail", {"slug": d.slug}, d.updated_at or d.created_at, "0.6", [_media_url(d.cover)] if d.cover else []
+
+
+def _news_entries():
+    qs = (NewsArticle.objects
+          .filter(is_published=True, published_at__lte=timezone.now())
+          .only("slug", "updated_at", "cover")
+          .order_by("-published_at"))
+    for a in qs.iterator(chunk_size=500):
+        yield "detail", {"slug": a.slug}, a.updated_at, "0.6", [_media_url(a.cover)] if a.cover else []
+
+
+SECTIONS = {
+    "pages": _pages_entries,
+    "projects": _projects_entries,
+    "news": _news_entries,
+}
+
+
+# --- Запись файлов
+
+def _write(name, content):
+    """Атомарно пишет name и name.gz (для nginx gzip_static)."""
+    root = _root()
+    os.makedirs(root, exist_ok=True)
+    data = content.encode("utf-8")
+    for path, payload in ((name, data), (name + ".gz", gzip.compress(data, compresslevel=9, mtime=0))):
+        full = os.path.join(root, path)
+        tmp = full + ".tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(payload)
+        os.replace(tmp, full)
+
+
+def _remove(name):
+    for path in (name, name + ".gz"):
+        try:
+            os.remove(os.path.join(_root(), path))
+        except FileNotFoundError:
+            pass
+
+
+def _url_xml(url_name, kwargs, lastmod, priority, image_urls, lang, languages):
+    parts = [f"<url><loc>{escape(_localized(url_name, lang, **kwargs))}</loc>"]
+    for alt in languages:
+        parts.append(f'<xhtml:link rel="alternate" hreflang="{alt}" href="{escape(_localized(url_name, alt, **kwargs))}"/>')
+    if lastmod:
+        parts.append(f"<lastmod>{lastmod.isoformat(timespec='seconds')}</lastmod>")
+    parts.append(f"<priority>{priority}</priority>")
+    for img in image_urls:
+        parts.append(f"<image:image><image:loc>{escape(img)}</image:loc></image:image>")
+    parts.append("</url>")
+    return "".join(parts)
+
+
+_URLSET_OPEN = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+                'xmlns:xhtml="http://www.w3.org/1999/xhtml" '
+                'xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">\n')
+
+
+def _load_state():
+    try:
+        with open(os.path.join(_root(), "index.json"), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_state(state):
+    path = os.path.join(_root(), "index.json")
+    with open(path + ".tmp", "w", encoding="utf-8") as fh:
+        json.dump(state, fh, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def build_section(section, state=None):
+    """Пересобирает файлы одной секции для всех языков; возвращает обновлённое состояние индекса."""
+    state = _load_state() if state is None else state
+    languages = _languages()
+    entries = list(SECTIONS[section]())
+    lastmod = max((e[2] for e in entries if e[2]), default=None)
+
+    # старые файлы секции (могло стать меньше страниц)
+    for name in [n for n in state if n.startswith(f"{section}-")]:
+        _remove(name)
+        del state[name]
+
+    for lang in languages:
+        for page, start in enumerate(range(0, max(len(entries), 1), MAX_URLS_PER_FILE), start=1):
+            chunk = entries[start:start + MAX_URLS_PER_FILE]
+            name = f"{section}-{lang}.xml" if page == 1 else f"{section}-{lang}-{page}.xml"
+            body = "\n".join(_url_xml(*e, lang=lang, languages=languages) for e in chunk)
+            _write(name, _URLSET_OPEN + body + "\n</urlset>\n")
+            state[name] = lastmod.isoformat(timespec="seconds") if lastmod else None
+    return state
+
+
+def build_index(state):
+    items = []
+    for name in sorted(state):
+        item = f"<sitemap><loc>{escape(_site_url())}/sitemaps/{escape(name)}</loc>"
+        if state[name]:
+            item += f"<lastmod>{state[name]}</lastmod>"
+        items.append(item + "</sitemap>")
+    _write("sitemap.xml", '<?xml version="1.0" encoding="UTF-8"?>\n'
+                          '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+                          + "\n".join(items) + "\n</sitemapindex>\n")
+    _save_state(state)
+
+
+def rebuild(*sections):
+    """Пересобрать указанные секции (по умолчанию все) и индекс."""
+    state = _load_state()
+    for section in sections or SECTIONS:
+        state = build_section(section, state)
+    build_index(state)
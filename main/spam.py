@@ -0,0 +1,272 @@
+"""
+Оценка спама для ContactMessage в два этапа: сначала дешёвое, потом тяжёлое.
+
+1. Inline, до сохранения (только память и кеш):
+   honeypot, подписанная метка времени открытия формы (слишком быстро / нет метки),
+   плотность ссылок, отпечаток текста в скользящем наборе (кеш с TTL).
+   Заполненный honeypot — сообщение не сохраняем вовсе.
+2. Отложенно, фоновой задачей ``contact_spam_check`` (main/jobs.py, ``run_jobs``):
+   история отправителя за сутки, почти-дубликаты среди недавних сообщений
+   других отправителей, MX домена email (без MX — A/AAAA).
+
+Каждая проверка добавляет баллы и код причины в ``spam_reasons``. От
+SPAM_QUARANTINE_SCORE сообщение уходит в карантин; письма (OutboxEmail)
+ставятся в очередь только для чистых сообщений и только после второго этапа.
+"""
+import hashlib
+import logging
+import os
+import re
+import socket
+import struct
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .emailing import contact_context, queue_contact_emails
+from .models import ContactMessage
+
+logger = logging.getLogger(__name__)
+
+TOKEN_SALT = "main.contact-form-started"
+FINGERPRINT_PREFIX = "spam:fp"
+
+_URL_RE = re.compile(r"(https?://|www\.|\b[\w-]+\.(?:com|net|org|ru|info|biz|xyz|top|io)\b)", re.I)
+_WORD_RE = re.compile(r"\w+")
+
+# баллы за признаки
+WEIGHTS = {
+    "no_token": 3,       # форму отправили не со страницы (нет/подделана метка)
+    "too_fast": 4,       # от открытия до отправки меньше SPAM_MIN_FILL_SECONDS
+    "stale_token": 1,    # страница открыта больше суток назад
+    "links": 3,          # 3+ ссылки
+    "link_density": 2,   # ссылки в коротком тексте
+    "duplicate": 4,      # тот же текст уже приходил за SPAM_DUPLICATE_WINDOW
+    "sender_burst": 2,   # много сообщений с того же IP/email за сутки
+    "campaign": 3,       # почти тот же текст от других отправителей
+    "bad_domain": 3,     # домен email не существует или не принимает почту
+}
+
+
+def quarantine_score():
+    return getattr(settings, "SPAM_QUARANTINE_SCORE", 5)
+
+
+# --- Метка времени формы
+
+def issue_token():
+    return signing.dumps(time.time(), salt=TOKEN_SALT)
+
+
+def _token_age(token):
+    try:
+        return time.time() - float(signing.loads(token, salt=TOKEN_SALT))
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+
+
+# --- Этап 1
+
+def fingerprint(text):
+    """Отпечаток текста без регистра, пунктуации и лишних пробелов."""
+    words = _WORD_RE.findall((text or "").lower())
+    return hashlib.sha1(" ".join(words).encode()).hexdigest()
+
+
+def score_inline(data, cleaned):
+    """
+    (баллы, причины) по сырым данным формы и очищенным полям; баллы None —
+    заведомый бот (honeypot), сообщение не сохраняем.
+    """
+    if data.get("website"):
+        return None, ["honeypot"]
+
+    reasons = []
+    age = _token_age(data.get("started"))
+    if age is None:
+        reasons.append("no_token")
+    elif age < getattr(settings, "SPAM_MIN_FILL_SECONDS", 3):
+        reasons.append("too_fast")
+    elif age > 24 * 3600:
+        reasons.append("stale_token")
+
+    message = cleaned.get("message", "")
+    links = len(_URL_RE.findall(message))
+    words = len(_WORD_RE.findall(message)) or 1
+    if links >= 3:
+        reasons.append("links")
+    elif links and links * 100 / words > 10:
+        reasons.append("link_density")
+
+    # первый отправитель текста кладёт отпечаток, остальные — дубликаты. cache.add атомарен
+    # на Redis/Memcached, но не на FileBasedCache (has_key + set): два одновременных
+    # одинаковых сообщения могут оба пройти — для эвристики допустимо, рассылку от разных
+    # отправителей всё равно поймает «campaign» на втором этапе
+    window = getattr(settings, "SPAM_DUPLICATE_WINDOW", 24 * 3600)
+    if not cache.add(f"{FINGERPRINT_PREFIX}:{fingerprint(message)}", 1, window):
+        reasons.append("duplicate")
+
+    return sum(WEIGHTS[r] for r in reasons), reasons
+
+
+def apply(contact, score, reasons):
+    contact.spam_score = score
+    contact.spam_reasons = reasons
+    contact.is_quarantined = score >= quarantine_score()
+    return contact
+
+
+# --- Этап 2
+
+def _shingles(text, size=3):
+    words = _WORD_RE.findall((text or "").lower())
+    return {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+
+
+def _nameservers():
+    try:
+        with open("/etc/resolv.conf", encoding="ascii", errors="ignore") as fh:
+            return [parts[1] for parts in map(str.split, fh) if len(parts) > 1 and parts[0] == "nameserver"]
+    except OSError:
+        return []
+
+
+def _skip_name(data, pos):
+    while data[pos]:
+        if data[pos] & 0xC0 == 0xC0:  # сжатие: ссылка на имя выше по пакету
+            return pos + 2
+        pos += data[pos] + 1
+    return pos + 1
+
+
+def _parse_mx(data, query_id):
+    """
+    Ответ DNS на MX-запрос → None (NXDOMAIN) или список MX: True — обычный
+    сервер, False — «null MX» (RFC 7505, домен почту не принимает). OSError,
+    если ответ не наш, обрезан или с ошибкой сервера.
+    """
+    qid, flags, qdcount, ancount = struct.unpack(">2sHHH", data[:8])
+    if qid != query_id or flags & 0x0200:
+        raise OSError("неочікувана або обрізана DNS-відповідь")
+    rcode = flags & 0x000F
+    if rcode == 3:
+        return None
+    if rcode:
+        raise OSError(f"DNS rcode {rcode}")
+    pos = 12
+    for _ in range(qdcount):
+        pos = _skip_name(data, pos) + 4
+    exchanges = []
+    for _ in range(ancount):
+        pos = _skip_name(data, pos)
+        rtype, _class, _ttl, length = struct.unpack(">HHIH", data[pos:pos + 10])
+        pos += 10
+        if rtype == 15:  # MX: 2 байта приоритета + имя; у null MX имя — корень (b"\0")
+            exchanges.append(data[pos + 2:pos + length] != b"\0")
+        pos += length
+    return exchanges
+
+
+def _mx_exchanges(domain, timeout=2.0):
+    """MX-записи домена одним UDP-запросом к системному резолверу (см. _parse_mx)."""
+    servers = _nameservers()
+    if not servers:
+        raise OSError("немає nameserver у /etc/resolv.conf")
+    qname = b"".join(bytes([len(label)]) + label for label in domain.encode("idna").split(b".") if label)
+    query_id = os.urandom(2)
+    # рекурсивный запрос, один вопрос: <domain> IN MX
+    query = query_id + struct.pack(">HHHHH", 0x0100, 1, 0, 0, 0) + qname + b"\0" + struct.pack(">HH", 15, 1)
+    family = socket.AF_INET6 if ":" in servers[0] else socket.AF_INET
+    with socket.socket(family, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(timeout)
+        sock.sendto(query, (servers[0], 53))
+        data = sock.recv(4096)
+    try:
+        return _parse_mx(data, query_id)
+    except (IndexError, struct.error) as exc:
+        raise OSError(f"битая DNS-відповідь: {exc}")
+
+
+def _domain_missing(email):
+    if not getattr(settings, "SPAM_CHECK_EMAIL_DOMAIN", True):
+        return False
+    domain = email.rpartition("@")[2]
+    try:
+        exchanges = _mx_exchanges(domain)
+    except (UnicodeError, OSError):
+        exchanges = []  # резолвер недоступен — решит getaddrinfo ниже
+    if exchanges is None:
+        return True
+    if exchanges:
+        return not any(exchanges)
+    # MX нет — по RFC 5321 почта идёт на сам домен (A/AAAA)
+    try:
+        socket.getaddrinfo(domain, None)
+    except socket.gaierror as exc:
+        # только однозначное «нет такого домена»; сбой DNS — не повод для карантина
+        return exc.errno == socket.EAI_NONAME
+    except (UnicodeError, OSError):
+        return False
+    return False
+
+
+def score_deferred(contact):
+    reasons = []
+    since = contact.created_at - timedelta(days=1)
+    others = ContactMessage.objects.exclude(pk=contact.pk)
+
+    sender = others.filter(created_at__gte=since, email=contact.email)
+    if contact.ip:
+        sender = sender | others.filter(created_at__gte=since, ip=contact.ip)
+    if sender.count() >= getattr(settings, "SPAM_SENDER_BURST", 3):
+        reasons.append("sender_burst")
+
+    mine = _shingles(contact.message)
+    recent = (others.exclude(email=contact.email)
+              .filter(created_at__gte=contact.created_at - timedelta(days=7))
+              .order_by("-created_at")
+              .values_list("message", flat=True)[:getattr(settings, "SPAM_CAMPAIGN_SAMPLE", 200)])
+    for message in recent:
+        theirs = _shingles(message)
+        if len(mine & theirs) / len(mine | theirs) >= 0.8:
+            reasons.append("campaign")
+            break
+
+    if _domain_missing(contact.email):
+        reasons.append("bad_domain")
+    return sum(WEIGHTS[r] for r in reasons), reasons
+
+
+def run_deferred(contact_id):
+    """Обработчик фоновой задачи: досчитывает оценку и ставит письма для чистых сообщений."""
+    contact = ContactMessage.objects.filter(pk=contact_id).first()
+    if contact is None or contact.spam_checked_at:
+        return {"skipped": True}
+
+    score, reasons = score_deferred(contact)
+    contact.spam_score += score
+    contact.spam_reasons = [*contact.spam_reasons, *reasons]
+    contact.is_quarantined = contact.spam_score >= quarantine_score()
+    contact.spam_checked_at = timezone.now()
+    with transaction.atomic():
+        contact.save(update_fields=["spam_score", "spam_reasons", "is_quarantined", "spam_checked_at"])
+        if contact.is_quarantined:
+            return {"score": contact.spam_score, "quarantined": True}
+        ok, info = queue_contact_emails(contact, contact_context(contact))
+    if not ok:
+        logger.warning("Листи для звернення %s не поставлено в чергу: %s", contact.pk, info)
+    return {"score": contact.spam_score, "quarantined": False, "emails": info}
+
+
+def release(contact):
+    """Снять с карантина вручную (админка) и отправить отложенные письма."""
+    with transaction.atomic():
+        ContactMessage.objects.filter(pk=contact.pk).update(is_quarantined=False)
+        if contact.emails.exists():
+            return True, "already queued"
+        return queue_contact_emails(contact, contact_context(contact))
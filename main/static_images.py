@@ -0,0 +1,161 @@
+"""
+WebP/AVIF-варианты картинок из static/images (герои и галереи юнит-страниц).
+
+``manage.py optimize_static_images`` перекодирует каждую растровую картинку в
+несколько ширин (RESPONSIVE_IMAGE_WIDTHS, те же форматы, что и для загрузок —
+main/images.py) в пуле процессов и пишет варианты в
+``static/images/_variants/``, а манифест — в ``_variants/manifest.json``:
+
+    {"options": "...", "images": {"images/ka_3.jpg": {
+        "hash": "…", "width": 2400, "height": 1600,
+        "avif": {"480": "images/_variants/ka_3-jpg-480.avif", ...},
+        "webp": {...}}}}
+
+Неизменённые файлы (тот же sha256 и те же настройки) пропускаются.
+Тег ``{% static_picture "images/ka_3.jpg" %}`` строит <picture> по манифесту.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from django.conf import settings
+
+from . import images
+
+VARIANTS_DIR = "_variants"
+MANIFEST_FILE = "manifest.json"
+SOURCE_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp")
+
+_manifest_cache = {}  # "manifest" → (mtime, данные)
+
+
+def source_dir():
+    return Path(getattr(settings, "STATIC_IMAGES_DIR", Path(settings.BASE_DIR) / "static" / "images"))
+
+
+def static_prefix():
+    """Префикс имён в static для source_dir() (static/images → "images")."""
+    return source_dir().name
+
+
+def manifest_path():
+    return source_dir() / VARIANTS_DIR / MANIFEST_FILE
+
+
+def options_key(widths, formats):
+    """Подпись настроек: смена ширин/качества пересобирает всё."""
+    return json.dumps({"widths": list(widths), "formats": {f: images.FORMATS[f][2] for f in formats}}, sort_keys=True)
+
+
+def sources():
+    """Имена в static (images/…) всех растровых картинок, кроме самих вариантов."""
+    root = source_dir()
+    for path in sorted(root.rglob("*")):
+        if path.suffix.lower() in SOURCE_SUFFIXES and path.is_file() and VARIANTS_DIR not in path.relative_to(root).parts:
+            yield f"{static_prefix()}/{path.relative_to(root).as_posix()}"
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def variant_name(name, width, fmt):
+    """images/a/b.jpg → images/_variants/a/b-jpg-480.webp (расширение в имени: bw_1.jpg и bw_1.webp не столкнутся)."""
+    rel = name[len(static_prefix()) + 1:]
+    stem, ext = os.path.splitext(rel)
+    return f"{static_prefix()}/{VARIANTS_DIR}/{stem}-{ext.lstrip('.').lower()}-{width}.{fmt}"
+
+
+def _local(name):
+    return source_dir().parent / name
+
+
+def encode_one(name, digest, widths, formats):
+    """Рабочая функция пула: пишет варианты одной картинки и возвращает запись манифеста."""
+    with open(_local(name), "rb") as fh:
+        img = images.load(fh)
+    entry = {"hash": digest, "width": img.size[0], "height": img.size[1]}
+    for fmt in formats:
+        out = {}
+        for width in images.target_widths(img.size[0], widths):
+            variant = variant_name(name, width, fmt)
+            target = _local(variant)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(images.encode(img, width, fmt))
+            out[str(width)] = variant
+        entry[fmt] = out
+    return name, entry
+
+
+def load_manifest():
+    path = manifest_path()
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return {}
+    cached = _manifest_cache.get("manifest")
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        data = {}
+    _manifest_cache["manifest"] = (mtime, data)
+    return data
+
+
+def entry(name):
+    return load_manifest().get("images", {}).get(name)
+
+
+def _variant_files(item):
+    return {n for fmt in images.FORMATS for n in item.get(fmt, {}).values()}
+
+
+def build(force=False, workers=None, log=None):
+    """
+    Перекодирует новые/изменённые картинки. Возвращает (перекодировано, пропущено, удалено файлов).
+    """
+    widths = images.variant_widths()
+    formats = images.variant_formats()
+    options = options_key(widths, formats)
+    old = load_manifest()
+    old_images = old.get("images", {}) if old.get("options") == options and not force else {}
+
+    todo, result = [], {}
+    for name in sources():
+        digest = file_hash(_local(name))
+        previous = old_images.get(name)
+        if previous and previous.get("hash") == digest and all(_local(v).is_file() for v in _variant_files(previous)):
+            result[name] = previous
+        else:
+            todo.append((name, digest))
+
+    workers = workers or getattr(settings, "STATIC_IMAGES_WORKERS", None) or os.cpu_count()
+    if todo:
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+            futures = [pool.submit(encode_one, name, digest, widths, formats) for name, digest in todo]
+            for future in as_completed(futures):
+                name, item = future.result()
+                result[name] = item
+                if log:
+                    log(name, item)
+
+    # варианты удалённых/переименованных картинок и старых настроек
+    keep = set().union(*(_variant_files(item) for item in result.values())) if result else set()
+    stale = set().union(*(_variant_files(item) for item in old.get("images", {}).values())) - keep if old else set()
+    for variant in stale:
+        _local(variant).unlink(missing_ok=True)
+
+    path = manifest_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"options": options, "images": dict(sorted(result.items()))}, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+    return len(todo), len(result) - len(todo), len(stale)
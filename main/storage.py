@@ -0,0 +1,54 @@
+"""
+Хранилище статики для продакшена: имена с хешем содержимого (манифест) и
+готовые сжатые копии рядом — ``.gz`` всегда, ``.br`` если установлен brotli.
+nginx отдаёт их через gzip_static/brotli_static без сжатия на лету, а хеш
+в имени позволяет кешировать файлы навсегда (см. nginx/conf.d/app.conf).
+"""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli  # необязательная зависимость
+    BROTLI_AVAILABLE = True
+except Exception:
+    BROTLI_AVAILABLE = False
+
+COMPRESSIBLE_EXT = (".css", ".js", ".mjs", ".svg", ".json", ".webmanifest", ".txt", ".xml", ".map", ".ico", ".html")
+MIN_SIZE = 512  # мелкие файлы сжимать нет смысла
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # файла нет в сборке (часть видео/иконок кладут на сервер вручную) —
+            # отдаём исходное имя вместо 500 на всей странице
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        for name, hashed_name, processed in super().post_process(paths, dry_run=dry_run, **options):
+            if not dry_run and hashed_name and not isinstance(processed, Exception):
+                self._compress(name)
+                self._compress(hashed_name)
+            yield name, hashed_name, processed
+
+    def _compress(self, name):
+        if not name.lower().endswith(COMPRESSIBLE_EXT) or not self.exists(name):
+            return
+        with self.open(name) as fh:
+            data = fh.read()
+        if len(data) < MIN_SIZE:
+            return
+        variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+        if BROTLI_AVAILABLE:
+            variants.append((".br", brotli.compress(data, quality=11)))
+        for suffix, payload in variants:
+            if len(payload) >= len(data):
+                continue  # не сжимается — nginx отдаст оригинал
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(payload))
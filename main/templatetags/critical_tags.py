@@ -0,0 +1,32 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from .. import critical
+
+register = template.Library()
+
+
+@register.simple_tag
+def critical_css(key, *sources):
+    """
+    Таблицы стилей страницы с инлайном critical CSS (main/critical.py).
+
+        {% critical_css "news_list" "css/styles.css" "css/main/news.css" %}
+
+    Если critical CSS для key не собран или исходники изменились после сборки —
+    обычные блокирующие <link rel="stylesheet">.
+    """
+    critical.requested[key] = sources
+    hrefs = [(static(s),) for s in sources]
+    inline = critical.get(key, sources)
+    if inline is None:
+        return format_html_join("\n", '<link rel="stylesheet" href="{}">', hrefs)
+
+    return format_html(
+        "<style>{}</style>\n{}\n<noscript>{}</noscript>",
+        mark_safe(inline.replace("</", "<\\/")),  # CSS из наших же файлов; не даём закрыть <style>
+        format_html_join("\n", '<link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">', hrefs),
+        format_html_join("", '<link rel="stylesheet" href="{}">', hrefs),
+    )
@@ -0,0 +1,76 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from .. import images, static_images
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(file, manifest=None, sizes="100vw", **attrs):
+    """
+    <picture> с AVIF/WebP srcset из манифеста и оригиналом в <img> как фолбэком.
+
+        {% responsive_image img.image img.variants sizes="(max-width: 768px) 100vw, 50vw" alt=img.alt loading="lazy" %}
+
+    Если манифеста ещё нет или он от прежнего файла (варианты кодирует фоновая
+    задача ``image_variants``) — рисуем обычный <img>.
+    """
+    if not file:
+        return ""
+    if (manifest or {}).get("source") != file.name:
+        manifest = None
+
+    storage = file.storage
+    sources = []
+    for fmt in images.FORMATS:
+        items = images.variant_items(manifest, fmt)
+        if not items:
+            continue
+        srcset = ", ".join(f"{storage.url(name)} {w}w" for w, name in items)
+        sources.append((images.mime_type(fmt), srcset, sizes))
+
+    img_attrs = format_html_join("", ' {}="{}"', ((k.replace("_", "-"), v) for k, v in attrs.items() if v is not None))
+    img_tag = format_html('<img src="{}"{}>', file.url, img_attrs)
+    if not sources:
+        return img_tag
+
+    return format_html(
+        "<picture>{}{}</picture>",
+        format_html_join("", '<source type="{}" srcset="{}" sizes="{}">', sources),
+        img_tag,
+    )
+
+
+@register.simple_tag
+def static_picture(name, sizes="100vw", **attrs):
+    """
+    То же для картинок из static/images — по манифесту optimize_static_images:
+
+        {% static_picture "images/ka_3.jpg" sizes="(max-width: 768px) 100vw, 50vw" alt=_("Кадр") loading="lazy" %}
+
+    Пока манифеста нет (или картинки в нём нет) — обычный <img> с оригиналом.
+    width/height (если не заданы в вызове) берутся из манифеста — браузер
+    резервирует место до загрузки, без сдвига вёрстки.
+    """
+    entry = static_images.entry(name) or {}
+    if "width" not in attrs and "height" not in attrs and entry.get("width") and entry.get("height"):
+        attrs = {"width": entry["width"], "height": entry["height"], **attrs}
+    sources = []
+    for fmt in images.FORMATS:
+        items = images.variant_items(entry, fmt)
+        if items:
+            srcset = ", ".join(f"{static(variant)} {w}w" for w, variant in items)
+            sources.append((images.mime_type(fmt), srcset, sizes))
+
+    img_attrs = format_html_join("", ' {}="{}"', ((k.replace("_", "-"), v) for k, v in attrs.items() if v is not None))
+    img_tag = format_html('<img src="{}"{}>', static(name), img_attrs)
+    if not sources:
+        return img_tag
+
+    return format_html(
+        "<picture>{}{}</picture>",
+        format_html_join("", '<source type="{}" srcset="{}" sizes="{}">', sources),
+        img_tag,
+    )
@@ -0,0 +1,50 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from .. import vendor as assets
+
+register = template.Library()
+
+CONTEXT_KEY = "vendor_assets"
+
+
+def _declared(context):
+    # render_context общий для шаблона и всех его родителей по {% extends %}
+    if CONTEXT_KEY not in context.render_context:
+        context.render_context[CONTEXT_KEY] = set()
+    return context.render_context[CONTEXT_KEY]
+
+
+@register.simple_tag(takes_context=True)
+def vendor(context, *names):
+    """
+    Объявить сторонние библиотеки страницы (ключи main.vendor.ASSETS):
+
+        {% block vendor %}{% vendor "swiper" "bootstrap-icons" %}{% endblock %}
+
+    Объявлять без условий — build_vendor собирает бандлы по тексту шаблонов.
+    """
+    assets.ordered(names)  # неизвестный ключ — ошибка сразу при рендере
+    _declared(context).update(names)
+    return ""
+
+
+@register.simple_tag(takes_context=True)
+def vendor_bundle(context, kind):
+    """Один <link>/<script defer> на все объявленные выше библиотеки."""
+    names = _declared(context)
+    name = assets.bundle_name(names, kind) if names else None
+    if name is None:
+        return ""
+    urls = [static(name)] if assets.built(name) else assets.fallback_urls(names, kind)
+    if kind == "css":
+        return format_html_join("\n", '<link rel="stylesheet" href="{}">', ((u,) for u in urls))
+    return format_html_join("\n", '<script src="{}" defer></script>', ((u,) for u in urls))
+
+
+@register.simple_tag
+def vendor_static(name, path):
+    """URL закреплённого файла библиотеки (ES-модули и т.п. вне бандла)."""
+    static_name = assets.static_name(name, path)
+    return static(static_name) if assets.built(static_name) else assets.cdn_url(name, path)
@@ -1,3 +1,776 @@
-from django.test import TestCase
+import csv
+import shutil
+import smtplib
+import struct
+import tempfile
+from pathlib import Path
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+from zipfile import ZipFile
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail import EmailMultiAlternatives
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+
+from . import (bulk_upload, conditional, emailing, facets, jobs, pagecache, ratelimit, related, reorder, search,
+               spam, vendor, video)
+from .models import (OrgUnit, Project, ProjectBadge, ProjectDetail, ProjectDetailImage, ProjectDetailGridImage,
+                     NewsArticle, NewsImage, AdminJob, ProjectImage, ContactMessage, OutboxEmail, RelatedArticle,
+                     SearchDocument)
+from .admin import ContactMessageAdmin
+from .views import NewsDetailView, SportsUnitView
+
+TEMP_MEDIA = tempfile.mkdtemp(prefix="sp-tests-")
+
+
+def image_file(name="img.jpg"):
+    buf = BytesIO()
+    Image.new("RGB", (40, 30), "orange").save(buf, "JPEG")
+    return SimpleUploadedFile(name, buf.getvalue(), content_type="image/jpeg")
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA,
+    SITEMAP_ROOT=f"{TEMP_MEDIA}/sitemaps",
+    PAGE_CACHE_ENABLED=False,
+    RESPONSIVE_IMAGE_WIDTHS=(20,),
+    RESPONSIVE_IMAGE_FORMATS=("webp",),
+)
+class DetailPageQueryCountTests(TestCase):
+    """
+    Детальные страницы рендерятся за фиксированное число запросов:
+    число не должно расти вместе с количеством фото, бейджей и т.п.
+    """
+    PROJECT_DETAIL_QUERIES = 5  # валидаторы, страница + проект, галерея, полотно, бейджи
+    NEWS_DETAIL_QUERIES = 4     # валидаторы, статья + автор, галерея, «Також подивіться»
+    NEWS_LIST_QUERIES = 1       # страница статей (keyset, без COUNT, автора и галерей)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.detail = ProjectDetail.objects.create(slug="detail", title_override="Detail", body="<p>Body</p>")
+        cls.project = Project.objects.create(title="Project", description="Desc", goal="Goal", detail=cls.detail)
+
+        author = get_user_model().objects.create_user("editor", first_name="Olena", last_name="K")
+        cls.article = NewsArticle.objects.create(slug="article", title="Article", body="<p>Text</p>",
+                                                 is_published=True, author=author)
+        for i in range(3):
+            NewsArticle.objects.create(slug=f"other-{i}", title=f"Other {i}", body="Text", is_published=True)
+
+        cls.add_project_rows(2)
+        cls.add_news_rows(2)
+
+    @classmethod
+    def add_project_rows(cls, count):
+        for i in range(count):
+            ProjectBadge.objects.create(project=cls.project, text=f"20{i}")
+            ProjectDetailImage.objects.create(detail=cls.detail, image=image_file())
+            ProjectDetailGridImage.objects.create(project=cls.detail, image=image_file(), order=i)
+
+    @classmethod
+    def add_news_rows(cls, count):
+        for i in range(count):
+            NewsImage.objects.create(article=cls.article, image=image_file(), order=i)
+
+    def test_project_detail_query_count(self):
+        with self.assertNumQueries(self.PROJECT_DETAIL_QUERIES):
+            response = self.client.get("/projects/detail/")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "201")  # бейджи карточки проекта
+        self.assertContains(response, "pdj-masonry-item", count=2)
+
+        self.add_project_rows(5)
+        with self.assertNumQueries(self.PROJECT_DETAIL_QUERIES):
+            response = self.client.get("/projects/detail/")
+        self.assertContains(response, "pdj-masonry-item", count=7)
+
+    def test_project_detail_without_project_card(self):
+        ProjectDetail.objects.create(slug="standalone", title_override="Standalone")
+        with self.assertNumQueries(self.PROJECT_DETAIL_QUERIES - 1):  # без карточки бейджи не грузятся
+            response = self.client.get("/projects/standalone/")
+        self.assertEqual(response.status_code, 200)
+
+    def test_news_detail_query_count(self):
+        with self.assertNumQueries(self.NEWS_DETAIL_QUERIES):
+            response = self.client.get("/news/article/")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Olena K")
+        self.assertContains(response, "nws-gallery__item", count=2)
+
+        self.add_news_rows(6)
+        with self.assertNumQueries(self.NEWS_DETAIL_QUERIES):
+            response = self.client.get("/news/article/")
+        self.assertContains(response, "nws-gallery__item", count=8)
+
+    def test_news_list_query_count(self):
+        with self.assertNumQueries(self.NEWS_LIST_QUERIES) as ctx:
+            response = self.client.get("/news/")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "nws-card__date", count=4)
+        self.assertNotIn("JOIN", ctx.captured_queries[0]["sql"])
+
+    def test_conditional_get_skips_rendering(self):
+        response = self.client.get("/news/article/")
+        with self.assertNumQueries(1):
+            response = self.client.get("/news/article/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+
+def mp4_box(kind, payload=b""):
+    return struct.pack(">I4s", len(payload) + 8, kind) + payload
+
+
+def mp4_file(samples, moov_last=True):
+    """MP4 из одного mdat (samples) и видеодорожки 320×240 длиной 2 с; stco указывает на каждый сэмпл."""
+    ftyp = mp4_box(b"ftyp", b"isom\0\0\0\0isom")
+    mdat = mp4_box(b"mdat", b"".join(samples))
+
+    def moov(mdat_offset):
+        offsets, position = [], mdat_offset + 8
+        for sample in samples:
+            offsets.append(position)
+            position += len(sample)
+        mvhd = mp4_box(b"mvhd", bytes(12) + struct.pack(">II", 1000, 2000) + bytes(80))
+        tkhd = mp4_box(b"tkhd", bytes(24) + bytes(16) + struct.pack(">9i", 0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+                       + struct.pack(">II", 320 << 16, 240 << 16))
+        stco = mp4_box(b"stco", bytes(4) + struct.pack(">I%dI" % len(offsets), len(offsets), *offsets))
+        hdlr = mp4_box(b"hdlr", bytes(8) + b"vide" + bytes(13))
+        mdia = mp4_box(b"mdia", hdlr + mp4_box(b"minf", mp4_box(b"stbl", stco)))
+        return mp4_box(b"moov", mvhd + mp4_box(b"trak", tkhd + mdia))
+
+    if moov_last:
+        return ftyp + mdat + moov(len(ftyp))
+    return ftyp + moov(len(ftyp) + len(moov(0))) + mdat
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class UnitPageQueryCountTests(TestCase):
+    """Страница подразделения: проекты юнита через Exists(), флаг page_is_reverse — аннотацией."""
+    UNIT_PAGE_QUERIES = 3  # проекты юнита + detail, бейджи, фото (подразделения — из кеша)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.unit = OrgUnit.objects.create(name="Production", slug=SportsUnitView.unit_slug)
+        other = OrgUnit.objects.create(name="Other", slug="other")
+        cls.flipped = cls.add_project("flipped", is_reverse_sport=True)
+        cls.global_only = cls.add_project("global", is_reverse=True)
+        cls.add_project("hidden", is_published=False)
+        cls.add_project("foreign", unit=other)
+
+    @classmethod
+    def add_project(cls, slug, unit=None, **fields):
+        project = Project.objects.create(title=slug, slug=slug, description="Desc", goal="Goal", **fields)
+        project.units.add(unit or cls.unit)
+        ProjectBadge.objects.create(project=project, text="Badge")
+        ProjectImage.objects.create(project=project, image=f"projects/{slug}.jpg")
+        return project
+
+    def setUp(self):
+        cache.clear()
+        self.client.get("/go_sp_productio/")  # прогрев карты подразделений
+
+    def test_query_count_does_not_grow_with_projects(self):
+        with self.assertNumQueries(self.UNIT_PAGE_QUERIES):
+            response = self.client.get("/go_sp_productio/")
+        self.assertEqual({p.slug: p.page_is_reverse for p in response.context["projects"]},
+                         {"flipped": True, "global": False})
+
+        for i in range(3):
+            self.add_project(f"more-{i}")
+        with self.assertNumQueries(self.UNIT_PAGE_QUERIES):
+            self.assertEqual(len(self.client.get("/go_sp_productio/").context["projects"]), 5)
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class ProjectFacetTests(TestCase):
+    """Фасеты по подразделениям: карта принадлежности из кеша, выборка через EXISTS без дублей."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.media, cls.sport = (OrgUnit.objects.create(name=n, slug=n.lower()) for n in ("Media", "Sport"))
+        cls.both, cls.media_only, cls.hidden = (
+            Project.objects.create(title=slug, slug=slug, description="Desc", goal="Goal", order=i,
+                                   is_published=slug != "hidden")
+            for i, slug in enumerate(("both", "media-only", "hidden")))
+        cls.both.units.add(cls.media, cls.sport)
+        cls.media_only.units.add(cls.media)
+        cls.hidden.units.add(cls.sport)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_membership_is_cached_until_units_change(self):
+        with self.assertNumQueries(2):
+            facets.membership()
+        with self.assertNumQueries(0):
+            counts = {u["slug"]: (u["count"], u["selected_count"]) for u in facets.facet_counts(["sport"])}
+        self.assertEqual(counts, {"media": (2, 1), "sport": (1, 1)})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.media_only.units.add(self.sport)
+        self.assertEqual([len(u["projects"]) for u in facets.membership()], [2, 2])
+
+    def test_selection_uses_exists_without_duplicates(self):
+        with CaptureQueriesContext(connection) as queries:
+            selected = list(facets.filter_projects(Project.objects.filter(is_published=True).order_by("order"),
+                                                   ["media", "sport"]))
+        self.assertEqual(selected, [self.both, self.media_only])
+        self.assertIn("EXISTS", queries[0]["sql"])
+        self.assertNotIn("DISTINCT", queries[0]["sql"])
+
+    def test_json_endpoint(self):
+        self.client.get("/projects/facets/")  # прогрев карты
+        with self.assertNumQueries(1):
+            data = self.client.get("/projects/facets/", {"unit": "sport"}).json()
+        self.assertEqual(([p["id"] for p in data["projects"]], data["total"]), ([self.both.pk], 1))
+        self.assertEqual([(u["slug"], u["active"]) for u in data["units"]], [("media", False), ("sport", True)])
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class NewsValidatorTests(TestCase):
+    """Валидаторы новости зависят только от самой статьи и её «Також подивіться»."""
+
+    @classmethod
+    def setUpTestData(cls):
+        past = timezone.now() - timedelta(days=1)
+        cls.article, cls.related, cls.other = (
+            NewsArticle.objects.create(slug=slug, title=slug, body="", is_published=True, published_at=past)
+            for slug in ("article", "related", "other"))
+        RelatedArticle.objects.all().delete()
+        RelatedArticle.objects.create(article=cls.article, related=cls.related, score=1, rank=1)
+
+    def touch(self, article, delta):
+        NewsArticle.objects.filter(pk=article.pk).update(updated_at=timezone.now() + timedelta(seconds=delta))
+
+    def test_unrelated_save_keeps_validators(self):
+        with self.assertNumQueries(1):
+            etag, last_modified = conditional.news_validators("article")
+        self.touch(self.other, 60)
+        self.assertEqual(conditional.news_validators("article"), (etag, last_modified))
+
+        self.touch(self.related, 120)
+        new_etag, new_modified = conditional.news_validators("article")
+        self.assertNotEqual(new_etag, etag)
+        self.assertGreater(new_modified, last_modified)
+        self.assertIsNone(conditional.news_validators("missing"))
+
+    def test_cache_tags_are_article_and_related(self):
+        view = NewsDetailView(kwargs={"slug": "article"})
+        self.assertEqual(view.get_page_cache_tags(), ["news:article", "news:related"])
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class NewsPaginationTests(TestCase):
+    """Лента новостей: курсоры ?after=/?before= без пропусков на равных published_at и редирект ?page=N."""
+
+    @classmethod
+    def setUpTestData(cls):
+        same = timezone.now() - timedelta(days=1)
+        for i in range(20):
+            # половина статей — с одинаковыми published_at и created_at: порядок решает id
+            moment = same if i % 2 else same - timedelta(hours=i)
+            article = NewsArticle.objects.create(slug=f"n-{i}", title=f"N {i}", body="", is_published=True,
+                                                 published_at=moment)
+            NewsArticle.objects.filter(pk=article.pk).update(created_at=moment)
+        cls.expected = list(NewsArticle.objects.order_by("-published_at", "-created_at", "-id")
+                            .values_list("slug", flat=True))
+
+    def page(self, **params):
+        response = self.client.get("/news/", params)
+        self.assertEqual(response.status_code, 200)
+        return [a.slug for a in response.context["articles"]], response.context["page_obj"]
+
+    def test_after_and_before_walk_every_article_once(self):
+        pages, cursors = [], [None]
+        slugs, page = self.page()
+        pages.append(slugs)
+        while page.has_next:
+            cursors.append(page.next_cursor)
+            slugs, page = self.page(after=page.next_cursor)
+            pages.append(slugs)
+        self.assertEqual([slug for chunk in pages for slug in chunk], self.expected)
+        self.assertEqual([len(chunk) for chunk in pages], [9, 9, 2])
+
+        slugs, page = self.page(before=page.prev_cursor)
+        self.assertEqual(slugs, pages[1])
+        slugs, page = self.page(before=page.prev_cursor)
+        self.assertEqual((slugs, page.has_previous), (pages[0], False))
+
+    def test_legacy_page_number_redirects_to_cursor(self):
+        response = self.client.get("/news/", {"page": 2})
+        self.assertEqual(response.status_code, 302)
+        slugs, _page = self.page(after=response["Location"].split("after=")[1])
+        self.assertEqual(slugs, self.expected[9:18])
+
+        self.assertRedirects(self.client.get("/news/", {"page": 1}), "/news/", fetch_redirect_response=False)
+        for bad in ({"page": 99}, {"page": "x"}, {"after": "garbage"}):
+            with self.subTest(params=bad):
+                self.assertEqual(self.client.get("/news/", bad).status_code, 404)
+
+
+class PageCacheKeyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_evicted_tag_version_does_not_revive_old_pages(self):
+        request = RequestFactory().get("/news/")
+        before = pagecache.page_key(request, ["news"])
+        self.assertEqual(pagecache.page_key(request, ["news"]), before)
+        cache.delete("pagecache:tag:news")  # версию вытеснили из кеша вместе с правкой
+        self.assertNotEqual(pagecache.page_key(request, ["news"]), before)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA, SITEMAP_ROOT=f"{TEMP_MEDIA}/sitemaps", PAGE_CACHE_ENABLED=False,
+                   VIDEO_COPY_CHUNK_SIZE=7)
+class VideoFaststartTests(TestCase):
+    SAMPLES = [b"first-sample", b"second", b"third-sample-data"]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA, ignore_errors=True)
+
+    @staticmethod
+    def sample_offsets(data):
+        moov = data.index(b"moov") - 4
+        stco = data.index(b"stco", moov) + 8
+        count = struct.unpack_from(">I", data, stco)[0]
+        return moov, struct.unpack_from(">%dI" % count, data, stco + 4)
+
+    def test_faststart_moves_moov_and_keeps_sample_offsets(self):
+        src, dst = BytesIO(mp4_file(self.SAMPLES)), BytesIO()
+        self.assertTrue(video.faststart(src, dst))
+        data = dst.getvalue()
+        self.assertEqual(len(data), len(src.getvalue()))
+        moov, offsets = self.sample_offsets(data)
+        self.assertLess(moov, data.index(b"mdat"))
+        self.assertEqual([data[o:o + len(s)] for o, s in zip(offsets, self.SAMPLES)], self.SAMPLES)
+        self.assertEqual(video.probe(BytesIO(data)), {"duration": 2.0, "width": 320, "height": 240})
+        self.assertFalse(video.faststart(BytesIO(data), BytesIO()))  # уже faststart
+        self.assertEqual(data, mp4_file(self.SAMPLES, moov_last=False))
+
+    def test_upload_records_metadata(self):
+        upload = SimpleUploadedFile("clip.mp4", mp4_file(self.SAMPLES), content_type="video/mp4")
+        article = NewsArticle.objects.create(slug="video", title="Video", video_file=upload)
+        article.refresh_from_db()
+        self.assertIsNone(article.video_size)  # файл переписывает фоновая задача, не запрос
+        self.assertEqual(jobs.run_next().status, AdminJob.STATUS_DONE)
+        article.refresh_from_db()
+        self.assertEqual((article.video_duration, article.video_width, article.video_height), (2.0, 320, 240))
+        self.assertEqual(article.video_size, article.video_file.size)
+        with article.video_file.open("rb") as fh:
+            self.assertFalse(video.needs_faststart(fh))
+
+    def test_missing_file_is_skipped(self):
+        article = NewsArticle.objects.create(slug="missing", title="Missing", video_file="news/video/missing.mp4",
+                                             video_duration=1.0)
+        with self.assertLogs("main.video", "ERROR"):
+            call_command("process_videos", stdout=StringIO(), stderr=StringIO())
+        article.refresh_from_db()
+        self.assertEqual((article.video_duration, article.video_size), (None, None))
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA, PAGE_CACHE_ENABLED=False, BULK_UPLOAD_WORKERS=2,
+                   BULK_UPLOAD_MAX_FILE_SIZE=10_000, RESPONSIVE_IMAGE_WIDTHS=(20,), RESPONSIVE_IMAGE_FORMATS=("webp",))
+class BulkUploadTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA, ignore_errors=True)
+
+    def test_failed_member_is_counted_and_others_saved(self):
+        archive = BytesIO()
+        with ZipFile(archive, "w") as zf:
+            for name in ("a.jpg", "broken.jpg", "b.jpg"):
+                zf.writestr(name, image_file().read())
+            zf.writestr("huge.jpg", b"\0" * 20_000)
+        archive.seek(0)
+        detail = ProjectDetail.objects.create(slug="zip", title_override="Zip", body="")
+        real_save = FileSystemStorage.save
+
+        def save(storage, name, content, *args, **kwargs):
+            if "broken" in name:
+                raise OSError("disk full")
+            return real_save(storage, name, content, *args, **kwargs)
+
+        with mock.patch.object(FileSystemStorage, "save", save), self.assertLogs("main.bulk_upload", "ERROR"):
+            stats = bulk_upload.ingest_grid_zip(detail, SimpleUploadedFile("grid.zip", archive.read()))
+        self.assertEqual((stats["saved"], stats["failed"], stats["too_large"]), (2, 1, 1))
+        self.assertEqual(detail.grid_images.count(), 2)
+
+
+class VendorLockTests(TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp(prefix="sp-vendor-"))
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        lock = self.root / "vendor.lock.json"
+        self.name, self.url = vendor.downloads(["hls"])[0]
+        lock.write_text('{"%s": "%s"}' % (self.name, vendor.sha256(b"pinned")))
+        patcher = mock.patch.object(vendor, "LOCK_PATH", lock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fetch(self, body):
+        response = mock.MagicMock()
+        response.__enter__.return_value.read.return_value = body
+        with override_settings(VENDOR_STATIC_DIR=self.root), \
+                mock.patch("urllib.request.urlopen", return_value=response):
+            call_command("build_vendor", "--fetch", stdout=StringIO(), stderr=StringIO())
+
+    def test_download_with_other_hash_is_rejected(self):
+        with self.assertRaises(CommandError):
+            self.fetch(b"tampered")
+        self.assertFalse((self.root / self.name).exists())
+
+    def test_download_matching_lock_is_kept(self):
+        self.fetch(b"pinned")
+        self.assertEqual((self.root / self.name).read_bytes(), b"pinned")
+        with override_settings(VENDOR_STATIC_DIR=self.root):
+            self.assertEqual(vendor.missing(["hls"]), [])
+
+
+class JobQueueTests(TestCase):
+    def test_stale_job_is_not_overwritten_by_late_worker(self):
+        jobs.HANDLERS["test_slow"] = lambda job, progress: {"late": True}
+        self.addCleanup(jobs.HANDLERS.pop, "test_slow")
+        jobs.enqueue("test_slow")
+        job = jobs.claim_next()
+        AdminJob.objects.filter(pk=job.pk).update(status=AdminJob.STATUS_FAILED, error="stale")
+
+        with self.assertLogs("main.jobs", "WARNING"):
+            jobs.run(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error, job.stats), (AdminJob.STATUS_FAILED, "stale", {}))
+
+    @override_settings(MEDIA_ROOT=TEMP_MEDIA, SITEMAP_ROOT=f"{TEMP_MEDIA}/sitemaps", PAGE_CACHE_ENABLED=False)
+    def test_image_variants_are_encoded_by_worker_not_on_save(self):
+        self.addCleanup(shutil.rmtree, TEMP_MEDIA, ignore_errors=True)
+        article = NewsArticle.objects.create(slug="article", title="Article", body="Text", is_published=True)
+        photo = NewsImage.objects.create(article=article, image=image_file())
+        photo.refresh_from_db()
+        self.assertEqual(photo.variants, {})
+        self.assertEqual(AdminJob.objects.filter(kind="image_variants", status=AdminJob.STATUS_QUEUED).count(), 1)
+
+        while jobs.run_next():
+            pass
+        photo.refresh_from_db()
+        self.assertEqual(photo.variants["source"], photo.image.name)
+
+    @override_settings(MEDIA_ROOT=TEMP_MEDIA, SITEMAP_ROOT=f"{TEMP_MEDIA}/sitemaps", PAGE_CACHE_ENABLED=False)
+    def test_sitemap_rebuild_is_debounced_into_one_job(self):
+        self.addCleanup(shutil.rmtree, TEMP_MEDIA, ignore_errors=True)
+        for i in range(3):
+            NewsArticle.objects.create(slug=f"news-{i}", title=f"News {i}", body="Text", is_published=True)
+        self.assertEqual(AdminJob.objects.filter(kind="sitemap", status=AdminJob.STATUS_QUEUED).count(), 1)
+
+        jobs.run_next()
+        self.assertEqual(sorted(p.name for p in Path(TEMP_MEDIA, "sitemaps").glob("news-*.xml")),
+                         ["news-en.xml", "news-it.xml", "news-uk.xml"])
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class BackfillCommandTests(TestCase):
+    """Backfill из entrypoint: заполняет пустые после миграции таблицы и не трогает заполненные."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.article = NewsArticle.objects.create(slug="article", title="Article", body="Text", is_published=True)
+
+    def test_search_index_is_backfilled_only_when_empty(self):
+        SearchDocument.objects.all().delete()
+        call_command("rebuild_search_index", "--if-empty", stdout=StringIO())
+        document = SearchDocument.objects.get()
+        self.assertEqual((document.kind, document.object_id), ("news", self.article.pk))
+
+        with mock.patch.object(search, "rebuild") as rebuild:
+            call_command("rebuild_search_index", "--if-empty", stdout=StringIO())
+        rebuild.assert_not_called()
+
+    @override_settings(MEDIA_ROOT=TEMP_MEDIA)
+    def test_image_dimensions_are_backfilled_for_empty_rows(self):
+        self.addCleanup(shutil.rmtree, TEMP_MEDIA, ignore_errors=True)
+        photo = NewsImage.objects.create(article=self.article, image=image_file())
+        size = photo.file_size
+        NewsImage.objects.filter(pk=photo.pk).update(width=None, height=None, file_size=None)
+
+        call_command("backfill_image_dimensions", stdout=StringIO())
+        photo.refresh_from_db()
+        self.assertEqual((photo.width, photo.height, photo.file_size), (40, 30, size))
+
+    def test_related_articles_are_backfilled_only_when_empty(self):
+        other = NewsArticle.objects.create(slug="other", title="Article", body="Text", is_published=True)
+        RelatedArticle.objects.all().delete()
+        call_command("rebuild_related_news", "--if-empty", stdout=StringIO())
+        self.assertTrue(RelatedArticle.objects.filter(article=self.article, related=other).exists())
+
+        with mock.patch.object(related, "rebuild") as rebuild:
+            call_command("rebuild_related_news", "--if-empty", stdout=StringIO())
+        rebuild.assert_not_called()
+
+
+@override_settings(PAGE_CACHE_ENABLED=False, REORDER_STEP=10)
+class ReorderTests(TestCase):
+    """Перестановка перетаскиванием: одно UPDATE на весь список, порядок с промежутками."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = Project.objects.create(title="Project", slug="project", description="Desc", goal="Goal")
+        cls.badges = [ProjectBadge.objects.create(project=cls.project, text=str(i), order=i) for i in range(4)]
+
+    def ordered_ids(self):
+        return list(self.project.badges.order_by("order").values_list("pk", flat=True))
+
+    def test_apply_renumbers_with_gaps_in_one_update(self):
+        a, b, c, d = (badge.pk for badge in self.badges)
+        with CaptureQueriesContext(connection) as queries:
+            changed = reorder.apply(ProjectBadge, "project", self.project, [c, a])
+        updates = [q["sql"] for q in queries if q["sql"].startswith('UPDATE "main_projectbadge"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(changed, 4)
+        self.assertEqual(self.ordered_ids(), [c, a, b, d])
+        self.assertEqual(list(self.project.badges.order_by("order").values_list("order", flat=True)), [10, 20, 30, 40])
+        self.assertEqual(reorder.apply(ProjectBadge, "project", self.project, [c, a]), 0)
+
+    def test_apply_rejects_foreign_and_duplicate_ids(self):
+        other = Project.objects.create(title="Other", slug="other", description="Desc", goal="Goal")
+        foreign = ProjectBadge.objects.create(project=other, text="x")
+        with self.assertRaises(ValueError):
+            reorder.apply(ProjectBadge, "project", self.project, [foreign.pk])
+        with self.assertRaises(ValueError):
+            reorder.parse_ids("1,2,1")
+        self.assertEqual(self.ordered_ids(), [badge.pk for badge in self.badges])
+
+    def reorder_url(self, model_name="projectbadge"):
+        return f"/admin/main/project/{self.project.pk}/reorder/{model_name}/"
+
+    def staff(self, *perms):
+        user = get_user_model().objects.create_user("staff", password="pass", is_staff=True)
+        user.user_permissions.set(Permission.objects.filter(codename__in=perms))
+        self.client.force_login(user)
+
+    def test_endpoint_saves_order_in_one_update(self):
+        self.staff("change_project", "change_projectbadge")
+        a, b, c, d = (badge.pk for badge in self.badges)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.reorder_url(), {"ids": f"{d},{c},{b},{a}"},
+                                        HTTP_ACCEPT="application/json")
+        self.assertEqual(response.json(), {"updated": 4})
+        self.assertEqual(len([q for q in queries if q["sql"].startswith('UPDATE "main_projectbadge"')]), 1)
+        self.assertEqual(self.ordered_ids(), [d, c, b, a])
+
+    def test_endpoint_requires_change_permission_on_rows(self):
+        self.staff("change_project")
+        response = self.client.post(self.reorder_url(), {"ids": str(self.badges[-1].pk)})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.get(self.reorder_url("newsimage")).status_code, 404)
+        self.assertEqual(self.ordered_ids(), [badge.pk for badge in self.badges])
+
+    def test_endpoint_rejects_invalid_ids(self):
+        self.staff("change_project", "change_projectbadge")
+        foreign = ProjectBadge.objects.create(
+            project=Project.objects.create(title="Other", slug="other", description="Desc", goal="Goal"), text="x")
+        for ids in ("1,x", f"{self.badges[0].pk},{self.badges[0].pk}", str(foreign.pk)):
+            with self.subTest(ids=ids):
+                response = self.client.post(self.reorder_url(), {"ids": ids}, HTTP_ACCEPT="application/json")
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+        self.assertRedirects(self.client.post(self.reorder_url(), {"ids": "1,x"}), self.reorder_url(),
+                             fetch_redirect_response=False)
+        self.assertEqual(self.ordered_ids(), [badge.pk for badge in self.badges])
+
+
+@override_settings(
+    CONTACT_RECIPIENT="manager@example.com",
+    SPAM_MIN_FILL_SECONDS=0,
+    SPAM_CHECK_EMAIL_DOMAIN=False,
+    PAGE_CACHE_ENABLED=False,
+)
+class ContactSpamTests(TestCase):
+    """Форма контактов: inline-оценка, фоновая проверка и письма только для чистых сообщений."""
+
+    def setUp(self):
+        cache.clear()
+
+    def post(self, email="olena@example.com", message="Хочемо долучитися до проєкту з дітьми", **extra):
+        data = {"form_name": "contact", "first_name": "Olena", "last_name": "K", "email": email,
+                "phone": "+380000000000", "subject": "Партнерство", "message": message,
+                "started": spam.issue_token(), **extra}
+        return self.client.post("/", data, REMOTE_ADDR="10.0.0.1", HTTP_X_REAL_IP="203.0.113.7")
+
+    def test_honeypot_writes_nothing(self):
+        self.assertRedirects(self.post(website="http://spam.example"), "/#contact", fetch_redirect_response=False)
+        self.assertFalse(ContactMessage.objects.exists())
+        self.assertFalse(AdminJob.objects.exists())
+
+    def test_clean_message_queues_check_then_two_emails(self):
+        self.post()
+        contact = ContactMessage.objects.get()
+        self.assertEqual((contact.ip, contact.is_quarantined), ("203.0.113.7", False))
+        self.assertEqual(AdminJob.objects.get().kind, "contact_spam_check")
+        self.assertFalse(OutboxEmail.objects.exists())
+
+        self.assertEqual(jobs.run_next().status, AdminJob.STATUS_DONE)
+        self.assertEqual(contact.emails.count(), 2)
+
+    def test_duplicate_body_is_quarantined_without_emails(self):
+        self.post()
+        self.post(email="bot@example.com")
+        while jobs.run_next():
+            pass
+        first, duplicate = ContactMessage.objects.order_by("pk")
+        self.assertIn("duplicate", duplicate.spam_reasons)
+        self.assertTrue(duplicate.is_quarantined)
+        self.assertFalse(duplicate.emails.exists())
+        self.assertEqual(first.emails.count(), 2)
+
+    @override_settings(CONTACT_RATE_LIMITS={"ip": (2, 600)})
+    def test_third_post_from_same_ip_gets_429(self):
+        self.post()
+        self.post(message="Друге повідомлення про партнерство")
+        response = self.post(message="Третє повідомлення")
+        self.assertEqual((response.status_code, response["Retry-After"]), (429, "300"))
+        self.assertEqual(ContactMessage.objects.count(), 2)
+        self.assertEqual(ratelimit.stats()["ip"], {"allowed": 2, "rejected": 1})
+
+    def test_bucket_refills_one_token_per_period_share(self):
+        self.assertEqual([ratelimit.take("ip", "1.2.3.4", 2, 10, now=100)[0] for _ in range(3)],
+                         [True, True, False])
+        self.assertEqual(ratelimit.take("ip", "1.2.3.4", 2, 10, now=101), (False, 4))
+        self.assertEqual(ratelimit.take("ip", "1.2.3.4", 2, 10, now=105), (True, 0))
+        self.assertFalse(ratelimit.take("ip", "1.2.3.4", 2, 10, now=105)[0])
+
+    def test_ip_header_is_trusted_only_from_proxy(self):
+        factory = RequestFactory()
+        for remote, expected in (("10.0.0.1", "203.0.113.7"), ("198.51.100.9", "198.51.100.9")):
+            with self.subTest(remote=remote):
+                request = factory.post("/", REMOTE_ADDR=remote, HTTP_X_REAL_IP="203.0.113.7")
+                self.assertEqual(ratelimit.client_ip(request), expected)
+
+    def test_release_is_idempotent(self):
+        contact = ContactMessage.objects.create(first_name="O", last_name="K", email="olena@example.com",
+                                                subject="S", message="M", is_quarantined=True, spam_score=9)
+        self.assertTrue(spam.release(contact)[0])
+        self.assertTrue(spam.release(contact)[0])
+        contact.refresh_from_db()
+        self.assertFalse(contact.is_quarantined)
+        self.assertEqual(contact.emails.count(), 2)
+
+    @staticmethod
+    def dns_answer(rcode=0, *exchanges):
+        """Ответ на MX-запрос example.com: rcode и MX-записи (b"\\0" — null MX)."""
+        qname = b"\x07example\x03com\x00"
+        answers = b"".join(b"\xc0\x0c" + struct.pack(">HHIH", 15, 1, 300, len(name) + 2) + b"\x00\x0a" + name
+                           for name in exchanges)
+        return (b"id" + struct.pack(">HHHHH", 0x8180 | rcode, 1, len(exchanges), 0, 0)
+                + qname + struct.pack(">HH", 15, 1) + answers)
+
+    def test_mx_answer_is_parsed(self):
+        self.assertIsNone(spam._parse_mx(self.dns_answer(3), b"id"))
+        self.assertEqual(spam._parse_mx(self.dns_answer(0), b"id"), [])
+        self.assertEqual(spam._parse_mx(self.dns_answer(0, b"\x02mx\xc0\x0c", b"\x00"), b"id"), [True, False])
+        with self.assertRaises(OSError):
+            spam._parse_mx(self.dns_answer(2), b"id")
+
+    @override_settings(SPAM_CHECK_EMAIL_DOMAIN=True)
+    def test_domain_without_mx_falls_back_to_address_lookup(self):
+        cases = [(None, False, True), ([False], False, True), ([True], False, False),
+                 ([], True, False), (OSError("timeout"), True, False)]
+        for mx, resolves, missing in cases:
+            with self.subTest(mx=mx), mock.patch.object(spam, "_mx_exchanges", side_effect=[mx]), \
+                    mock.patch("socket.getaddrinfo") as getaddrinfo:
+                getaddrinfo.side_effect = None if resolves else AssertionError("A lookup not expected")
+                self.assertEqual(spam._domain_missing("olena@example.com"), missing)
+                self.assertEqual(getaddrinfo.called, resolves)
+
+
+@override_settings(PAGE_CACHE_ENABLED=False, ADMIN_EXPORT_CHUNK_SIZE=2)
+class ContactAdminTests(TestCase):
+    """Админка обращений: поиск по FTS-индексу и потоковый CSV с экранированием формул."""
+    url = "/admin/main/contactmessage/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser("admin", "admin@example.com", "pass")
+        cls.contacts = [
+            ContactMessage.objects.create(first_name=first, last_name="K", email=f"{first.lower()}@example.com",
+                                          phone=phone, subject=subject, message=message)
+            for first, phone, subject, message in (
+                ("Olena", "+380501112233", "Партнерство", "Хочемо долучитися до проєкту"),
+                ("Ivan", "0501112233", "=HYPERLINK(\"http://evil.example\")", "@SUM(1+1)"),
+                ("Petro", "-", "Волонтерство", "Питання про табір"),
+            )]
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_search_uses_full_text_index(self):
+        with mock.patch.object(search, "contact_ids", wraps=search.contact_ids) as contact_ids:
+            response = self.client.get(self.url, {"q": "долуч проєкт"})
+        contact_ids.assert_called_once_with("долуч проєкт")
+        self.assertEqual(list(response.context["cl"].result_list), [self.contacts[0]])
+        self.assertEqual(list(self.client.get(self.url, {"q": "табір"}).context["cl"].result_list),
+                         [self.contacts[2]])
+
+    def test_csv_export_escapes_formulas(self):
+        response = self.client.post(self.url, {"action": "export_csv",
+                                               "_selected_action": [c.pk for c in self.contacts]})
+        body = b"".join(response.streaming_content).decode("utf-8")
+        self.assertTrue(body.startswith("\ufeff"))
+        header, *rows = csv.reader(StringIO(body[1:]))
+        self.assertEqual(len(header), len(ContactMessageAdmin.csv_fields))
+        by_name = {row[1]: row for row in rows}
+        self.assertEqual(list(by_name), ["Petro", "Ivan", "Olena"])  # новые сверху
+        self.assertEqual(by_name["Ivan"][5:7], ["'=HYPERLINK(\"http://evil.example\")", "'@SUM(1+1)"])
+        self.assertEqual((by_name["Olena"][4], by_name["Petro"][4]), ("'+380501112233", "'-"))
+        self.assertEqual(by_name["Olena"][5], "Партнерство")
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    CONTACT_RECIPIENT="manager@example.com",
+    EMAIL_OUTBOX_MAX_ATTEMPTS=2,
+    EMAIL_OUTBOX_BACKOFF=60,
+)
+class OutboxTests(TestCase):
+    """Очередь писем: queue → deliver_outbox → sent; сбой — повтор с задержкой, потом failed."""
+
+    def setUp(self):
+        self.contact = ContactMessage.objects.create(first_name="Olena", last_name="K", email="olena@example.com",
+                                                     subject="Партнерство", message="Текст")
+        emailing.queue_contact_emails(self.contact, emailing.contact_context(self.contact))
+
+    def test_queue_and_deliver(self):
+        self.assertEqual(len(mail.outbox), 0)  # в запросе ничего не отправляется
+        self.assertEqual(emailing.deliver_outbox(), (2, 0))
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ["manager@example.com", "olena@example.com"])
+        self.assertFalse(self.contact.emails.exclude(status=OutboxEmail.STATUS_SENT).exists())
+        self.assertEqual(emailing.deliver_outbox(), (0, 0))
+
+    def test_failure_backs_off_then_fails(self):
+        with mock.patch.object(EmailMultiAlternatives, "send", side_effect=smtplib.SMTPException("down")):
+            self.assertEqual(emailing.deliver_outbox(), (0, 2))
+            row = self.contact.emails.first()
+            self.assertEqual((row.status, row.attempts), (OutboxEmail.STATUS_PENDING, 1))
+            self.assertIn("down", row.last_error)
+            self.assertGreater(row.next_attempt_at, timezone.now() + timedelta(seconds=50))
+            self.assertEqual(emailing.deliver_outbox(), (0, 0))  # ещё рано
+
+            self.contact.emails.update(next_attempt_at=timezone.now())
+            self.assertEqual(emailing.deliver_outbox(), (0, 2))
+        self.assertEqual(self.contact.emails.filter(status=OutboxEmail.STATUS_FAILED).count(), 2)
+        self.assertEqual(len(mail.outbox), 0)
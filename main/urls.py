@@ -4,10 +4,12 @@ from . import views
 urlpatterns = [
     path('', views.index, name='index'),
     path("projects/", views.ProjectsListView.as_view(), name="projects"),
+    path("projects/facets/", views.ProjectFacetsView.as_view(), name="project_facets"),
     path("projects/<slug:slug>/", views.ProjectDetailView.as_view(), name="project_detail"),
     path("go-spilna-peremoga/", views.SubdivisionView.as_view(), name="go-spilna-peremoga"),
     path("go_creative_agency/", views.EducationUnitView.as_view(), name="go-creative-agency"),
     path("go_sp_productio/", views.SportsUnitView.as_view(), name="go-sp-production"),
 	 path("news/", views.NewsListView.as_view(), name="list"),
     path("news/<slug:slug>/", views.NewsDetailView.as_view(), name="detail"),
+    path("search/", views.SearchView.as_view(), name="search"),
 ]
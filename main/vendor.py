@@ -0,0 +1,288 @@
+"""
+Сторонние CSS/JS: одна закреплённая версия каждой библиотеки в static/vendor
+и один бандл на страницу вместо набора CDN-тегов.
+
+Шаблоны объявляют, что им нужно, тегом ``{% vendor "swiper" "hls" %}`` (base.html —
+общие шрифты/сетку/иконки, страницы — в ``{% block vendor %}``); ``{% vendor_bundle "css" %}``
+и ``{% vendor_bundle "js" %}`` отдают один файл на весь набор —
+``vendor/bundles/<ключ набора>.css|js``, хеш содержимого в имени добавляет collectstatic.
+
+Закреплённые файлы лежат в static/vendor (в репозитории), их sha256 — в
+main/vendor.lock.json. ``manage.py build_vendor`` собирает бандлы для всех
+наборов из шаблонов только из файлов, чей хеш совпадает с lock-файлом; сеть при
+запуске контейнера не нужна. Скачивание — только явно (``--fetch`` по lock-файлу,
+``--lock`` при смене версий), файл с другим хешем отвергается. Набор, для
+которого файлов нет, не собирается — теги отдают те же версии с CDN.
+"""
+import hashlib
+import json
+import posixpath
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.template.utils import get_app_template_dirs
+
+CDN_URL = "https://cdn.jsdelivr.net/npm/{package}@{version}/{path}"
+LOCK_PATH = Path(__file__).with_name("vendor.lock.json")
+
+# Порядок ключей = порядок в бандле (сетка/шрифты раньше библиотек).
+# css/js — что входит в бандл, files — что нужно рядом (шрифты по url() из css),
+# modules — ES-модули, которые подключаются отдельно ({% vendor_static %}).
+ASSETS = {
+    "fonts": {
+        "fontsource": {"montserrat": (400, 600, 700), "manrope": (400, 600, 700)},
+        "version": "5.1.0",
+        "subsets": ("cyrillic", "latin"),
+        "css": ["fonts.css"],
+    },
+    "bootstrap-grid": {
+        "package": "bootstrap", "version": "5.3.0",
+        "css": ["dist/css/bootstrap-grid.min.css"],
+    },
+    "font-awesome": {
+        # на сайте только fa-solid — без brands/regular из all.min.css
+        "package": "@fortawesome/fontawesome-free", "version": "6.5.0",
+        "css": ["css/fontawesome.min.css", "css/solid.min.css"],
+        "files": ["webfonts/fa-solid-900.woff2", "webfonts/fa-solid-900.ttf"],
+    },
+    "bootstrap-icons": {
+        "package": "bootstrap-icons", "version": "1.10.5",
+        "css": ["font/bootstrap-icons.css"],
+        "files": ["font/fonts/bootstrap-icons.woff2", "font/fonts/bootstrap-icons.woff"],
+    },
+    "swiper": {
+        "package": "swiper", "version": "11.1.14",
+        "css": ["swiper-bundle.min.css"],
+        "js": ["swiper-bundle.min.js"],
+    },
+    "hls": {
+        "package": "hls.js", "version": "1.5.17",
+        "js": ["dist/hls.min.js"],
+    },
+    "photoswipe": {
+        "package": "photoswipe", "version": "5.4.4",
+        "css": ["dist/photoswipe.css"],
+        "modules": ["dist/photoswipe-lightbox.esm.min.js", "dist/photoswipe.esm.min.js"],
+    },
+}
+
+UNICODE_RANGES = {
+    "latin": "U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, U+02DC, U+0304, U+0308, U+0329, "
+             "U+2000-206F, U+20AC, U+2122, U+2191, U+2193, U+2212, U+2215, U+FEFF, U+FFFD",
+    "cyrillic": "U+0301, U+0400-045F, U+0490-0491, U+04B0-04B1, U+2116",
+}
+
+_DECLARE_RE = re.compile(r"{%\s*vendor\s+(.*?)%}")
+_EXTENDS_RE = re.compile(r"""{%\s*extends\s+["']([^"']+)["']""")
+_NAME_RE = re.compile(r"""["']([\w-]+)["']""")
+_SOURCE_MAP_RE = re.compile(rb"^\s*(?://# sourceMappingURL=.*|/\*# sourceMappingURL=.*?\*/)\s*$", re.M)
+_URL_RE = re.compile(r"""url\(\s*(["']?)([^"')]+)\1\s*\)""")
+
+
+class UnknownAsset(ValueError):
+    pass
+
+
+def static_dir():
+    """Исходный каталог статики, внутри которого лежит vendor/."""
+    return Path(getattr(settings, "VENDOR_STATIC_DIR", Path(settings.BASE_DIR) / "static"))
+
+
+def file_path(static_path):
+    return static_dir() / static_path
+
+
+def _dir(name):
+    """Каталог библиотеки внутри vendor/: <пакет>/<версия>."""
+    spec = ASSETS[name]
+    package = spec.get("package", name).lstrip("@").replace("/", "-")
+    return f"{package}/{spec['version']}"
+
+
+def static_name(name, path):
+    return f"vendor/{_dir(name)}/{path}"
+
+
+def cdn_url(name, path):
+    spec = ASSETS[name]
+    return CDN_URL.format(package=spec["package"], version=spec["version"], path=path)
+
+
+def ordered(names):
+    unknown = set(names) - set(ASSETS)
+    if unknown:
+        raise UnknownAsset(f"Невідомі бібліотеки: {', '.join(sorted(unknown))}")
+    return [name for name in ASSETS if name in names]
+
+
+def bundle_name(names, kind):
+    names = ordered(names)
+    if not any(ASSETS[n].get(kind) for n in names):
+        return None
+    key = ",".join(f"{n}@{ASSETS[n]['version']}" for n in names)
+    return f"vendor/bundles/{hashlib.sha1(key.encode()).hexdigest()[:12]}.{kind}"
+
+
+def built(static_path):
+    return file_path(static_path).is_file()
+
+
+def fallback_urls(names, kind):
+    """Те же закреплённые версии с CDN — пока бандл не собран."""
+    urls = []
+    for name in ordered(names):
+        spec = ASSETS[name]
+        if "fontsource" in spec:
+            if kind == "css":
+                urls.append(_google_fonts_url(spec))
+            continue
+        urls.extend(cdn_url(name, path) for path in spec.get(kind, ()))
+    return urls
+
+
+def _google_fonts_url(spec):
+    families = "&".join(f"family={family.capitalize()}:wght@{';'.join(map(str, weights))}"
+                        for family, weights in spec["fontsource"].items())
+    return f"https://fonts.googleapis.com/css2?{families}&display=swap"
+
+
+# --- Скачивание
+
+def downloads(names=None):
+    """[(static_name, url)] закреплённых файлов библиотек names (по умолчанию — всех)."""
+    items = []
+    for name in ordered(names) if names is not None else ASSETS:
+        spec = ASSETS[name]
+        if "fontsource" in spec:
+            for family, weights in spec["fontsource"].items():
+                for subset in spec["subsets"]:
+                    for weight in weights:
+                        path = f"files/{family}-{subset}-{weight}-normal.woff2"
+                        url = CDN_URL.format(package=f"@fontsource/{family}", version=spec["version"], path=path)
+                        items.append((static_name(name, path), url))
+            continue
+        for path in [*spec.get("css", ()), *spec.get("js", ()), *spec.get("files", ()), *spec.get("modules", ())]:
+            items.append((static_name(name, path), cdn_url(name, path)))
+    return items
+
+
+def missing(names):
+    """
+    Закреплённые файлы набора, которых нет в static/vendor или чей sha256 не
+    совпадает с lock-файлом (бандл без них собирать нельзя).
+    """
+    pins = load_lock()
+    return [static_name for static_name, _url in downloads(names)
+            if not built(static_name) or pins.get(static_name) != sha256(file_path(static_name).read_bytes())]
+
+
+# --- Хеши закреплённых файлов
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def load_lock():
+    """{имя в static: sha256} из main/vendor.lock.json."""
+    try:
+        return json.loads(LOCK_PATH.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+
+
+def write_lock(pins):
+    LOCK_PATH.write_text(json.dumps(dict(sorted(pins.items())), indent=2) + "\n", encoding="utf-8")
+
+
+def fonts_css(name="fonts"):
+    """@font-face для самостоятельно размещённых шрифтов (display: swap, как было у Google Fonts)."""
+    spec = ASSETS[name]
+    faces = []
+    for family, weights in spec["fontsource"].items():
+        for subset in spec["subsets"]:
+            for weight in weights:
+                faces.append(
+                    "@font-face{"
+                    f"font-family:\"{family.capitalize()}\";font-style:normal;font-weight:{weight};font-display:swap;"
+                    f"src:url(\"files/{family}-{subset}-{weight}-normal.woff2\") format(\"woff2\");"
+                    f"unicode-range:{UNICODE_RANGES[subset]}"
+                    "}")
+    return "\n".join(faces) + "\n"
+
+
+def strip_source_maps(data):
+    """
+    Ссылки на .map убираем: карты мы не вендорим, а collectstatic
+    (ManifestStaticFilesStorage) падает на ссылке на несуществующий файл.
+    """
+    return _SOURCE_MAP_RE.sub(b"", data)
+
+
+# --- Бандлы
+
+def _rebase_urls(text, source, target):
+    """url() из файла source переписываем относительно target (оба — имена в static)."""
+    source_dir, target_dir = posixpath.dirname(source), posixpath.dirname(target)
+
+    def replace(match):
+        quote, url = match.groups()
+        if url.startswith(("data:", "http:", "https:", "//", "/", "#")):
+            return match.group(0)
+        path, sep, suffix = url.partition("?") if "?" in url else url.partition("#")
+        rebased = posixpath.relpath(posixpath.normpath(posixpath.join(source_dir, path)), target_dir)
+        return f"url({quote}{rebased}{sep}{suffix}{quote})"
+
+    return _URL_RE.sub(replace, text)
+
+
+def build_bundle(names, kind):
+    """Пишет бандл набора names; возвращает его имя в static (или None, если для kind пусто)."""
+    target = bundle_name(names, kind)
+    if target is None:
+        return None
+    parts = []
+    for name in ordered(names):
+        for path in ASSETS[name].get(kind, ()):
+            source = static_name(name, path)
+            text = file_path(source).read_text(encoding="utf-8")
+            if kind == "css":
+                parts.append(_rebase_urls(text, source, target))
+            else:
+                parts.append(text.rstrip() + ";")
+    out = file_path(target)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text("\n".join(parts) + "\n", encoding="utf-8")
+    return target
+
+
+def template_sets():
+    """
+    Наборы библиотек всех шаблонов проекта: свои ``{% vendor %}`` плюс
+    объявления родителей по цепочке ``{% extends %}``.
+    """
+    base = Path(settings.BASE_DIR).resolve()
+    dirs = [Path(d) for t in settings.TEMPLATES for d in t.get("DIRS", [])]
+    dirs += [Path(d) for d in get_app_template_dirs("templates")]
+    sources = {}
+    for directory in dirs:
+        directory = directory.resolve()
+        if not directory.is_dir() or not directory.is_relative_to(base):
+            continue
+        for path in directory.rglob("*.html"):
+            sources.setdefault(path.relative_to(directory).as_posix(), path.read_text(encoding="utf-8"))
+
+    def declared(template, seen=()):
+        source = sources.get(template, "")
+        names = {n for args in _DECLARE_RE.findall(source) for n in _NAME_RE.findall(args)}
+        parent = _EXTENDS_RE.search(source)
+        if parent and parent.group(1) not in seen:
+            names |= declared(parent.group(1), (*seen, template))
+        return names
+
+    sets = {}
+    for template in sources:
+        names = frozenset(declared(template))
+        if names:
+            sets.setdefault(names, []).append(template)
+    return sets
@@ -0,0 +1,435 @@
+"""
+Загруженные видеофайлы (ProjectDetail.video_file, NewsArticle.video_file).
+
+После загрузки:
+
+* MP4 с ``moov`` в конце переписываем в faststart-раскладку (``moov`` перед
+  ``mdat``) — иначе при ``preload="metadata"`` браузер тянет хвост большого файла
+  прежде, чем начать воспроизведение. Копирование потоковое кусками
+  VIDEO_COPY_CHUNK_SIZE, в памяти только сам ``moov`` (метаданные, обычно
+  килобайты); смещения сэмплов в stco/co64 пересчитываются, при переполнении
+  32 бит stco превращается в co64.
+* Длительность, размер кадра и вес файла пишем в поля модели
+  (video_duration/video_width/video_height/video_size), чтобы шаблоны
+  отдавали размеры без чтения файла. MP4/MOV и WebM разбираются на чистом
+  Python; для прочих форматов (ogg) — только вес.
+
+Обработка идёт фоновой задачей ``process_video`` (main/jobs.py, ``run_jobs``),
+а не в запросе админки: копия большого MP4 не укладывается в таймаут gunicorn.
+``manage.py process_videos`` — разовая досборка для уже загруженных файлов.
+"""
+import bisect
+import logging
+import os
+import struct
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+
+logger = logging.getLogger(__name__)
+
+# модель -> поле с файлом; поля метаданных у обеих моделей одинаковые
+VIDEO_FIELDS = {
+    "main.ProjectDetail": "video_file",
+    "main.NewsArticle": "video_file",
+}
+META_FIELDS = ("video_duration", "video_width", "video_height", "video_size")
+
+
+class VideoError(ValueError):
+    pass
+
+
+def _chunk_size():
+    return getattr(settings, "VIDEO_COPY_CHUNK_SIZE", 1024 * 1024)
+
+
+def _max_moov_size():
+    return getattr(settings, "VIDEO_MAX_MOOV_SIZE", 64 * 1024 * 1024)
+
+
+def _file_size(fh):
+    fh.seek(0, os.SEEK_END)
+    return fh.tell()
+
+
+# --- MP4 / ISO BMFF
+
+# контейнеры на пути к stco/co64 и к tkhd/hdlr
+MP4_CONTAINERS = {b"moov", b"trak", b"mdia", b"minf", b"stbl", b"edts"}
+
+
+def _top_level_boxes(fh):
+    """[(тип, смещение, полный размер)] верхнего уровня, читая только заголовки."""
+    end = _file_size(fh)
+    boxes, offset = [], 0
+    while offset + 8 <= end:
+        fh.seek(offset)
+        size, kind = struct.unpack(">I4s", fh.read(8))
+        if size == 1:
+            size = struct.unpack(">Q", fh.read(8))[0]
+        elif size == 0:
+            size = end - offset
+        if size < 8 or offset + size > end:
+            raise VideoError(f"Пошкоджений бокс {kind!r} на зміщенні {offset}")
+        boxes.append((kind, offset, size))
+        offset += size
+    return boxes
+
+
+def _children(data, start=0, end=None):
+    """(тип, начало бокса, начало содержимого, конец) дочерних боксов в байтах data."""
+    end = len(data) if end is None else end
+    offset = start
+    while offset + 8 <= end:
+        size, kind = struct.unpack_from(">I4s", data, offset)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header or offset + size > end:
+            raise VideoError(f"Пошкоджений бокс {kind!r} у moov")
+        yield kind, offset, offset + header, offset + size
+        offset += size
+
+
+def _box(kind, payload):
+    size = len(payload) + 8
+    if size > 0xFFFFFFFF:
+        return struct.pack(">I4sQ", 1, kind, size + 8) + payload
+    return struct.pack(">I4s", size, kind) + payload
+
+
+def is_mp4(fh):
+    fh.seek(4)
+    return fh.read(4) in (b"ftyp", b"moov", b"mdat", b"free", b"skip", b"wide")
+
+
+def _read_moov(fh, boxes):
+    for kind, offset, size in boxes:
+        if kind == b"moov":
+            if size > _max_moov_size():
+                raise VideoError(f"moov завеликий: {size} байт")
+            fh.seek(offset)
+            return fh.read(size)
+    raise VideoError("У файлі немає moov")
+
+
+def _patch_offsets(data, start, end, translate):
+    """Пересобирает содержимое контейнера, пересчитывая смещения в stco/co64."""
+    out = []
+    for kind, box_start, body, box_end in _children(data, start, end):
+        if kind in MP4_CONTAINERS:
+            out.append(_box(kind, _patch_offsets(data, body, box_end, translate)))
+        elif kind in (b"stco", b"co64"):
+            version_flags, count = struct.unpack_from(">4sI", data, body)
+            fmt = ">%d%s" % (count, "I" if kind == b"stco" else "Q")
+            offsets = [translate(o) for o in struct.unpack_from(fmt, data, body + 8)]
+            if kind == b"stco" and offsets and max(offsets) > 0xFFFFFFFF:
+                kind, fmt = b"co64", ">%dQ" % count
+            out.append(_box(kind, version_flags + struct.pack(">I", count) + struct.pack(fmt, *offsets)))
+        else:
+            out.append(data[box_start:box_end])
+    return b"".join(out)
+
+
+def needs_faststart(fh):
+    """True, если moov лежит после первого mdat (и файл не фрагментированный)."""
+    boxes = _top_level_boxes(fh)
+    kinds = [kind for kind, _o, _s in boxes]
+    if b"moov" not in kinds or b"mdat" not in kinds or b"moof" in kinds:
+        return False
+    return kinds.index(b"moov") > kinds.index(b"mdat")
+
+
+def faststart(src, dst):
+    """
+    Пишет в dst копию MP4 из src с moov перед первым mdat. Возвращает False
+    (ничего не записав), если файл уже faststart или раскладку менять нельзя.
+    """
+    if not is_mp4(src) or not needs_faststart(src):
+        return False
+    boxes = _top_level_boxes(src)
+    moov = _read_moov(src, boxes)
+    header = 16 if struct.unpack_from(">I", moov)[0] == 1 else 8
+    rest = [(kind, offset, size) for kind, offset, size in boxes if kind != b"moov"]
+    first_mdat = next(i for i, (kind, _o, _s) in enumerate(rest) if kind == b"mdat")
+
+    # размер нового moov зависит от сдвига (stco → co64), сдвиг — от размера: повторяем до схождения
+    new_moov, moov_size = None, len(moov)
+    for _attempt in range(4):
+        old_starts, new_starts, position = [], [], 0
+        for i, (_kind, offset, size) in enumerate(rest):
+            if i == first_mdat:
+                position += moov_size
+            old_starts.append(offset)
+            new_starts.append(position)
+            position += size
+
+        def translate(offset):
+            i = bisect.bisect_right(old_starts, offset) - 1
+            if i < 0:
+                raise VideoError(f"Зміщення {offset} поза даними")
+            return new_starts[i] + offset - old_starts[i]
+
+        new_moov = _box(b"moov", _patch_offsets(moov, header, len(moov), translate))
+        if len(new_moov) == moov_size:
+            break
+        moov_size = len(new_moov)
+    else:
+        raise VideoError("Не вдалося перерахувати зміщення moov")
+
+    chunk = _chunk_size()
+    for i, (_kind, offset, size) in enumerate(rest):
+        if i == first_mdat:
+            dst.write(new_moov)
+        src.seek(offset)
+        remaining = size
+        while remaining:
+            data = src.read(min(chunk, remaining))
+            if not data:
+                raise VideoError("Файл обірвався під час копіювання")
+            dst.write(data)
+            remaining -= len(data)
+    return True
+
+
+def _fixed(value):
+    return value / 65536
+
+
+def probe_mp4(fh):
+    moov = _read_moov(fh, _top_level_boxes(fh))
+    meta = {}
+    header = 16 if struct.unpack_from(">I", moov)[0] == 1 else 8
+    for kind, _start, body, end in _children(moov, header):
+        if kind == b"mvhd":
+            version = moov[body]
+            if version == 1:
+                timescale, duration = struct.unpack_from(">IQ", moov, body + 20)
+            else:
+                timescale, duration = struct.unpack_from(">II", moov, body + 12)
+            if timescale and duration != (0xFFFFFFFFFFFFFFFF if version == 1 else 0xFFFFFFFF):
+                meta["duration"] = duration / timescale
+        elif kind == b"trak" and "width" not in meta:
+            size = _video_track_size(moov, body, end)
+            if size:
+                meta["width"], meta["height"] = size
+    return meta
+
+
+def _video_track_size(data, start, end):
+    """Размер кадра видеодорожки из tkhd (с учётом поворота в матрице) или None."""
+    dims, handler = None, None
+    for kind, _start, body, box_end in _children(data, start, end):
+        if kind == b"tkhd":
+            base = body + (36 if data[body] == 1 else 24)
+            a, b = struct.unpack_from(">ii", data, base + 16)
+            width, height = struct.unpack_from(">II", data, base + 52)
+            width, height = round(_fixed(width)), round(_fixed(height))
+            if a == 0 and abs(b) == 0x10000:  # поворот на 90/270°
+                width, height = height, width
+            dims = (width, height)
+        elif kind == b"mdia":
+            for sub, _sub_start, sub_body, _sub_end in _children(data, body, box_end):
+                if sub == b"hdlr":
+                    handler = data[sub_body + 8:sub_body + 12]
+    if handler == b"vide" and dims and all(dims):
+        return dims
+    return None
+
+
+# --- WebM / Matroska (EBML)
+
+EBML_HEADER = 0x1A45DFA3
+MKV_SEGMENT = 0x18538067
+MKV_INFO = 0x1549A966
+MKV_TRACKS = 0x1654AE6B
+MKV_CLUSTER = 0x1F43B675
+MKV_TIMECODE_SCALE = 0x2AD7B1
+MKV_DURATION = 0x4489
+MKV_TRACK_ENTRY = 0xAE
+MKV_VIDEO = 0xE0
+MKV_PIXEL_WIDTH = 0xB0
+MKV_PIXEL_HEIGHT = 0xBA
+
+
+def _vint(fh, keep_marker):
+    first = fh.read(1)
+    if not first:
+        raise EOFError
+    value = first[0]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not value & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        raise VideoError("Пошкоджене число EBML")
+    if not keep_marker:
+        value &= mask - 1
+    unknown = value == mask - 1
+    for byte in fh.read(length - 1):
+        value = (value << 8) | byte
+        unknown = unknown and byte == 0xFF
+    return value, (None if unknown and not keep_marker else value)
+
+
+def _elements(fh, end):
+    """(id, начало данных, конец) элементов до end; неизвестный размер — до end."""
+    while fh.tell() < end:
+        try:
+            element_id, _ = _vint(fh, keep_marker=True)
+            _raw, size = _vint(fh, keep_marker=False)
+        except EOFError:
+            return
+        start = fh.tell()
+        stop = end if size is None else min(start + size, end)
+        yield element_id, start, stop
+        fh.seek(stop)
+
+
+def _uint(fh, start, stop):
+    fh.seek(start)
+    return int.from_bytes(fh.read(stop - start), "big")
+
+
+def probe_webm(fh):
+    end = _file_size(fh)
+    fh.seek(0)
+    meta, scale, duration = {}, 1000000, None
+    for element_id, start, stop in _elements(fh, end):
+        if element_id != MKV_SEGMENT:
+            continue
+        fh.seek(start)
+        for child, c_start, c_stop in _elements(fh, stop):
+            if child == MKV_INFO:
+                fh.seek(c_start)
+                for item, i_start, i_stop in _elements(fh, c_stop):
+                    if item == MKV_TIMECODE_SCALE:
+                        scale = _uint(fh, i_start, i_stop)
+                    elif item == MKV_DURATION:
+                        fh.seek(i_start)
+                        raw = fh.read(i_stop - i_start)
+                        duration = struct.unpack(">d" if len(raw) == 8 else ">f", raw)[0]
+                    fh.seek(i_stop)
+            elif child == MKV_TRACKS and "width" not in meta:
+                meta.update(_webm_video_size(fh, c_start, c_stop))
+            elif child == MKV_CLUSTER:
+                break  # дальше только кадры
+            fh.seek(c_stop)
+        break
+    if duration is not None:
+        meta["duration"] = duration * scale / 1e9
+    return meta
+
+
+def _webm_video_size(fh, start, stop):
+    fh.seek(start)
+    for entry, e_start, e_stop in _elements(fh, stop):
+        if entry != MKV_TRACK_ENTRY:
+            continue
+        fh.seek(e_start)
+        for item, v_start, v_stop in _elements(fh, e_stop):
+            if item == MKV_VIDEO:
+                fh.seek(v_start)
+                size = {}
+                for prop, p_start, p_stop in _elements(fh, v_stop):
+                    if prop == MKV_PIXEL_WIDTH:
+                        size["width"] = _uint(fh, p_start, p_stop)
+                    elif prop == MKV_PIXEL_HEIGHT:
+                        size["height"] = _uint(fh, p_start, p_stop)
+                    fh.seek(p_stop)
+                if size.get("width") and size.get("height"):
+                    return size
+            fh.seek(v_stop)
+        fh.seek(e_stop)
+    return {}
+
+
+def probe(fh):
+    """{"duration": сек, "width": px, "height": px} — что удалось прочитать."""
+    fh.seek(0)
+    magic = fh.read(4)
+    try:
+        if len(magic) == 4 and struct.unpack(">I", magic)[0] == EBML_HEADER:
+            return probe_webm(fh)
+        if is_mp4(fh):
+            return probe_mp4(fh)
+    except (VideoError, struct.error, IndexError, EOFError) as exc:
+        logger.warning("Не вдалося прочитати метадані відео: %s", exc)
+    return {}
+
+
+# --- Модели
+
+def field_for(instance):
+    return VIDEO_FIELDS.get(instance._meta.label)
+
+
+def metadata(fh):
+    meta = probe(fh)
+    return {
+        "video_duration": meta.get("duration"),
+        "video_width": meta.get("width"),
+        "video_height": meta.get("height"),
+        "video_size": _file_size(fh),
+    }
+
+
+def process(instance):
+    """
+    Переписывает MP4 в faststart (если нужно) и сохраняет метаданные через
+    ``update()`` (без повторного post_save). Возвращает словарь обновлённых полей.
+
+    Недоступный файл (нет в storage, ошибка чтения/записи) не роняет вызов:
+    ошибка пишется в лог, метаданные остаются пустыми.
+    """
+    field_name = field_for(instance)
+    if not field_name:
+        return {}
+    file = getattr(instance, field_name)
+    changes = dict.fromkeys(META_FIELDS)
+    if file:
+        try:
+            changes.update(_rewrite(file, field_name))
+        except OSError as exc:
+            logger.error("Відео %s не оброблено: %s", file.name, exc)
+            changes = dict.fromkeys(META_FIELDS)
+
+    for name, value in changes.items():
+        if name != field_name:
+            setattr(instance, name, value)
+    if instance.pk:
+        type(instance)._default_manager.filter(pk=instance.pk).update(**changes)
+    return changes
+
+
+def _rewrite(file, field_name):
+    storage = file.storage
+    changes = {}
+    with tempfile.TemporaryFile(dir=getattr(settings, "FILE_UPLOAD_TEMP_DIR", None)) as tmp:
+        with storage.open(file.name, "rb") as src:
+            try:
+                rewritten = faststart(src, tmp)
+            except VideoError as exc:
+                logger.warning("Faststart для %s пропущено: %s", file.name, exc)
+                rewritten = False
+            if rewritten:
+                tmp.flush()
+                changes.update(metadata(tmp))
+            else:
+                changes.update(metadata(src))
+        if rewritten:
+            # новый файл рядом, старый удаляем только после успешной записи
+            old_name = file.name
+            tmp.seek(0)
+            file.name = changes[field_name] = storage.save(old_name, File(tmp, name=os.path.basename(old_name)))
+            try:
+                storage.delete(old_name)
+            except OSError as exc:
+                logger.warning("Старий файл %s не видалено: %s", old_name, exc)
+    return changes
@@ -1,59 +1,68 @@
+from datetime import datetime
 from urllib.parse import quote
 
 from django.conf import settings
 from django.contrib import messages
-from django.db.models import Prefetch
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Prefetch
+from django.http import Http404, JsonResponse
 from django.shortcuts import render, redirect
+from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.core.mail import send_mail
 from django.views import View
-from django.views.generic import TemplateView, DetailView
+from django.views.generic import TemplateView, DetailView, ListView
 import requests
 
-from .emailing import send_contact_emails
 from .forms import ContactForm
-from .models import Project, OrgUnit, ProjectDetail
+from .models import (Project, OrgUnit, ProjectBadge, ProjectDetail, ProjectDetailImage,
+                     ProjectDetailGridImage, NewsArticle, NewsImage)
+from .conditional import ConditionalGetMixin, news_related_slugs, news_validators, project_detail_validators
+from .pagecache import CachedPageMixin
+from .pagination import InvalidCursor, encode_cursor, keyset_page
+from . import facets, jobs, pagecache, ratelimit, related, search, spam
 
 
 def index(request):
     form = ContactForm()
     if request.method == "POST" and request.POST.get("form_name") == "contact":
+        # лимит — раньше валидации и записи в БД: всплеск спама стоит только обращений к кешу
+        retry_after = ratelimit.check_contact(request)
+        if retry_after is not None:
+            return ratelimit.too_many_requests(retry_after)
         form = ContactForm(request.POST)
         if form.is_valid():
-            obj = form.save(commit=False)
-            obj.ip = request.META.get("REMOTE_ADDR")
+            score, reasons = spam.score_inline(request.POST, form.cleaned_data)
+            if score is None:
+                # honeypot: та же відповідь, що й людині, але нічого не пишемо
+                messages.success(request, _("Дякуємо! Повідомлення надіслано."))
+                return redirect("/#contact")
+
+            obj = spam.apply(form.save(commit=False), score, reasons)
+            obj.ip = ratelimit.client_ip(request) or None
             obj.user_agent = request.META.get("HTTP_USER_AGENT", "")[:500]
-            obj.save()
-
-            # формируем контекст для писем
-            ctx = {
-                "first_name": obj.first_name,
-                "last_name": obj.last_name,
-                "email": obj.email,
-                "phone": obj.phone,
-                "subject": obj.subject,
-                "message": obj.message,
-                "ip": obj.ip,
-                "user_agent": obj.user_agent,
-            }
-
-            try:
-                ok, info = send_contact_emails(ctx)
-                if ok:
-                    messages.success(request, _("Дякуємо! Повідомлення надіслано."))
-                else:
-                    messages.warning(request, _("Повідомлення збережено, але лист не надіслано (%(err)s).") % {"err": info})
-            except Exception:
-                messages.warning(request, _("Повідомлення збережено, але лист не надіслано. Спробуйте пізніше."))
 
+            # тяжкие проверки и письма — фоновой задачей (`manage.py run_jobs`), для карантина — никаких писем
+            with transaction.atomic():
+                obj.save()
+                if not obj.is_quarantined:
+                    jobs.enqueue("contact_spam_check", contact=obj.pk)
+
+            messages.success(request, _("Дякуємо! Повідомлення надіслано."))
             return redirect("/#contact")
         else:
             messages.error(request, _("Перевірте поля та спробуйте знову."))
     return render(request, "main/index.html", {"contact_form": form})
 
 
-class ProjectsListView(TemplateView):
+class ProjectsListView(CachedPageMixin, TemplateView):
     template_name = "main/projects.html"
+    page_cache_params = ("unit", "units")
+
+    def get_page_cache_tags(self):
+        return ["projects"]
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
@@ -64,31 +73,70 @@ class ProjectsListView(TemplateView):
         ).order_by("order", "id")
 
         # ?unit=slug  ИЛИ  ?units=slug1,slug2
-        unit = self.request.GET.get("unit")
-        units = self.request.GET.get("units")
-        if unit:
-            qs = qs.filter(units__slug=unit)
-        elif units:
-            slugs = [s.strip() for s in units.split(",") if s.strip()]
-            if slugs:
-                qs = qs.filter(units__slug__in=slugs).distinct()
-
-        ctx["projects"] = qs
-        ctx["all_units"] = OrgUnit.objects.all()
-        ctx["active_units"] = (units.split(",") if units else ([unit] if unit else []))
+        slugs = facets.selected_slugs(self.request.GET)
+        ctx["projects"] = facets.filter_projects(qs, slugs)
+        ctx["unit_facets"] = facets.facet_counts(slugs)
+        ctx["active_units"] = slugs
         return ctx
 
 
-class ProjectDetailView(DetailView):
+class ProjectFacetsView(CachedPageMixin, View):
+    """JSON для фасетного фильтра: проекты выборки и счётчики по подразделениям."""
+    page_cache_params = ("unit", "units")
+
+    def get_page_cache_tags(self):
+        return ["projects"]
+
+    def get(self, request, *args, **kwargs):
+        slugs = facets.selected_slugs(request.GET)
+        qs = facets.filter_projects(
+            Project.objects.filter(is_published=True)
+            .select_related("detail").only("title", "detail__slug", "detail__is_published")
+            .order_by("order", "id"),
+            slugs,
+        )
+        projects = [{
+            "id": p.pk,
+            "title": p.title,
+            "url": (reverse("project_detail", kwargs={"slug": p.detail.slug})
+                    if p.detail and p.detail.is_published else f"{reverse('projects')}#project-{p.pk}"),
+        } for p in qs]
+        return JsonResponse({
+            "units": facets.facet_counts(slugs),
+            "projects": projects,
+            "total": len(projects),
+        }, json_dumps_params={"ensure_ascii": False})
+
+
+class ProjectDetailView(ConditionalGetMixin, CachedPageMixin, DetailView):
     template_name = "main/project_detail.html"
     model = ProjectDetail
     slug_field = "slug"
     slug_url_kwarg = "slug"
 
+    def get_validators(self):
+        return project_detail_validators(self.kwargs["slug"])
+
+    def get_page_cache_tags(self):
+        return [f"project_detail:{self.kwargs['slug']}"]
+
     def get_queryset(self):
+        # План загрузки: страница стоит фиксированное число запросов при любом
+        # количестве фото и бейджей (см. main/tests.py)
         return (ProjectDetail.objects
                 .filter(is_published=True)
-                .prefetch_related("images"))
+                .select_related("project")
+                .prefetch_related(
+                    Prefetch("images", queryset=ProjectDetailImage.objects
+                             .only("id", "detail_id", "image", "alt", "variants")
+                             .order_by("order", "id")),
+                    Prefetch("grid_images", queryset=ProjectDetailGridImage.objects
+                             .only("id", "project_id", "image", "width", "height", "variants")
+                             .order_by("order", "id")),
+                    Prefetch("project__badges", queryset=ProjectBadge.objects
+                             .only("id", "project_id", "text")
+                             .order_by("order", "id")),
+                ))
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
@@ -99,39 +147,48 @@ class ProjectDetailView(DetailView):
 
 
 
-class UnitProjectsMixin:
+def units_by_slug():
+    """Карта slug → OrgUnit; кешируется до изменения подразделений (тег ``projects``)."""
+    key = f"orgunits:by_slug:{pagecache.tag_version('projects')}"
+    units = cache.get(key)
+    if units is None:
+        units = {u.slug: u for u in OrgUnit.objects.all()}
+        cache.set(key, units, getattr(settings, "PAGE_CACHE_TIMEOUT", 600))
+    return units
+
+
+class UnitProjectsMixin(CachedPageMixin):
     """
     Простой миксин: выбираем проекты юнита и подмешиваем флаг page_is_reverse
     из нужного поля проекта (страничное поле приоритетнее глобального).
+    Всё считается в SQL: юнит — через Exists() (без join и distinct), флаг —
+    аннотацией, поэтому страница стоит фиксированное число запросов.
     """
     template_name = "main/unit_projects.html"  # или свой
     unit_slug = None
     reverse_field = None  # имя булевого поля на Project
 
+    def get_page_cache_tags(self):
+        return [f"unit:{self.unit_slug}"]
+
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        unit = OrgUnit.objects.filter(slug=self.unit_slug).first()
+        unit = units_by_slug().get(self.unit_slug)
         ctx["unit"] = unit
 
-        qs = (
-            Project.objects.filter(is_published=True, units__slug=self.unit_slug)
-            .prefetch_related("badges", Prefetch("images"))
-            .order_by("order", "id")
-            .distinct()
-        )
+        in_unit = Project.units.through.objects.filter(
+            project_id=OuterRef("pk"), orgunit_id=unit.pk if unit else None)
 
         # Страничное поле — главнее глобального. Если reverse_field задан,
         # то используем его значение как есть (True/False).
         # Если reverse_field не задан — используем глобальный is_reverse.
-        if self.reverse_field:
-            for p in qs:
-                page_val = getattr(p, self.reverse_field, False)  # BoolField: всегда True/False
-                setattr(p, "page_is_reverse", bool(page_val))
-        else:
-            for p in qs:
-                setattr(p, "page_is_reverse", bool(p.is_reverse))
-
-        ctx["projects"] = qs
+        ctx["projects"] = (
+            Project.objects.filter(Exists(in_unit), is_published=True)
+            .annotate(page_is_reverse=F(self.reverse_field or "is_reverse"))
+            .select_related("detail")  # ссылка «Дізнатися більше» — без запроса на карточку
+            .prefetch_related("badges", Prefetch("images"))
+            .order_by("order", "id")
+        )
         return ctx
 
 
@@ -151,36 +208,108 @@ class SportsUnitView(UnitProjectsMixin, TemplateView):
     unit_slug      = "prodakshn-studiya-brspilna-peremoga"
     reverse_field  = "is_reverse_sport"
 
-class NewsListView(ListView):
+class NewsListView(CachedPageMixin, ListView):
+    """
+    Лента новостей с keyset-пагинацией (см. main/pagination.py):
+    ?after=/?before= — курсоры, старые ссылки ?page=N перенаправляем на курсор.
+    """
     model = NewsArticle
     template_name = "news/news_list.html"
     context_object_name = "articles"
-    paginate_by = 9
+    per_page = 9  # не paginate_by: стандартный Paginator делает COUNT(*) и OFFSET
+    page_cache_params = ("after", "before")
+    key_fields = ("published_at", "created_at", "id")
+    key_kinds = (datetime, datetime, int)
+
+    def get_page_cache_tags(self):
+        return ["news"]
 
     def get_queryset(self):
         return (NewsArticle.objects
                 .filter(is_published=True, published_at__lte=timezone.now())
-                .order_by("-published_at", "-created_at"))
+                # только то, что рисует карточка списка (+ поля курсора)
+                .only("id", "slug", "title", "cover", "cover_variants", "published_at", "created_at"))
+
+    def get(self, request, *args, **kwargs):
+        if "page" in request.GET:
+            return self.redirect_page_number(request.GET["page"])
+        return super().get(request, *args, **kwargs)
+
+    def redirect_page_number(self, number):
+        """?page=N → ?after=<курсор>; карта номер → курсор кешируется до изменения новостей."""
+        try:
+            number = int(number)
+        except ValueError:
+            raise Http404
+        if number <= 1:
+            return redirect(self.request.path)
+
+        key = f"news:page_cursors:{pagecache.tag_version('news')}"
+        cursors = cache.get(key) or {}
+        cursor = cursors.get(number)
+        if cursor is None:
+            offset = (number - 1) * self.per_page - 1
+            desc = [f"-{name}" for name in self.key_fields]
+            row = self.get_queryset().order_by(*desc).values_list(*self.key_fields)[offset:offset + 1].first()
+            if row is None:
+                raise Http404
+            cursor = cursors[number] = encode_cursor(row)
+            cache.set(key, cursors, getattr(settings, "PAGE_CACHE_TIMEOUT", 600))
+        # не 301: с новыми публикациями курсор N-й страницы сдвигается
+        return redirect(f"{self.request.path}?after={cursor}")
 
     def get_context_data(self, **kwargs):
-        ctx = super().get_context_data(**kwargs)
-        ctx["also_see"] = NewsArticle.objects.filter(
-            is_published=True, published_at__lte=timezone.now()
-        ).order_by("-published_at")[:6]
+        after, before = self.request.GET.get("after"), self.request.GET.get("before")
+        try:
+            page = keyset_page(self.object_list, self.key_fields, self.key_kinds,
+                               self.per_page, after=after, before=before)
+        except InvalidCursor:
+            raise Http404
+        if (after or before) and not page.object_list:
+            raise Http404
+
+        ctx = super().get_context_data(object_list=page.object_list, **kwargs)
+        ctx.update(page_obj=page, is_paginated=page.has_other_pages)
+        # без отдельного запроса — свежие статьи и так есть в выборке страницы
+        ctx["also_see"] = page.object_list[:6]
         return ctx
 
-class NewsDetailView(DetailView):
+class NewsDetailView(ConditionalGetMixin, CachedPageMixin, DetailView):
     model = NewsArticle
     template_name = "news/news_detail.html"
     context_object_name = "article"
 
+    def get_validators(self):
+        return news_validators(self.kwargs["slug"])
+
+    def get_page_cache_tags(self):
+        # своя статья и статьи блока «Також подивіться»: правка чужой новости страницу не сбрасывает
+        slug = self.kwargs["slug"]
+        return [f"news:{slug}", *(f"news:{related}" for related in news_related_slugs(slug))]
+
     def get_queryset(self):
-        return NewsArticle.objects.filter(is_published=True, published_at__lte=timezone.now())
+        return (NewsArticle.objects
+                .filter(is_published=True, published_at__lte=timezone.now())
+                .select_related("author")  # display_author
+                .prefetch_related(
+                    Prefetch("images", queryset=NewsImage.objects
+                             .only("id", "article_id", "image", "alt", "width", "height", "variants")
+                             .order_by("order", "id")),
+                ))
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["also_see"] = related.also_see(self.object)
+        return ctx
+
+
+class SearchView(TemplateView):
+    template_name = "main/search.html"
+    max_results = 50
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        ctx["also_see"] = (NewsArticle.objects
-                           .filter(is_published=True, published_at__lte=timezone.now())
-                           .exclude(pk=self.object.pk)
-                           .order_by("-published_at")[:6])
+        query = self.request.GET.get("q", "").strip()[:200]
+        ctx["query"] = query
+        ctx["results"] = search.search(query, limit=self.max_results) if query else []
         return ctx
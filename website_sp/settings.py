@@ -132,16 +132,98 @@ TIME_ZONE = 'UTC'
 
 
 
+# Cache
+# Файловый кеш общий для всех gunicorn-воркеров контейнера (LocMem у каждого свой,
+# и инвалидация из админки не доходила бы до соседей). В нём страницы (язык ×
+# параметры), версии тегов, вёдра лимитов, отпечатки спама, карты курсоров и
+# счётчики фасетов.
+# Цена FileBasedCache: каждый set() считает записи glob'ом по всему каталогу, а при
+# MAX_ENTRIES удаляет случайную треть (CULL_FREQUENCY) — запись стоит O(MAX_ENTRIES).
+# Поэтому лимит умеренный; если записей нужно больше — Redis через env:
+#   CACHE_BACKEND=django.core.cache.backends.redis.RedisCache CACHE_LOCATION=redis://redis:6379/1
+# (нужен пакет redis; MAX_ENTRIES ему не передаём — вытеснением управляет maxmemory-policy).
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache")
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": os.getenv("CACHE_LOCATION", str(BASE_DIR / ".cache")),
+    }
+}
+if CACHE_BACKEND.endswith((".FileBasedCache", ".LocMemCache")):
+    CACHES["default"]["OPTIONS"] = {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "5000"))}
+
+# Кеш целых публичных страниц (main/pagecache.py) — включается явно
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "False").lower() == "true"
+PAGE_CACHE_TIMEOUT = int(os.getenv("PAGE_CACHE_TIMEOUT", "600"))
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']  # для глобальной папки static
+
+# Очищенные от неиспользуемых селекторов CSS (`manage.py prune_css --write`, main/cssprune.py).
+# В продакшене каталог стоит перед static/, и collectstatic берёт очищенные файлы вместо исходных.
+CSS_PRUNE_ROOT = Path(os.getenv("CSS_PRUNE_ROOT", BASE_DIR / "build" / "static"))
+CSS_PRUNE_SOURCE = BASE_DIR / "static"
+CSS_PRUNE_DIRS = ("css",)
+CSS_PRUNE_SAFELIST = ("swiper-*", "pswp*")  # классы, которые добавляют сторонние скрипты
+if not DEBUG and CSS_PRUNE_ROOT.is_dir():
+    STATICFILES_DIRS.insert(0, CSS_PRUNE_ROOT)
 STATIC_ROOT = BASE_DIR / 'staticfiles'    # для продакшена (сбор файлов)
 
+# collectstatic пишет имена с хешем + .gz/.br рядом (main/storage.py)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": os.getenv("STATICFILES_BACKEND", "main.storage.CompressedManifestStaticFilesStorage")},
+}
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Файлы фоновых задач админки (ZIP до обработки) — вне MEDIA_ROOT, наружу не отдаются
+JOBS_ROOT = Path(os.getenv("JOBS_ROOT", BASE_DIR / "jobs"))
+
+# Массовая загрузка полотна из ZIP (main/bulk_upload.py)
+BULK_UPLOAD_CHUNK_SIZE = 1024 * 1024
+BULK_UPLOAD_WORKERS = int(os.getenv("BULK_UPLOAD_WORKERS", "4"))
+# лимиты распаковки (защита FILE_UPLOAD_TEMP_DIR от zip-бомб): один файл / весь архив
+BULK_UPLOAD_MAX_FILE_SIZE = int(os.getenv("BULK_UPLOAD_MAX_FILE_SIZE", str(50 * 1024 * 1024)))
+BULK_UPLOAD_MAX_TOTAL_SIZE = int(os.getenv("BULK_UPLOAD_MAX_TOTAL_SIZE", str(4 * 1024 ** 3)))
+
+# Адаптивные варианты загруженных фото (main/images.py, {% responsive_image %})
+RESPONSIVE_IMAGE_WIDTHS = (480, 960, 1600)
+RESPONSIVE_IMAGE_FORMATS = ("avif", "webp")
+
+# Те же варианты для картинок из static/images (main/static_images.py, {% static_picture %}):
+# собирает `manage.py optimize_static_images`, 0 процессов = по числу ядер
+STATIC_IMAGES_DIR = BASE_DIR / "static" / "images"
+STATIC_IMAGES_WORKERS = int(os.getenv("STATIC_IMAGES_WORKERS", "0"))
+
+# Загруженные видео (main/video.py): faststart-копирование кусками, потолок moov в памяти
+VIDEO_COPY_CHUNK_SIZE = 1024 * 1024
+VIDEO_MAX_MOOV_SIZE = 64 * 1024 * 1024
+
+# Critical CSS первого экрана (main/critical.py): собирает `manage.py build_critical_css`
+CRITICAL_CSS_ROOT = Path(os.getenv("CRITICAL_CSS_ROOT", BASE_DIR / "critical_css"))
+CRITICAL_CSS_MAX_ELEMENTS = 400  # потолок элементов «первого экрана», если секция контента длинная
+
+# Sitemap (main/sitemaps.py): файлы пишутся на диск, nginx отдаёт /sitemap.xml и /sitemaps/
+SITE_URL = os.getenv("SITE_URL", "https://spilnaperemoga.com")
+SITEMAP_ROOT = MEDIA_ROOT / "sitemaps"
+# языки sitemap — все LANGUAGES (как i18n_patterns); SITEMAP_LANGUAGES — только чтобы сузить
+
+# Полнотекстовый поиск (main/search.py): язык контента и конфиг Postgres для каждого языка
+# (украинского словаря в Postgres нет — для него "simple")
+SEARCH_CONTENT_LANGUAGE = "uk"
+SEARCH_CONFIGS = {"uk": "simple", "en": "english", "it": "italian"}
+
+# «Також подивіться» (main/related.py): сколько статей, вес общих слов и полураспад близости дат
+RELATED_ARTICLES_COUNT = 6
+RELATED_TERM_WEIGHT = 4.0
+RELATED_HALF_LIFE_DAYS = 90
+
 
 EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
 EMAIL_HOST = os.getenv("EMAIL_HOST", "")
@@ -155,6 +237,41 @@ SERVER_EMAIL = os.getenv("SERVER_EMAIL", DEFAULT_FROM_EMAIL)
 
 CONTACT_RECIPIENT = os.getenv("CONTACT_RECIPIENT", "")
 
+# Очередь листів (OutboxEmail) — відправляє `manage.py send_outbox`
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "50"))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "6"))
+EMAIL_OUTBOX_BACKOFF = int(os.getenv("EMAIL_OUTBOX_BACKOFF", "60"))  # сек, подвоюється з кожною спробою
+EMAIL_OUTBOX_LEASE = int(os.getenv("EMAIL_OUTBOX_LEASE", "300"))
+
+# Лимит POST формы контактов (main/ratelimit.py): token bucket {область: (ёмкость, период в секундах)}
+# в кеше RATE_LIMIT_CACHE — он должен быть общим для всех воркеров (file/redis/memcached, не locmem)
+CONTACT_RATE_LIMITS = {"ip": (5, 600), "email": (3, 3600)}
+RATE_LIMIT_CACHE = os.getenv("RATE_LIMIT_CACHE", "default")
+# за nginx (nginx/conf.d/app.conf) REMOTE_ADDR — это контейнер nginx, реальный IP — в X-Real-IP.
+# Заголовок подделывается клиентом, поэтому верим ему, только если REMOTE_ADDR — наш прокси
+# (RATE_LIMIT_TRUSTED_PROXIES, по умолчанию loopback и частные сети docker); без прокси —
+# RATE_LIMIT_IP_HEADER="" и берётся REMOTE_ADDR
+RATE_LIMIT_IP_HEADER = os.getenv("RATE_LIMIT_IP_HEADER", "HTTP_X_REAL_IP") or None
+RATE_LIMIT_TRUSTED_PROXIES = [net.strip() for net in os.getenv(
+    "RATE_LIMIT_TRUSTED_PROXIES", "127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16,fc00::/7",
+).split(",") if net.strip()]
+
+# Админка (main/pagination.py, main/admin.py): точный COUNT(*) только для небольших выборок,
+# экспорт CSV читает обращения пачками
+ADMIN_EXACT_COUNT_LIMIT = 10000
+ADMIN_EXPORT_CHUNK_SIZE = 2000
+
+# Перестановка перетаскиванием (main/reorder.py): order = 10, 20, 30… — место для вставки между соседями
+REORDER_STEP = 10
+
+# Спам-оценка обращений (main/spam.py): от SPAM_QUARANTINE_SCORE баллов — карантин без писем
+SPAM_QUARANTINE_SCORE = 5
+SPAM_MIN_FILL_SECONDS = 3           # быстрее форму заполняют только боты
+SPAM_DUPLICATE_WINDOW = 24 * 3600   # сколько помним отпечатки текстов
+SPAM_SENDER_BURST = 3               # сообщений с того же IP/email за сутки
+SPAM_CAMPAIGN_SAMPLE = 200          # сколько недавних сообщений сравниваем на почти-дубликаты
+SPAM_CHECK_EMAIL_DOMAIN = os.getenv("SPAM_CHECK_EMAIL_DOMAIN", "True").lower() == "true"
+
 FORMSUBMIT_ENABLED = True
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -0,0 +1,8 @@
+"""
+Настройки для тестов: ``manage.py test`` подхватывает их сам (см. manage.py),
+для pytest — через DJANGO_SETTINGS_MODULE (pyproject.toml).
+"""
+from .settings import *  # noqa: F401,F403
+
+# тесты не делят кеш с локальным сервером и друг с другом
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
@@ -5,6 +5,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.conf.urls.i18n import i18n_patterns
 from django.views.i18n import set_language
+from django.views.static import serve
 
 urlpatterns = [
     # Админка БЕЗ префикса языка
@@ -24,3 +25,8 @@ urlpatterns += i18n_patterns(
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    # в проде sitemap отдаёт nginx из SITEMAP_ROOT
+    urlpatterns += [
+        path("sitemap.xml", serve, {"path": "sitemap.xml", "document_root": settings.SITEMAP_ROOT}),
+        path("sitemaps/<path:path>", serve, {"document_root": settings.SITEMAP_ROOT}),
+    ]